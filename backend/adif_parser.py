@@ -3,11 +3,48 @@ ADIF (Amateur Data Interchange Format) Parser
 Supports ADIF 3.1.6 specification
 Parses ADIF files for amateur radio QSO logs
 """
+import io
+import os
 import re
-import hashlib
+import sys
+import mmap
+import codecs
+from hashlib import sha256
+from collections import deque
+from itertools import repeat
+from operator import ne, methodcaller
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
 from datetime import datetime
 
 
+# End-of-header and end-of-record markers, located without lowercasing a
+# copy of the file
+EOH_PATTERN = re.compile(r'<eoh>', re.IGNORECASE)
+EOR_PATTERN = re.compile(r'<eor>', re.IGNORECASE)
+
+# An <eor> followed by another field tag, a safe place to split a file
+SAFE_EOR_PATTERN = re.compile(r'<eor>(?=\s*<[A-Za-z0-9_]+:\d+[^<>]*>)', re.IGNORECASE)
+
+# The same markers for scanning raw upload bytes
+EOH_BYTES_PATTERN = re.compile(rb'<eoh>', re.IGNORECASE)
+EOR_BYTES_PATTERN = re.compile(rb'<eor>', re.IGNORECASE)
+SAFE_EOR_BYTES_PATTERN = re.compile(rb'<eor>(?=\s*<[A-Za-z0-9_]+:\d+[^<>]*>)', re.IGNORECASE)
+
+# Text that ends a run of plain records: a '>' or '<' out of turn, or
+# whitespace opening a value (other than after <eor>). Searched for one at
+# a time, which is several times faster than as one alternation.
+UNPLAIN_PATTERNS = (
+    re.compile(r'>[^<]*>'),
+    re.compile(r'<[^>]*<'),
+    re.compile(r'>\s(?<!<[Ee][Oo][Rr]>\s)')
+)
+
+# Field name the plain path gives <eor> tags
+END_OF_RECORD = object()
+
+
 class ADIFParser:
     """Parse ADIF 3.1.6 format amateur radio log files"""
     
@@ -15,12 +52,13 @@ class ADIFParser:
     ADIF_VERSION = "3.1.6"
     
     # Core fields we extract to dedicated columns (limited set for indexing)
-    CORE_FIELDS = {
+    CORE_FIELD_ORDER = (
         'qso_date', 'time_on', 'call', 'band', 'mode', 'freq',
         'rst_sent', 'rst_rcvd', 'qso_date_off', 'time_off',
         'station_callsign', 'my_gridsquare', 'gridsquare',
         'name', 'qth', 'comment'
-    }
+    )
+    CORE_FIELDS = set(CORE_FIELD_ORDER)
     
     # Comprehensive list of all ADIF 3.1.6 fields
     # All fields not in CORE_FIELDS will be stored in additional_fields JSON
@@ -95,44 +133,496 @@ class ADIFParser:
         'VOI', 'WINMOR', 'WSPR', 'JS8'
     }
     
-    def __init__(self):
+    # Mode spellings loggers use that map onto an ADIF mode
+    MODE_ALIASES = {'USB': 'SSB', 'LSB': 'SSB'}
+    
+    # ADIF 3.1.6 band plan: (band, lower MHz, upper MHz)
+    BAND_PLAN = [
+        ('2190m', 0.1357, 0.1378), ('630m', 0.472, 0.479), ('560m', 0.501, 0.504),
+        ('160m', 1.8, 2.0), ('80m', 3.5, 4.0), ('60m', 5.06, 5.45),
+        ('40m', 7.0, 7.3), ('30m', 10.1, 10.15), ('20m', 14.0, 14.35),
+        ('17m', 18.068, 18.168), ('15m', 21.0, 21.45), ('12m', 24.89, 24.99),
+        ('10m', 28.0, 29.7), ('8m', 40.0, 45.0), ('6m', 50.0, 54.0),
+        ('5m', 54.000001, 69.9), ('4m', 70.0, 71.0), ('2m', 144.0, 148.0),
+        ('1.25m', 222.0, 225.0), ('70cm', 420.0, 450.0), ('33cm', 902.0, 928.0),
+        ('23cm', 1240.0, 1300.0), ('13cm', 2300.0, 2450.0), ('9cm', 3300.0, 3500.0),
+        ('6cm', 5650.0, 5925.0), ('3cm', 10000.0, 10500.0), ('1.25cm', 24000.0, 24250.0),
+        ('6mm', 47000.0, 47200.0), ('4mm', 75500.0, 81000.0), ('2.5mm', 119980.0, 123000.0),
+        ('2mm', 134000.0, 149000.0), ('1mm', 241000.0, 250000.0), ('submm', 300000.0, 7500000.0)
+    ]
+    
+    # Upper bound on distinct tags remembered by the tokenizer's tag cache
+    TAG_CACHE_SIZE = 4096
+    
+    # Characters of records scan_records tries on the plain path at a time
+    PLAIN_WINDOW_SIZE = 4096
+    
+    # Fewest records sharing a layout that are finished as one batch
+    BATCH_MIN_RECORDS = 4
+    
+    # Most records tokenized between tries of the plain path when none of
+    # the recent records were plain
+    PLAIN_BACKOFF_LIMIT = 63
+    
+    # Bytes of the SHA256 digest kept as the binary dedup key
+    FINGERPRINT_SIZE = 16
+    
+    # Bytes read from an upload stream per iteration of iter_records
+    STREAM_CHUNK_SIZE = 64 * 1024
+    
+    # Inputs at least this large are parsed in a process pool
+    PARALLEL_THRESHOLD = 32 * 1024 * 1024
+    
+    # Bytes of records handed to a worker process at a time
+    PARALLEL_BLOCK_SIZE = 2 * 1024 * 1024
+    
+    # Non-standard header fields some loggers use to declare their charset
+    CHARSET_HEADER_FIELDS = ('encoding', 'charset')
+    
+    # Charset for ADIF 1.x/2.x files and for values that are not valid UTF-8
+    FALLBACK_ENCODING = 'cp1252'
+    
+    def __init__(self, processes=None, parallel_threshold=None):
         self.records = []
         self.header = {}
+        # Charset of field values when scanning raw bytes, set from the header
+        self.encoding = 'utf-8'
+        # Offset just past the last record read by iter_buffer_records
+        self.consumed_offset = 0
+        self.processes = processes or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold or self.PARALLEL_THRESHOLD
+        # Raw tag text (e.g. 'CALL:5') -> (field_name, length)
+        self._tag_cache = {}
+        # Tag text inside '<' and '>' -> field name and length, for the plain
+        # path of scan_records
+        self._plain_names = {}
+        self._plain_lengths = {}
+        # FREQ value -> freq_mhz
+        self._freq_mhz = {}
+        # Field name, lookup table and fallback for the normalized fields
+        self._normalized_columns = (
+            ('band', BAND_LOOKUP, self.normalize_band),
+            ('band_rx', BAND_LOOKUP, self.normalize_band),
+            ('mode', MODE_LOOKUP, self.normalize_mode),
+            ('submode', MODE_LOOKUP, self.normalize_mode)
+        )
         
     def parse_file(self, file_content):
         """
         Parse ADIF file content
         
         Args:
-            file_content: String content of ADIF file
+            file_content: String or bytes content of ADIF file
             
         Returns:
             List of parsed QSO records
         """
-        # Convert bytes to string if needed
-        if isinstance(file_content, bytes):
-            file_content = file_content.decode('utf-8', errors='ignore')
+        if not isinstance(file_content, str):
+            return self.parse_buffer(file_content)
+        
+        if self._use_parallel(len(file_content)):
+            blocks = self._iter_record_blocks(io.StringIO(file_content))
+            self.records = list(self._iter_records_parallel(blocks))
+            return self.records
         
         # Parse header
-        header_end = file_content.lower().find('<eoh>')
-        if header_end != -1:
-            self.parse_header(file_content[:header_end])
-            file_content = file_content[header_end + 5:]
+        pos = 0
+        header_end = EOH_PATTERN.search(file_content)
+        if header_end:
+            self.parse_header(file_content[:header_end.start()])
+            pos = header_end.end()
         
-        # Split into records by <eor> marker
-        records_raw = re.split(r'<eor>', file_content, flags=re.IGNORECASE)
+        records, _ = self.scan_records(file_content, pos)
+        self.records = [record for record in records if self.validate_record(record)]
         
-        self.records = []
-        for record_raw in records_raw:
-            if not record_raw.strip():
+        return self.records
+    
+    def iter_records(self, stream, chunk_size=None, size=None):
+        """
+        Parse ADIF records from a file-like object in fixed-size chunks
+        
+        Records are yielded as soon as their <eor> has been read, so memory
+        use stays bounded by the chunk size rather than the file size. The
+        header is parsed into self.header; self.records is not populated.
+        When size reaches the parallel threshold, blocks of records are
+        parsed and hashed in a process pool and yielded in file order.
+        A binary stream is scanned as bytes, like iter_buffer_records, so
+        field values are decoded with the charset picked from the header.
+        
+        Args:
+            stream: Binary or text file-like object, e.g. a Werkzeug upload stream
+            chunk_size: Number of bytes to read per iteration
+            size: Total size of the stream in bytes, if known
+            
+        Yields:
+            Valid parsed QSO records in file order
+        """
+        if self._use_parallel(size):
+            yield from self._iter_records_parallel(self._iter_record_blocks(stream))
+            return
+        
+        buffer = None
+        in_header = True
+        
+        for chunk in self._read_chunks(stream, chunk_size or self.STREAM_CHUNK_SIZE):
+            eof = not chunk
+            if buffer is None:
+                buffer = chunk[:0]
+                eor_search = EOR_PATTERN.search if isinstance(chunk, str) else EOR_BYTES_PATTERN.search
+            tail_start = max(0, len(buffer) - 4)
+            buffer += chunk
+            
+            pos = 0
+            if in_header:
+                pos = self._consume_header(buffer, eof)
+                if pos is None:
+                    continue
+                in_header = False
+            elif not eof and not eor_search(buffer, tail_start):
+                # No record can have completed; avoid rescanning the buffer
                 continue
-                
-            record = self.parse_record(record_raw)
-            if record and self.validate_record(record):
-                self.records.append(record)
+            
+            records, consumed = self.scan_records(buffer, pos, final=eof)
+            buffer = buffer[consumed:]
+            
+            for record in records:
+                if self.validate_record(record):
+                    yield record
+    
+    def _use_parallel(self, size):
+        """Check whether input of the given size should be parsed in parallel"""
+        return (
+            size is not None
+            and self.processes > 1
+            and size >= self.parallel_threshold
+        )
+    
+    def parse_buffer(self, buffer):
+        """
+        Parse ADIF records from raw bytes without decoding the whole file
         
+        Args:
+            buffer: bytes, bytearray, mmap or memoryview of an ADIF file
+            
+        Returns:
+            List of parsed QSO records
+        """
+        self.records = list(self.iter_buffer_records(buffer))
         return self.records
     
+    def iter_buffer_records(self, buffer, chunk_size=None, start=None, end=None, final=True):
+        """
+        Parse ADIF records directly from raw bytes
+        
+        Tags are located with bytes.find on the buffer itself and only field
+        values are decoded, using the charset picked from the header. With
+        an mmap of a spooled upload the file is never copied into Python
+        memory as a whole. Records are scanned one window of roughly
+        chunk_size bytes at a time so they can be yielded as they are found.
+        
+        A file that is still being received can be parsed a range at a time:
+        with final=False a trailing partial record is left unparsed, and
+        self.consumed_offset tells where the next range should start.
+        
+        Args:
+            buffer: bytes, bytearray, mmap or memoryview of an ADIF file
+            chunk_size: Number of bytes to scan per window
+            start: Offset to resume at, from an earlier consumed_offset
+            end: Offset to stop at instead of the end of the buffer
+            final: False if more of the file may follow end
+            
+        Yields:
+            Valid parsed QSO records in file order
+        """
+        if isinstance(buffer, memoryview):
+            # memoryview has no find(); scan the object it views when possible
+            whole = isinstance(buffer.obj, (bytes, bytearray, mmap.mmap)) and buffer.nbytes == len(buffer.obj)
+            buffer = buffer.obj if whole else buffer.tobytes()
+        
+        # The header is parsed again on resume for its charset
+        size = len(buffer) if end is None else end
+        pos = max(self._consume_buffer_header(buffer), start or 0)
+        self.consumed_offset = pos
+        
+        if start is None and end is None and self._use_parallel(size - pos):
+            yield from self._iter_records_parallel(self._iter_buffer_blocks(buffer, pos))
+            self.consumed_offset = size
+            return
+        
+        chunk_size = chunk_size or self.STREAM_CHUNK_SIZE
+        search_from = pos + chunk_size
+        while pos < size:
+            match = EOR_BYTES_PATTERN.search(buffer, search_from, size) if search_from < size else None
+            window_end = match.end() if match else size
+            last = window_end == size
+            
+            records, consumed = self.scan_records(buffer, pos, final=final and last, end=window_end)
+            for record in records:
+                if self.validate_record(record):
+                    yield record
+            
+            if consumed > pos:
+                pos = consumed
+                search_from = pos + chunk_size
+            elif last:
+                # Only a partial record is left; wait for the rest of the file
+                break
+            else:
+                # A literal '<eor>' inside a value; widen the window
+                search_from = window_end
+            self.consumed_offset = pos
+    
+    def iter_upload(self, stream, size=None):
+        """
+        Parse ADIF records from an upload stream
+        
+        Uploads spooled to a temporary file are memory-mapped and scanned
+        as bytes; in-memory streams are read in chunks with iter_records.
+        
+        Args:
+            stream: Binary file-like object, e.g. a Werkzeug upload stream
+            size: Total size of the stream in bytes, if known
+            
+        Yields:
+            Valid parsed QSO records in file order
+        """
+        # A SpooledTemporaryFile still held in memory would be written to
+        # disk by fileno(); small uploads are cheaper to read directly
+        if not getattr(stream, '_rolled', True):
+            yield from self.iter_records(stream, size=size)
+            return
+        
+        try:
+            buffer = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            # No backing file, or an empty one
+            yield from self.iter_records(stream, size=size)
+            return
+        
+        with buffer:
+            yield from self.iter_buffer_records(buffer)
+    
+    def last_record_end(self, buffer, end):
+        """
+        Find where the last complete record before an offset ends
+        
+        Args:
+            buffer: Raw ADIF bytes, e.g. a memory-mapped file
+            end: Offset to search back from
+        
+        Returns:
+            Offset just past the last <eor> before end, or 0 if there is none
+        """
+        while end > 0:
+            start = max(0, end - self.STREAM_CHUNK_SIZE)
+            match = None
+            for match in EOR_BYTES_PATTERN.finditer(buffer, start, end):
+                pass
+            if match:
+                return match.end()
+            # Overlap windows so an <eor> across their boundary is found
+            end = start + len(b'<eor>') - 1 if start else 0
+        return 0
+    
+    def _consume_buffer_header(self, buffer):
+        """
+        Parse the header of a raw ADIF buffer and pick the value charset
+        
+        Returns:
+            Offset of the first record
+        """
+        header_end = EOH_BYTES_PATTERN.search(buffer)
+        if header_end is None:
+            return 0
+        
+        # latin-1 maps bytes one-to-one, so declared lengths still line up
+        self.parse_header(buffer[:header_end.start()].decode('latin-1'))
+        self.encoding = self._detect_encoding()
+        return header_end.end()
+    
+    def _detect_encoding(self):
+        """
+        Pick the charset of field values from the parsed header
+        
+        An explicit charset hint wins. ADIF 1.x/2.x predates Unicode support
+        and is read as single-byte text; everything else is read as UTF-8.
+        
+        Returns:
+            Python codec name
+        """
+        for field_name in self.CHARSET_HEADER_FIELDS:
+            hint = self.header.get(field_name)
+            if not hint:
+                continue
+            try:
+                encoding = codecs.lookup(hint).name
+            except LookupError:
+                continue
+            # Tags must still be plain ASCII bytes for the scanner to find them
+            if '<eor>'.encode(encoding) == b'<eor>':
+                return encoding
+        
+        major = self.header.get('adif_ver', '').split('.')[0].strip()
+        if major.isdigit() and int(major) < 3:
+            return self.FALLBACK_ENCODING
+        return 'utf-8'
+    
+    def _iter_buffer_blocks(self, buffer, pos):
+        """
+        Split a raw buffer into blocks of whole records for parallel parsing
+        
+        Args:
+            buffer: bytes or mmap of an ADIF file
+            pos: Offset of the first record
+            
+        Yields:
+            bytes blocks of roughly PARALLEL_BLOCK_SIZE
+        """
+        size = len(buffer)
+        while pos < size:
+            match = SAFE_EOR_BYTES_PATTERN.search(buffer, pos + self.PARALLEL_BLOCK_SIZE)
+            end = match.end() if match else size
+            yield buffer[pos:end]
+            pos = end
+    
+    def _iter_records_parallel(self, blocks):
+        """
+        Parse blocks of whole records in a process pool
+        
+        At most two blocks per worker are in flight, so memory stays bounded
+        while every core is kept busy.
+        
+        Args:
+            blocks: Iterable of text or bytes blocks without a header
+            
+        Yields:
+            Valid parsed QSO records in file order
+        """
+        parser_class = type(self)
+        pending = deque()
+        
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            for block in blocks:
+                pending.append(pool.submit(_parse_block, parser_class, block, self.encoding))
+                if len(pending) >= self.processes * 2:
+                    yield from pending.popleft().result()
+            
+            while pending:
+                yield from pending.popleft().result()
+    
+    def _iter_record_blocks(self, stream):
+        """
+        Split a stream into blocks of whole records for parallel parsing
+        
+        Blocks are cut after an <eor> that is followed by another tag or
+        the end of the data, so a literal '<eor>' inside a value is not
+        mistaken for a record boundary.
+        
+        Args:
+            stream: Binary or text file-like object
+            
+        Yields:
+            Strings, or bytes for a binary stream, of roughly
+            PARALLEL_BLOCK_SIZE characters
+        """
+        buffer = None
+        in_header = True
+        
+        for chunk in self._read_chunks(stream, self.PARALLEL_BLOCK_SIZE):
+            eof = not chunk
+            if buffer is None:
+                buffer = chunk[:0]
+            buffer += chunk
+            
+            if in_header:
+                pos = self._consume_header(buffer, eof)
+                if pos is None:
+                    continue
+                buffer = buffer[pos:]
+                in_header = False
+            
+            if eof:
+                if buffer.strip():
+                    yield buffer
+                return
+            
+            cut = self._find_block_end(buffer)
+            if cut is not None:
+                yield buffer[:cut]
+                buffer = buffer[cut:]
+    
+    def _find_block_end(self, buffer):
+        """
+        Find the offset just past the last safe <eor> in a buffer
+        
+        The tail of the buffer is searched first since that is where the
+        cut almost always is.
+        
+        Returns:
+            Offset to cut the buffer at, or None if it holds no safe <eor>
+        """
+        pattern = SAFE_EOR_PATTERN if isinstance(buffer, str) else SAFE_EOR_BYTES_PATTERN
+        cut = None
+        for search_from in (max(0, len(buffer) - self.STREAM_CHUNK_SIZE), 0):
+            for match in pattern.finditer(buffer, search_from):
+                cut = match.end()
+            if cut is not None or search_from == 0:
+                return cut
+    
+    def _read_chunks(self, stream, chunk_size):
+        """
+        Read a binary or text stream
+        
+        Bytes are left undecoded: which charset field values use is only
+        known once the header has been read, and declared lengths may count
+        bytes.
+        
+        Args:
+            stream: File-like object
+            chunk_size: Number of bytes to read per iteration
+            
+        Yields:
+            bytes or text chunks as read, followed by an empty chunk at end
+            of stream
+        """
+        while True:
+            chunk = stream.read(chunk_size)
+            if isinstance(chunk, (bytearray, memoryview)):
+                chunk = bytes(chunk)
+            yield chunk
+            if not chunk:
+                return
+    
+    def _consume_header(self, buffer, eof):
+        """
+        Parse the header at the start of a stream buffer
+        
+        A header ends at <eoh>; a record marker before any <eoh> means the
+        file has no header at all. The header of a bytes buffer also picks
+        the charset of its field values.
+        
+        Args:
+            buffer: Text or bytes read from the start of the stream so far
+            eof: True if the whole stream has been read
+            
+        Returns:
+            Offset of the first record, or None if more text is needed
+        """
+        if not isinstance(buffer, str):
+            if EOH_BYTES_PATTERN.search(buffer):
+                return self._consume_buffer_header(buffer)
+            if not eof and not EOR_BYTES_PATTERN.search(buffer):
+                return None
+            return 0
+        
+        header_end = EOH_PATTERN.search(buffer)
+        if header_end:
+            self.parse_header(buffer[:header_end.start()])
+            return header_end.end()
+        if not eof and not EOR_PATTERN.search(buffer):
+            return None
+        return 0
+    
     def parse_header(self, header_text):
         """
         Parse ADIF header section
@@ -140,13 +630,7 @@ class ADIFParser:
         Args:
             header_text: String containing header section
         """
-        pattern = r'<([^:>]+):(\d+)(?::([^>]+))?>([^<]*)'
-        matches = re.findall(pattern, header_text, re.IGNORECASE)
-        
-        for field_name, length, data_type, value in matches:
-            field_name = field_name.lower().strip()
-            length = int(length)
-            value = value[:length].strip()
+        for field_name, value in self.iter_fields(header_text):
             self.header[field_name] = value
     
     def parse_record(self, record_text):
@@ -159,107 +643,692 @@ class ADIFParser:
         Returns:
             Dictionary of field:value pairs
         """
-        # Pattern to match ADIF fields: <field:length[:type]>data
-        pattern = r'<([^:>]+):(\d+)(?::([^>]+))?>([^<]*)'
-        matches = re.findall(pattern, record_text, re.IGNORECASE)
-        
-        record = {}
-        additional_fields = {}
+        records, _ = self.scan_records(record_text)
+        return records[0] if records else {}
+    
+    def build_record(self, fields):
+        """
+        Build a record from (field_name, value) pairs exactly as the
+        tokenizer would, for sources that are not ADI text
         
-        for field_name, length, data_type, value in matches:
+        Args:
+            fields: Iterable of (field_name, value) pairs
+            
+        Returns:
+            Dictionary of field:value pairs
+        """
+        values = {}
+        for field_name, value in fields:
             field_name = field_name.lower().strip()
-            length = int(length)
-            value = value[:length].strip()
+            value = str(value).strip() if value is not None else ''
+            if field_name and value:
+                values[field_name] = value
+        
+        records = []
+        self._finish_record(records, values)
+        return records[0] if records else {}
+    
+    def scan_records(self, text, pos=0, final=True, end=None):
+        """
+        Tokenize ADIF records in a single pass over the buffer
+        
+        Most records are plain: their only '<' and '>' are tag brackets and
+        each value is exactly its declared length. Runs of those are split
+        a window at a time by _scan_plain_records, with a handful of string
+        operations per window rather than per field. Any other record is
+        read by _tokenize_record, which jumps each tag's declared length, so
+        values containing '<' are kept intact. A bytes-like buffer is
+        scanned as bytes and only ASCII windows and field values are decoded.
+        
+        Args:
+            text: String, bytes or mmap containing ADIF records (header
+                already removed)
+            pos: Offset to start scanning from
+            final: If False, an unterminated trailing record is left unparsed
+                so the caller can resume once more text is available
+            end: Offset to stop scanning at, defaults to the end of text
+            
+        Returns:
+            Tuple of (list of record dicts, offset just past the last
+            complete record)
+        """
+        text_length = len(text) if end is None else end
+        search = EOR_PATTERN.search if isinstance(text, str) else EOR_BYTES_PATTERN.search
+        window = self.PLAIN_WINDOW_SIZE
+        records = []
+        # Records left to tokenize before the plain path is tried again, and
+        # how many to leave after the next failed try
+        skip = backoff = 0
+        
+        while True:
+            if skip:
+                skip -= 1
+            else:
+                # Up to the first <eor> a window on, or the rest of the text
+                match = search(text, min(pos + window, text_length), text_length)
+                run_end = match.end() if match is not None else text_length
+                consumed = self._scan_plain_records(text[pos:run_end], records)
+                pos += consumed
+                if consumed:
+                    window = self.PLAIN_WINDOW_SIZE
+                    backoff = 0
+                    if pos == run_end and match is not None:
+                        continue
+                else:
+                    # Not even one plain record: try single records, less
+                    # and less often, so logs with none do not pay for it
+                    window = 0
+                    skip = backoff
+                    backoff = min(2 * backoff + 1, self.PLAIN_BACKOFF_LIMIT)
+            
+            # The record at pos is not plain, or was not tried
+            next_pos = self._tokenize_record(text, pos, text_length, final, records)
+            if next_pos is None:
+                break
+            pos = next_pos
+        
+        return records, text_length if final else pos
+    
+    def _scan_plain_records(self, segment, records):
+        """
+        Split the run of plain records segment starts with using bulk string
+        operations
+        
+        A record is only taken when the result is exactly what
+        _tokenize_record would give: every '<' opens a known field tag or
+        <eor>, no value contains '<' or '>' or starts with whitespace, and
+        every value without its trailing whitespace is its declared length.
+        The run ends before the first record that is not plain.
+        
+        Args:
+            segment: String, or bytes to be read as ASCII, starting at a
+                record
+            records: List the records are appended to
+            
+        Returns:
+            Length of the run of whole records collected, 0 if the first
+            record is not plain
+        """
+        if not isinstance(segment, str):
+            try:
+                segment = segment.decode('ascii')
+            except UnicodeDecodeError as error:
+                segment = segment[:error.start].decode('ascii')
+        
+        cut = len(segment)
+        for pattern in UNPLAIN_PATTERNS:
+            unplain = pattern.search(segment, 0, cut)
+            if unplain is not None:
+                cut = unplain.start()
+        if cut < len(segment):
+            segment = segment[:cut]
+        first_tag = segment.find('<')
+        if first_tag == -1 or segment.find('>', 0, first_tag) != -1:
+            return 0
+        
+        # '<' and '>' now alternate, so this alternates tags and values
+        parts = segment.replace('>', '<').split('<')
+        tags = parts[1::2]
+        values = list(map(str.rstrip, parts[2::2]))
+        lengths = list(map(self._plain_lengths.get, tags))
+        if None in lengths:
+            self._learn_plain_tags(tags)
+            lengths = list(map(self._plain_lengths.get, tags))
+        value_lengths = list(map(len, values))
+        
+        count = len(tags)
+        if value_lengths != lengths:
+            # Stop at the first tag that is unknown or whose value is not plain
+            mismatches = list(map(ne, value_lengths, lengths))
+            count = mismatches.index(True) if True in mismatches else len(values)
+            if not count:
+                return 0
+        
+        # Only whole records are taken
+        names = list(map(self._plain_names.get, tags))
+        if names[count - 1] is not END_OF_RECORD:
+            try:
+                count -= names[count - 1::-1].index(END_OF_RECORD)
+            except ValueError:
+                return 0
+        if count < len(names):
+            del names[count:], values[count:]
+            consumed = sum(map(len, parts[:2 * count])) + 2 * count
+        else:
+            consumed = len(segment) - len(parts[-1])
+        
+        # Logger exports repeat one layout; finish such runs a column at a time
+        width = names.index(END_OF_RECORD) + 1
+        record_count = count // width
+        if record_count >= self.BATCH_MIN_RECORDS and names[:width] * record_count == names:
+            layout = tuple(names[:width - 1])
+            if layout and len(set(layout)) == len(layout):
+                del values[width - 1::width]
+                self._finish_records(records, layout, values)
+                return consumed
+        
+        start = 0
+        next_record_end = names.index
+        while start < count:
+            stop = next_record_end(END_OF_RECORD, start)
+            self._finish_record(records, dict(zip(names[start:stop], values[start:stop])))
+            start = stop + 1
+        return consumed
+    
+    def _learn_plain_tags(self, tags):
+        """Add the field tags and <eor> markers among tags to the plain record tag tables"""
+        for tag in tags:
+            if tag in self._plain_names or len(self._plain_names) >= self.TAG_CACHE_SIZE:
+                continue
+            field_name, length = self._tag_cache.get(tag) or self._classify_tag(tag)
+            if length > 0:
+                self._plain_names[tag] = field_name
+                self._plain_lengths[tag] = length
+            elif length < 0 and field_name == 'eor':
+                self._plain_names[tag] = END_OF_RECORD
+                self._plain_lengths[tag] = 0
+    
+    def _tokenize_record(self, text, pos, text_length, final, records):
+        """
+        Read one record tag by tag
+        
+        Each <name:len[:type]> tag is read and the scanner then jumps exactly
+        len characters, so values containing '<' are kept intact and no
+        intermediate copies of the buffer are made.
+        
+        Args:
+            text: String, bytes or mmap being scanned
+            pos: Offset the record starts at
+            text_length: Offset to stop scanning at
+            final: If False, a record the text ends in is left unparsed
+            records: List the record is appended to
+            
+        Returns:
+            Offset just past the record's <eor>, or None if the text ended
+            first
+        """
+        find = text.find
+        tags = self._tag_cache
+        
+        if isinstance(text, str):
+            lt, gt, decode = '<', '>', None
+        else:
+            lt, gt, decode = b'<', b'>', self._decode_value
+        
+        fields = {}
+        
+        while True:
+            tag_start = find(lt, pos, text_length)
+            if tag_start == -1:
+                break
+            tag_end = find(gt, tag_start + 1, text_length)
+            if tag_end == -1:
+                break
+            
+            tag = text[tag_start + 1:tag_end]
+            info = tags.get(tag)
+            if info is None:
+                info = self._classify_tag(tag)
+            field_name, length = info
             
-            # Skip empty values
-            if not value:
+            if length < 0:
+                if field_name is None and lt in tag:
+                    # Stray '<' in free text; rescan from the innermost one
+                    pos = tag_start + 1 + tag.rfind(lt)
+                    continue
+                pos = tag_end + 1
+                if field_name == 'eor':
+                    self._finish_record(records, fields)
+                    return pos
                 continue
             
-            # Normalize certain fields
-            if field_name == 'band' or field_name == 'band_rx':
-                value = self.normalize_band(value)
-            elif field_name == 'mode' or field_name == 'submode':
-                value = self.normalize_mode(value)
+            value_start = tag_end + 1
+            pos = value_start + length
+            if pos > text_length:
+                if not final:
+                    return None
+                pos = text_length
             
-            # Store in appropriate location
-            if field_name in self.CORE_FIELDS:
-                record[field_name] = value
-            else:
-                # All other fields go to additional_fields
-                # This captures ALL ADIF fields not in core set
-                additional_fields[field_name] = value
+            value = text[value_start:pos]
+            if lt in value:
+                overrun = self._find_overrun(text, value_start, pos)
+                if overrun != -1:
+                    value = text[value_start:overrun]
+                    pos = overrun
+            
+            if decode is not None:
+                try:
+                    value = value.decode('ascii')
+                except UnicodeDecodeError:
+                    value, pos = decode(text, value_start, pos, length, value)
+            
+            value = value.strip()
+            if value:
+                fields[field_name] = value
         
-        # Always include additional_fields even if empty for consistency
-        if additional_fields:
-            record['additional_fields'] = additional_fields
+        if final:
+            self._finish_record(records, fields)
+        return None
+    
+    def iter_fields(self, text):
+        """
+        Yield (field_name, value) pairs from ADIF text without normalization
         
-        # Generate hash for deduplication
-        if record:
-            record['qso_hash'] = self.generate_qso_hash(record)
+        Args:
+            text: String containing ADIF fields
+        """
+        pos = 0
+        while True:
+            tag_start = text.find('<', pos)
+            if tag_start == -1:
+                return
+            tag_end = text.find('>', tag_start + 1)
+            if tag_end == -1:
+                return
+            
+            tag = text[tag_start + 1:tag_end]
+            field_name, length = self._tag_cache.get(tag) or self._classify_tag(tag)
+            if length < 0:
+                if field_name is None and '<' in tag:
+                    pos = tag_start + 1 + tag.rfind('<')
+                else:
+                    pos = tag_end + 1
+                continue
+            
+            pos = tag_end + 1 + length
+            value_end = pos
+            if '<' in text[tag_end + 1:pos]:
+                overrun = self._find_overrun(text, tag_end + 1, pos)
+                if overrun != -1:
+                    value_end = pos = overrun
+            yield field_name, text[tag_end + 1:value_end].strip()
+    
+    def _classify_tag(self, tag):
+        """
+        Decode the text between '<' and '>' into a field name and length
         
-        return record
+        Args:
+            tag: Tag text such as 'CALL:5', 'QSO_DATE:8:D' or 'EOR', as a
+                string or as raw bytes
+            
+        Returns:
+            Tuple of (field_name, length); length is -1 for markers such as
+            eor/eoh and field_name is None for text that is not a valid tag
+        """
+        key = tag
+        if not isinstance(tag, str):
+            tag = tag.decode('latin-1')
+        
+        parts = tag.split(':')
+        field_name = parts[0].strip().lower()
+        
+        if len(parts) == 1:
+            if not field_name.isalnum():
+                return (None, -1)
+            info = (field_name, -1)
+        else:
+            length = parts[1].strip()
+            if not field_name or '<' in tag or not length.isdigit():
+                return (None, -1)
+            info = (field_name, int(length))
+        
+        if len(self._tag_cache) < self.TAG_CACHE_SIZE:
+            self._tag_cache[key] = info
+        return info
+    
+    def _decode_value(self, buffer, start, end, length, raw):
+        """
+        Decode a non-ASCII field value scanned from raw bytes
+        
+        ADIF 3 loggers disagree on whether the declared length of a UTF-8
+        value counts bytes or characters. Non-ASCII values are therefore
+        read up to the next tag and cut at length characters, which gives
+        the right value either way; bytes that are not valid UTF-8 are read
+        with FALLBACK_ENCODING instead of being dropped.
+        
+        Args:
+            buffer: Buffer being scanned
+            start: Offset of the first value byte
+            end: Offset just past the value as scanned
+            length: Declared value length
+            raw: buffer[start:end], containing non-ASCII bytes
+            
+        Returns:
+            Tuple of (decoded value, offset just past the value)
+        """
+        if self.encoding != 'utf-8':
+            return raw.decode(self.encoding, errors='replace'), end
+        
+        cap = start + length * 4
+        limit = buffer.find(b'<', end, cap)
+        if limit == -1:
+            limit = min(len(buffer), cap)
+            # A character split by the cap is not an error
+            final = limit == len(buffer)
+        else:
+            final = True
+        try:
+            value = codecs.getincrementaldecoder('utf-8')().decode(buffer[start:limit], final)
+        except UnicodeDecodeError:
+            return raw.decode(self.FALLBACK_ENCODING, errors='replace'), end
+        
+        value = value[:length]
+        return value, start + len(value.encode('utf-8'))
+    
+    def _find_overrun(self, text, start, end):
+        """
+        Find where a value whose declared length is too long runs into the
+        next tag, as happens with hand-edited logs
+        
+        Args:
+            text: Buffer being scanned
+            start: Offset of the first value character
+            end: Offset just past the declared value length
+            
+        Returns:
+            Offset of the '<' starting the next tag, or -1 if the '<'
+            characters in the value are ordinary data
+        """
+        lt, gt = ('<', '>') if isinstance(text, str) else (b'<', b'>')
+        tag_start = text.find(lt, start, end)
+        while tag_start != -1:
+            tag_end = text.find(gt, tag_start + 1)
+            if tag_end == -1:
+                return -1
+            tag = text[tag_start + 1:tag_end]
+            field_name, length = self._tag_cache.get(tag) or self._classify_tag(tag)
+            if length >= 0 or field_name in ('eor', 'eoh'):
+                return tag_start
+            tag_start = text.find(lt, tag_start + 1, end)
+        return -1
+    
+    def _finish_record(self, records, fields):
+        """
+        Normalize, hash and derive the columns of one record and collect it
+        as a QSORecord, as _finish_records does for a run of records
+        
+        Args:
+            records: List the record is appended to
+            fields: Dictionary of field name -> stripped, non-empty value as
+                logged; consumed by this call
+        """
+        if not fields:
+            return
+        get = fields.get
+        
+        band = get('band')
+        for name, lookup, normalize in self._normalized_columns:
+            value = get(name)
+            if value is not None:
+                fields[name] = lookup.get(value) or normalize(value)
+        
+        # Hashed with the band as logged; see qso_digest
+        digest = self.qso_digest(fields, band)
+        
+        # Bands are derived after hashing so stored qso_hash values of
+        # freq-only logs stay stable
+        freq = get('freq')
+        if band is None and freq is not None:
+            derived = self.band_from_freq(freq)
+            if derived:
+                fields['band'] = derived
+        if 'band_rx' not in fields and 'freq_rx' in fields:
+            derived = self.band_from_freq(fields['freq_rx'])
+            if derived:
+                fields['band_rx'] = derived
+        
+        # Typed copies of the date, time and frequency for range queries
+        qso_start = qso_start_from(get('qso_date'), get('time_on'))
+        freq_mhz = self._freq_mhz_from(freq) if freq is not None else None
+        call = get('call')
+        
+        # What is left after the core fields are taken is additional_fields
+        pop = fields.pop
+        records.append(_qso_record_from_values((
+            *map(pop, self.CORE_FIELD_ORDER, repeat(None)),
+            fields or None,
+            digest.hex(),
+            digest[:self.FINGERPRINT_SIZE],
+            qso_start,
+            freq_mhz,
+            base_call_from(call) if call else None
+        )))
+    
+    def _finish_records(self, records, layout, values):
+        """
+        Normalize, hash and derive the columns of records that share one
+        field layout and collect them as QSORecords
+        
+        Each step runs over a whole column of values, as a few C-level
+        passes rather than a Python loop per record, which is most of what
+        makes plain logger exports fast to parse.
+        
+        Args:
+            records: List the records are appended to
+            layout: Tuple of the records' distinct field names
+            values: Stripped, non-empty values as logged, len(layout) per
+                record, one record after another
+        """
+        width = len(layout)
+        count = len(values) // width
+        columns = {name: values[index::width] for index, name in enumerate(layout)}
+        get = columns.get
+        
+        bands = get('band')
+        for name, lookup, normalize in self._normalized_columns:
+            column = get(name)
+            if column is not None:
+                normalized = list(map(lookup.get, column))
+                if None in normalized:
+                    normalized = list(map(normalize, column))
+                columns[name] = normalized
+        
+        # Hashed with the band as logged, exactly as qso_digest does
+        calls = get('call')
+        stations = get('station_callsign')
+        if bands:
+            legacy_bands = {band: legacy_band_from(band) for band in set(bands)}
+            hashed_bands = map(legacy_bands.__getitem__, bands)
+        else:
+            hashed_bands = get('freq') or repeat('', count)
+        hash_strings = map('|'.join, zip(
+            map(str.upper, calls) if calls else repeat('', count),
+            get('qso_date') or repeat('', count),
+            get('time_on') or repeat('', count),
+            hashed_bands,
+            get('mode') or repeat('', count),
+            map(str.upper, stations) if stations else repeat('', count)
+        ))
+        digests = list(map(methodcaller('digest'), map(sha256, map(str.encode, hash_strings))))
+        
+        # Bands are derived after hashing so stored qso_hash values of
+        # freq-only logs stay stable
+        freqs = get('freq')
+        if bands is None and freqs is not None:
+            columns['band'] = list(map(self.band_from_freq, freqs))
+        derived_band_rx = 'band_rx' not in columns and 'freq_rx' in columns
+        if derived_band_rx:
+            columns['band_rx'] = list(map(self.band_from_freq, columns['freq_rx']))
+        
+        # Typed copies of the date, time and frequency for range queries
+        qso_dates = get('qso_date')
+        times_on = get('time_on')
+        if qso_dates and times_on:
+            qso_starts = qso_starts_from(qso_dates, times_on)
+        else:
+            qso_starts = repeat(None, count)
+        if freqs is not None:
+            freqs_mhz = list(map(self._freq_mhz.get, freqs))
+            if None in freqs_mhz:
+                freqs_mhz = list(map(self._freq_mhz_from, freqs))
+        else:
+            freqs_mhz = repeat(None, count)
+        if calls is None:
+            base_calls = repeat(None, count)
+        elif '/' in ''.join(calls):
+            base_calls = map(base_call_from, calls)
+        else:
+            base_calls = map(str.upper, calls)
+        
+        # Everything outside the core fields goes to additional_fields
+        extra_names = [name for name in columns if name not in self.CORE_FIELDS]
+        if extra_names:
+            additional = list(map(dict, map(zip, repeat(extra_names), zip(*map(columns.get, extra_names)))))
+            if derived_band_rx and None in columns['band_rx']:
+                for fields in additional:
+                    if fields['band_rx'] is None:
+                        del fields['band_rx']
+        else:
+            additional = repeat(None, count)
+        
+        size = self.FINGERPRINT_SIZE
+        records.extend(map(_qso_record_from_values, zip(
+            *[get(name) or repeat(None, count) for name in self.CORE_FIELD_ORDER],
+            additional,
+            map(bytes.hex, digests),
+            [digest[:size] for digest in digests],
+            qso_starts,
+            freqs_mhz,
+            base_calls
+        )))
+    
+    def _freq_mhz_from(self, freq):
+        """freq_mhz_from, remembering results since logs repeat a few frequencies"""
+        freq_mhz = self._freq_mhz.get(freq)
+        if freq_mhz is None:
+            freq_mhz = freq_mhz_from(freq)
+            if freq_mhz is not None and len(self._freq_mhz) < self.TAG_CACHE_SIZE:
+                self._freq_mhz[freq] = freq_mhz
+        return freq_mhz
     
     def normalize_band(self, band):
         """Normalize band value to ADIF 3.1.6 standard"""
-        band = band.upper().strip()
-        # Convert common variations
-        if band == '20M' or band == '20':
-            return '20m'
-        if band == '40M' or band == '40':
-            return '40m'
-        if band == '80M' or band == '80':
-            return '80m'
-        if band == '2M' or band == '2':
-            return '2m'
-        if band == '70CM' or band == '70':
-            return '70cm'
-        # Return as lowercase for consistency
-        return band.lower()
+        normalized = BAND_LOOKUP.get(band)
+        if normalized is None:
+            band = band.strip().lower().replace(' ', '')
+            normalized = BAND_LOOKUP.get(band, band)
+        return normalized
     
     def normalize_mode(self, mode):
         """Normalize mode value to ADIF 3.1.6 standard"""
-        mode = mode.upper().strip()
-        # Handle common variations
-        if mode in ['USB', 'LSB']:
-            return 'SSB'
-        return mode
+        normalized = MODE_LOOKUP.get(mode)
+        if normalized is None:
+            mode = mode.upper().strip()
+            normalized = MODE_LOOKUP.get(mode, mode)
+        return normalized
+    
+    def band_from_freq(self, freq):
+        """
+        Look up the ADIF band containing a frequency
+        
+        Args:
+            freq: Frequency in MHz, as a string or number
+            
+        Returns:
+            Band name, or None if the frequency is invalid or outside the band plan
+        """
+        try:
+            freq = float(freq)
+        except (TypeError, ValueError):
+            return None
+        
+        index = bisect_right(BAND_PLAN_STARTS, freq) - 1
+        if index >= 0 and freq <= BAND_PLAN_ENDS[index]:
+            return BAND_PLAN_NAMES[index]
+        return None
     
     def validate_record(self, record):
         """
         Validate that record has minimum required fields
         
+        A record can pass without qso_start, when its qso_date or time_on
+        is not a real date or time; it cannot be stored, and the ingest
+        paths count it as an error.
+        
         Args:
             record: Dictionary of QSO data
             
         Returns:
             Boolean indicating if record is valid
         """
+        if isinstance(record, QSORecord):
+            # Unset slots are None; read them without going through get
+            return record.qso_date is not None and record.time_on is not None and record.call is not None
         required_fields = ['qso_date', 'time_on', 'call']
         return all(field in record for field in required_fields)
     
-    def generate_qso_hash(self, record):
+    def qso_digest(self, record, band=None):
         """
-        Generate unique hash for QSO to enable deduplication
-        Uses: callsign, date, time, band/freq, mode
+        Compute the SHA-256 digest that identifies a QSO for deduplication
+        Uses: callsign, date, time, band/freq, mode, station callsign
+        
+        The band is hashed as legacy_band_from spells it, not as
+        normalize_band does, so a log stored before the band lookup tables
+        gets the same hashes when it is uploaded again.
         
         Args:
             record: Dictionary of QSO data
+            band: The band as spelled in the log, before normalize_band;
+                defaults to the record's band
             
         Returns:
-            SHA256 hash string
+            32-byte SHA256 digest
         """
+        get = record.get
+        if band is None:
+            band = get('band')
+        
         # Create normalized string for hashing
-        hash_components = [
-            record.get('call', '').upper(),
-            record.get('qso_date', ''),
-            record.get('time_on', ''),
-            record.get('band', record.get('freq', '')),
-            record.get('mode', ''),
-            record.get('station_callsign', '').upper()
-        ]
+        hash_components = (
+            get('call', '').upper(),
+            get('qso_date', ''),
+            get('time_on', ''),
+            legacy_band_from(band) if band else get('freq', ''),
+            get('mode', ''),
+            get('station_callsign', '').upper()
+        )
         
         hash_string = '|'.join(hash_components)
-        return hashlib.sha256(hash_string.encode()).hexdigest()
+        return sha256(hash_string.encode()).digest()
+    
+    def generate_qso_hash(self, record, band=None):
+        """
+        Generate unique hash for QSO to enable deduplication
+        
+        Args:
+            record: Dictionary of QSO data
+            band: The band as spelled in the log, see qso_digest
+            
+        Returns:
+            SHA256 hash string
+        """
+        return self.qso_digest(record, band).hex()
+    
+    def generate_qso_fingerprint(self, record, band=None):
+        """
+        Generate the compact binary dedup key stored in qso_fingerprint
+        
+        Args:
+            record: Dictionary of QSO data
+            band: The band as spelled in the log, see qso_digest
+            
+        Returns:
+            First FINGERPRINT_SIZE bytes of the QSO's SHA256 digest
+        """
+        return self.qso_digest(record, band)[:self.FINGERPRINT_SIZE]
+    
+    @classmethod
+    def fingerprint_from_hash(cls, qso_hash):
+        """
+        Convert a hex qso_hash into its binary fingerprint
+        
+        Args:
+            qso_hash: 64-character hex SHA256 string
+            
+        Returns:
+            Fingerprint bytes matching generate_qso_fingerprint
+        """
+        return bytes.fromhex(qso_hash[:cls.FINGERPRINT_SIZE * 2])
     
     def get_statistics(self):
         """
@@ -307,3 +1376,321 @@ class ADIFParser:
             'modes': modes,
             'date_range': date_range
         }
+
+
+class QSORecord:
+    """
+    Compact parsed QSO shared by the parse, hash, dedup and insert stages
+    
+    Core fields live in fixed slots and everything else in one sparse
+    additional_fields dict, which takes far less memory than a dict per
+    record. Read access mirrors a dict of the fields that are set, so
+    record['call'], record.get('band') and 'freq' in record all work;
+    other names are read from and written to additional_fields.
+    """
+    
+    FIELDS = ADIFParser.CORE_FIELD_ORDER + (
+        'additional_fields', 'qso_hash', 'qso_fingerprint', 'qso_start', 'freq_mhz', 'base_call'
+    )
+    __slots__ = FIELDS
+    
+    def __init__(self, fields=None):
+        for name in self.FIELDS:
+            setattr(self, name, None)
+        if fields:
+            for name, value in fields.items():
+                self[name] = value
+    
+    @classmethod
+    def from_slots(cls, fields):
+        """
+        Build a record from a dict whose keys are all slot names, as the
+        tokenizer produces, without routing each one through __setitem__
+        
+        Args:
+            fields: Dictionary of slot name -> value
+            
+        Returns:
+            QSORecord
+        """
+        record = cls.__new__(cls)
+        for name in cls.FIELDS:
+            setattr(record, name, None)
+        for name, value in fields.items():
+            setattr(record, name, value)
+        return record
+    
+    def __getitem__(self, name):
+        value = self.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+    
+    def __setitem__(self, name, value):
+        if name in _QSO_SLOTS:
+            setattr(self, name, value)
+        else:
+            if self.additional_fields is None:
+                self.additional_fields = {}
+            self.additional_fields[name] = value
+    
+    def __contains__(self, name):
+        return self.get(name) is not None
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def __len__(self):
+        return len(self.keys())
+    
+    def __eq__(self, other):
+        if isinstance(other, (QSORecord, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+    
+    def __repr__(self):
+        return f'QSORecord({self.to_dict()!r})'
+    
+    def __reduce__(self):
+        # Pickle as a plain tuple of slot values for process pool transfer
+        return (_qso_record_from_values, (tuple(getattr(self, name) for name in self.FIELDS),))
+    
+    def get(self, name, default=None):
+        if name in _QSO_SLOTS:
+            value = getattr(self, name)
+        elif self.additional_fields is not None:
+            value = self.additional_fields.get(name)
+        else:
+            value = None
+        return default if value is None else value
+    
+    def keys(self):
+        return [name for name in self.FIELDS if getattr(self, name) is not None]
+    
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.keys()]
+    
+    def to_dict(self):
+        """Return the set fields as a plain dict"""
+        return dict(self.items())
+    
+    def to_row(self, user_id):
+        """
+        Return a parameter row for inserting into log_entries
+        
+        Args:
+            user_id: Owner of the log entry
+            
+        Returns:
+            Dictionary with a value (possibly None) for every LogEntry column
+            populated at upload
+        """
+        row = {name: getattr(self, name) for name in self.FIELDS}
+        row['user_id'] = user_id
+        return row
+
+
+_QSO_SLOTS = frozenset(QSORecord.FIELDS)
+
+
+def _qso_record_from_values(values):
+    """
+    Build a QSORecord from a tuple of slot values in QSORecord.FIELDS order,
+    as written by QSORecord.__reduce__ and by the tokenizer
+    """
+    record = QSORecord.__new__(QSORecord)
+    (record.qso_date, record.time_on, record.call, record.band, record.mode, record.freq,
+     record.rst_sent, record.rst_rcvd, record.qso_date_off, record.time_off,
+     record.station_callsign, record.my_gridsquare, record.gridsquare, record.name,
+     record.qth, record.comment, record.additional_fields, record.qso_hash,
+     record.qso_fingerprint, record.qso_start, record.freq_mhz, record.base_call) = values
+    return record
+
+
+# freq_mhz is NUMERIC(12, 6): whole Hz, below 1 THz
+FREQ_MHZ_STEP = Decimal('0.000001')
+FREQ_MHZ_LIMIT = Decimal(1000000)
+
+
+def qso_start_from(qso_date, time_on):
+    """
+    Combine ADIF QSO_DATE and TIME_ON into the UTC time the QSO started
+    
+    Args:
+        qso_date: Date as YYYYMMDD
+        time_on: Time as HHMM or HHMMSS
+        
+    Returns:
+        Timezone-aware datetime, or None if either is malformed or not a
+        real date or time
+    """
+    if not qso_date or not time_on or len(qso_date) != 8 or len(time_on) not in (4, 6):
+        return None
+    digits = qso_date + time_on
+    if not digits.isascii() or not digits.isdigit():
+        return None
+    try:
+        # fromisoformat reads the ISO basic format the ADIF fields already
+        # are, in C, several times faster than six int() calls
+        return datetime.fromisoformat(f'{qso_date}T{time_on}Z')
+    except ValueError:
+        return None
+
+
+def qso_starts_from(qso_dates, times_on):
+    """
+    qso_start_from for lists of dates and times, checked and parsed a
+    list at a time
+    
+    Args:
+        qso_dates: List of dates as YYYYMMDD
+        times_on: List of times as HHMM or HHMMSS, one per date
+        
+    Returns:
+        List of timezone-aware datetimes or None, as qso_start_from gives
+    """
+    digits = ''.join(qso_dates) + ''.join(times_on)
+    if (digits.isascii() and digits.isdigit() and set(map(len, qso_dates)) == {8}
+            and set(map(len, times_on)) <= {4, 6}):
+        try:
+            return list(map(datetime.fromisoformat, map('{}T{}Z'.format, qso_dates, times_on)))
+        except ValueError:
+            pass
+    return list(map(qso_start_from, qso_dates, times_on))
+
+
+def freq_mhz_from(freq):
+    """
+    Read an ADIF FREQ value as an exact number of MHz
+    
+    Args:
+        freq: Frequency in MHz, as a string or number
+        
+    Returns:
+        Decimal rounded to 1 Hz, or None if the frequency is not a number
+        that fits log_entries.freq_mhz
+    """
+    if freq is None:
+        return None
+    if not isinstance(freq, str):
+        freq = str(freq)
+    try:
+        value = Decimal(freq.strip()).quantize(FREQ_MHZ_STEP)
+        if 0 <= value < FREQ_MHZ_LIMIT:
+            return value
+    except InvalidOperation:
+        pass
+    return None
+
+
+def base_call_from(call):
+    """
+    Strip portable designators from a callsign, e.g. W1/DL1ABC/P to DL1ABC
+    
+    The base call is the longest /-separated part with both letters and
+    digits, so country prefixes (W1/, VP2E/) and suffixes such as /P, /M,
+    /MM, /QRP or /4 are dropped.
+    
+    Args:
+        call: Callsign as logged
+        
+    Returns:
+        Uppercase base callsign
+    """
+    call = call.strip().upper()
+    if '/' not in call:
+        return call
+    parts = [part for part in call.split('/') if part]
+    if len(parts) < 2:
+        return parts[0] if parts else call
+    callsigns = [
+        part for part in parts
+        if any(c.isdigit() for c in part) and any(c.isalpha() for c in part)
+    ]
+    return max(callsigns or parts, key=len)
+
+
+
+# Band spellings the parser rewrote before the lookup tables; anything else
+# was only lowercased
+LEGACY_BAND_SPELLINGS = {
+    '20M': '20m', '20': '20m', '40M': '40m', '40': '40m', '80M': '80m', '80': '80m',
+    '2M': '2m', '2': '2m', '70CM': '70cm', '70': '70cm'
+}
+
+
+def legacy_band_from(band):
+    """
+    Normalize a band the way the parser did before normalize_band used
+    BAND_LOOKUP, for computing dedup hashes that match stored rows
+    
+    Args:
+        band: Band as spelled in the log
+        
+    Returns:
+        Band spelling the dedup hash is computed from
+    """
+    band = band.upper().strip()
+    return LEGACY_BAND_SPELLINGS.get(band) or band.lower()
+
+
+def _build_band_lookup(band_values):
+    """
+    Map every common spelling of each ADIF band to its canonical name
+    
+    Covers case variants, a space before the unit ('20 m') and bare metre
+    numbers ('20'), plus '70' for 70cm which older loggers emit.
+    """
+    lookup = {}
+    for band in band_values:
+        for spelling in (band, band.upper(), band.capitalize()):
+            lookup[spelling] = band
+        
+        match = re.match(r'([\d.]+)(m|cm|mm)$', band)
+        if match:
+            number, unit = match.groups()
+            lookup[f'{number} {unit}'] = band
+            lookup[f'{number} {unit.upper()}'] = band
+            if unit == 'm':
+                lookup[number] = band
+    
+    lookup['70'] = '70cm'
+    return {sys.intern(spelling): sys.intern(band) for spelling, band in lookup.items()}
+
+
+def _build_mode_lookup(mode_values, aliases):
+    """Map every common spelling of each ADIF mode (and alias) to its canonical name"""
+    lookup = {}
+    for spelling, mode in [(mode, mode) for mode in mode_values] + list(aliases.items()):
+        for variant in (spelling, spelling.lower(), spelling.capitalize()):
+            lookup[variant] = mode
+    return {sys.intern(spelling): sys.intern(mode) for spelling, mode in lookup.items()}
+
+
+# Precomputed normalization tables, so normalizing a field is one dict hit
+BAND_LOOKUP = _build_band_lookup(ADIFParser.BAND_VALUES)
+MODE_LOOKUP = _build_mode_lookup(ADIFParser.MODE_VALUES, ADIFParser.MODE_ALIASES)
+
+# Band plan as parallel sorted lists for bisect lookups of freq -> band
+_band_plan = sorted(ADIFParser.BAND_PLAN, key=lambda entry: entry[1])
+BAND_PLAN_STARTS = [low for _, low, _ in _band_plan]
+BAND_PLAN_ENDS = [high for _, _, high in _band_plan]
+BAND_PLAN_NAMES = [sys.intern(band) for band, _, _ in _band_plan]
+
+
+def _parse_block(parser_class, block, encoding='utf-8'):
+    """
+    Parse a block of whole ADIF records in a worker process
+    
+    Args:
+        parser_class: ADIFParser (or subclass) to tokenize, normalize and hash with
+        block: String or bytes of complete records without a header
+        encoding: Charset of field values in a bytes block
+        
+    Returns:
+        List of valid parsed QSO records
+    """
+    parser = parser_class(processes=1)
+    parser.encoding = encoding
+    records, _ = parser.scan_records(block)
+    return [record for record in records if parser.validate_record(record)]
@@ -3,21 +3,72 @@ LogShackBaby - Amateur Radio Log Server
 Main Flask application
 """
 import os
-from flask import Flask, request, jsonify, send_from_directory
+import mmap
+import click
+import multiprocessing
+from flask import Flask, Request, request, jsonify, send_from_directory, current_app
 from flask_cors import CORS
+from werkzeug.http import parse_content_range_header
+from werkzeug.utils import cached_property
+from werkzeug.wsgi import get_input_stream
 from dotenv import load_dotenv
+from sqlalchemy import inspect, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
 from functools import wraps
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from models import db, User, APIKey, LogEntry, UploadLog, Session, ReportTemplate
 from auth import AuthManager
-from adif_parser import ADIFParser
+from adif_parser import ADIFParser, freq_mhz_from
+from adx_parser import ADXParser, is_adx
+from log_ingest import BulkIngest, CopyIngest
+from qso_filter import QSOFilterCache
+from live_ingest import GroupCommitter, GroupCommitTimeout, oversized_fields
+from upload_jobs import (
+    spool_upload, new_spool_path, locked_spool, append_chunk, ChunkInProgress,
+    file_digest, find_grown_upload, run_worker
+)
+from udp_listener import UDPListener
+from pagination import InvalidCursor, paginate_logs, estimate_count
+from serializers import LOG_FIELDS, ADMIN_LOG_FIELDS, project_logs, log_dicts, json_response
+from callsign_search import filter_callsign
+from migrations import (
+    MIGRATIONS, applied_migrations, pending_migrations, apply_migration, mark_all_applied
+)
+from upload_codecs import (
+    CONTENT_ENCODINGS, DecompressionError, DecompressedSizeExceeded,
+    detect_compression, open_decompressed
+)
 
 # Load environment variables
 load_dotenv()
 
+# Endpoints that stream their request body instead of buffering it
+STREAMING_UPLOAD_ENDPOINTS = {'upload_log'}
+
+
+class LogShackRequest(Request):
+    """Request that allows larger, compressed bodies on streaming upload endpoints"""
+    
+    @property
+    def max_content_length(self):
+        if self.endpoint in STREAMING_UPLOAD_ENDPOINTS:
+            return current_app.config['MAX_UPLOAD_LENGTH']
+        return super().max_content_length
+    
+    @cached_property
+    def stream(self):
+        """The input stream, decompressed as it is read when the upload has a Content-Encoding"""
+        stream = get_input_stream(self.environ, max_content_length=self.max_content_length)
+        compression = CONTENT_ENCODINGS.get((self.content_encoding or '').strip().lower())
+        if compression and self.endpoint in STREAMING_UPLOAD_ENDPOINTS:
+            return open_decompressed(stream, compression, current_app.config['MAX_DECOMPRESSED_LENGTH'])
+        return stream
+
+
 # Initialize Flask app
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
+app.request_class = LogShackRequest
 CORS(app)
 
 # Configuration
@@ -27,11 +78,47 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv(
 )
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'change-this-in-production')
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size
+# ADIF uploads are parsed as a stream, so they may be much larger
+app.config['MAX_UPLOAD_LENGTH'] = int(os.getenv('MAX_UPLOAD_MB', '512')) * 1024 * 1024
+# Compressed uploads are decompressed while parsed, up to this size
+app.config['MAX_DECOMPRESSED_LENGTH'] = int(os.getenv('MAX_DECOMPRESSED_MB', '4096')) * 1024 * 1024
+app.config['UPLOAD_COMMIT_BATCH'] = int(os.getenv('UPLOAD_COMMIT_BATCH', '1000'))
+# Uploads at least this large are loaded with COPY through a staging table
+app.config['COPY_INGEST_THRESHOLD'] = int(os.getenv('COPY_INGEST_MB', '64')) * 1024 * 1024
+# Uploads at least this large are parsed and hashed across a process pool
+app.config['PARALLEL_PARSE_THRESHOLD'] = int(os.getenv('PARALLEL_PARSE_MB', '32')) * 1024 * 1024
+app.config['PARSE_PROCESSES'] = int(os.getenv('PARSE_PROCESSES', '0')) or os.cpu_count() or 1
+# Uploads are saved here until an upload worker ingests them
+app.config['UPLOAD_SPOOL_DIR'] = os.getenv(
+    'UPLOAD_SPOOL_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+)
+# Upload jobs without a worker heartbeat for this long are picked up again
+app.config['UPLOAD_JOB_STALE_SECONDS'] = int(os.getenv('UPLOAD_JOB_STALE_SECONDS', '300'))
+app.config['UPLOAD_HEARTBEAT_SECONDS'] = 30
+# Upload sessions are ingested each time this much more has arrived
+app.config['UPLOAD_SESSION_SLICE'] = int(os.getenv('UPLOAD_SESSION_SLICE_MB', '4')) * 1024 * 1024
+# Upload sessions without a chunk for this long are discarded
+app.config['UPLOAD_SESSION_EXPIRE_SECONDS'] = int(os.getenv('UPLOAD_SESSION_EXPIRE_HOURS', '24')) * 3600
+# Users whose fingerprint filters each process keeps in memory; 0 disables them
+app.config['QSO_FILTER_USERS'] = int(os.getenv('QSO_FILTER_USERS', '64'))
+# Live QSOs submitted within this window share one transaction
+app.config['LIVE_COMMIT_WINDOW_MS'] = int(os.getenv('LIVE_COMMIT_WINDOW_MS', '5'))
+# Most QSOs accepted per live submission; larger logs go through upload
+app.config['LIVE_MAX_QSOS'] = int(os.getenv('LIVE_MAX_QSOS', '100'))
+# Most log entries returned per page by the log listing endpoints
+app.config['LOG_PAGE_MAX'] = int(os.getenv('LOG_PAGE_MAX', '500'))
 
 # Initialize database
 db.init_app(app)
 
+# Per-user fingerprint filters for upload dedup, kept for the life of this process
+qso_filters = QSOFilterCache(app.config['QSO_FILTER_USERS'])
+
+# Group commit of live QSO submissions, one committer thread per process
+live_committer = GroupCommitter(app, window=app.config['LIVE_COMMIT_WINDOW_MS'] / 1000)
+
 
 def require_auth(f):
     """Decorator to require session authentication"""
@@ -85,6 +172,16 @@ def require_api_key(f):
     return decorated_function
 
 
+def require_auth_or_api_key(f):
+    """Decorator to accept either an API key or session authentication"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if request.headers.get('X-API-Key'):
+            return require_api_key(f)(*args, **kwargs)
+        return require_auth(f)(*args, **kwargs)
+    return decorated_function
+
+
 def require_role(role):
     """Decorator to require a specific role"""
     def decorator(f):
@@ -385,156 +482,485 @@ def delete_api_key(key_id):
 @app.route('/api/logs/upload', methods=['POST'])
 @require_api_key
 def upload_log():
-    """Upload ADIF log file"""
-    if 'file' not in request.files:
+    """Upload ADIF (.adi) or ADX (.adx) log file, optionally gzip, zstd or zip compressed"""
+    encoding = (request.content_encoding or 'identity').strip().lower()
+    if encoding != 'identity' and encoding not in CONTENT_ENCODINGS:
+        return jsonify({'error': f'Unsupported Content-Encoding: {encoding}'}), 415
+    
+    # A compressed request body is decompressed while the form is parsed
+    try:
+        files = request.files
+    except DecompressedSizeExceeded as e:
+        return jsonify({'error': str(e)}), 413
+    except DecompressionError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if 'file' not in files:
         return jsonify({'error': 'No file provided'}), 400
     
-    file = request.files['file']
+    file = files['file']
     
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
     
     user = request.current_user
     
-    # Create upload log entry
+    # Save the file for an upload worker; parsing happens outside the request
+    try:
+        spool_path, file_size, content_digest = spool_upload(file, app.config['UPLOAD_SPOOL_DIR'])
+    except OSError as e:
+        return jsonify({'error': f'Upload failed: {str(e)}'}), 500
+    
+    # Logging programs that sync on a schedule send the same file again and
+    # again; answer an unchanged one from the upload that ingested it
+    previous = UploadLog.query.filter_by(
+        user_id=user.id,
+        content_digest=content_digest,
+        file_size=file_size,
+        status='completed'
+    ).order_by(UploadLog.id.desc()).first()
+    if previous:
+        os.remove(spool_path)
+        upload_log = UploadLog(
+            user_id=user.id,
+            filename=file.filename,
+            status='completed',
+            file_size=file_size,
+            content_digest=content_digest,
+            total_records=previous.total_records,
+            new_records=0,
+            duplicate_records=(previous.new_records or 0) + (previous.duplicate_records or 0),
+            error_records=previous.error_records,
+            completed_at=datetime.utcnow()
+        )
+        db.session.add(upload_log)
+        db.session.commit()
+        
+        return jsonify({
+            'message': f'Identical to upload {previous.id}, nothing new',
+            'upload_id': upload_log.id,
+            'status': upload_log.status,
+            'status_url': f'/api/uploads/{upload_log.id}'
+        }), 200
+    
+    # Create upload log entry, which doubles as the queued job
     upload_log = UploadLog(
         user_id=user.id,
         filename=file.filename,
-        status='processing'
+        status='queued',
+        spool_path=spool_path,
+        file_size=file_size,
+        content_digest=content_digest
     )
     db.session.add(upload_log)
     db.session.commit()
     
+    return jsonify({
+        'message': 'Upload queued',
+        'upload_id': upload_log.id,
+        'status': upload_log.status,
+        'status_url': f'/api/uploads/{upload_log.id}'
+    }), 202
+
+
+@app.route('/api/logs/qso', methods=['POST'])
+@require_api_key
+def submit_qsos():
+    """
+    Add QSOs as they are logged, without uploading a file
+    
+    Accepts a JSON object of ADIF fields, a list of them, or ADIF text.
+    Records are hashed and deduplicated like uploaded ones and committed
+    together with other stations' submissions.
+    """
+    user = request.current_user
+    parser = ADIFParser()
+    
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data['qsos'] if 'qsos' in data else [data]
+        if not isinstance(data, list) or not all(isinstance(qso, dict) for qso in data):
+            return jsonify({'error': 'Expected a QSO object or a list of QSO objects'}), 400
+        records = [parser.build_record(qso.items()) for qso in data]
+    else:
+        records = parser.parse_file(request.get_data(as_text=True))
+    
+    if len(records) > app.config['LIVE_MAX_QSOS']:
+        return jsonify({
+            'error': f"At most {app.config['LIVE_MAX_QSOS']} QSOs per request; upload larger logs as a file"
+        }), 413
+    
+    # A record whose date or time does not parse has no qso_start and cannot be stored
+    valid = [
+        record for record in records
+        if parser.validate_record(record) and 'qso_start' in record and not oversized_fields(record)
+    ]
+    if not valid:
+        return jsonify({'error': 'No valid QSOs (call and a valid qso_date and time_on are required)'}), 400
+    
+    # Hand this request's connection back to the pool while it waits, so
+    # the committer thread never has to wait for one
+    user_id = user.id
+    db.session.close()
+    
     try:
-        # Parse ADIF file
-        parser = ADIFParser()
-        file_content = file.read()
-        records = parser.parse_file(file_content)
-        
-        upload_log.total_records = len(records)
-        
-        # Process records
-        new_count = 0
-        duplicate_count = 0
-        error_count = 0
+        new_count, duplicate_count = live_committer.submit(user_id, valid)
+    except GroupCommitTimeout as e:
+        # The submission was withdrawn, so a retry cannot store duplicates
+        return jsonify({'error': f'{str(e)}; none were stored, send them again'}), 503
+    except Exception as e:
+        return jsonify({'error': f'Failed to store QSOs: {str(e)}'}), 500
+    
+    return jsonify({
+        'total': len(records),
+        'new': new_count,
+        'duplicates': duplicate_count,
+        'errors': len(records) - len(valid)
+    }), 201
+
+
+def ingest_log_file(upload_log, stream, size, use_copy=False):
+    """
+    Parse an ADIF or ADX stream into log_entries and record the counts
+    
+    The UploadLog counters are updated in the same transaction as each
+    committed batch, so they show progress while a large log is loading.
+    An ADIF file that starts with the whole of an earlier upload is only
+    parsed past it, and the earlier file's records count as duplicates.
+    
+    Args:
+        upload_log: UploadLog to fill in and mark completed
+        stream: Binary file-like object holding the log
+        size: Size of the log in bytes, if known
+        use_copy: Load through a COPY staging table regardless of size
         
-        for record in records:
-            try:
-                # Check for duplicate
-                existing = LogEntry.query.filter_by(
-                    user_id=user.id,
-                    qso_hash=record['qso_hash']
-                ).first()
-                
-                if existing:
-                    duplicate_count += 1
-                    continue
-                
-                # Create new log entry
-                log_entry = LogEntry(
-                    user_id=user.id,
-                    qso_date=record.get('qso_date'),
-                    time_on=record.get('time_on'),
-                    call=record.get('call'),
-                    band=record.get('band'),
-                    mode=record.get('mode'),
-                    freq=record.get('freq'),
-                    rst_sent=record.get('rst_sent'),
-                    rst_rcvd=record.get('rst_rcvd'),
-                    qso_date_off=record.get('qso_date_off'),
-                    time_off=record.get('time_off'),
-                    station_callsign=record.get('station_callsign'),
-                    my_gridsquare=record.get('my_gridsquare'),
-                    gridsquare=record.get('gridsquare'),
-                    name=record.get('name'),
-                    qth=record.get('qth'),
-                    comment=record.get('comment'),
-                    additional_fields=record.get('additional_fields'),
-                    qso_hash=record['qso_hash']
+    Returns:
+        The BulkIngest or CopyIngest used, with its final counts
+    """
+    base = (0, 0, 0, 0)
+    
+    def record_progress(ingest):
+        upload_log.total_records = base[0] + ingest.total_count
+        upload_log.new_records = base[1] + ingest.new_count
+        upload_log.duplicate_records = base[2] + ingest.duplicate_count
+        upload_log.error_records = base[3] + ingest.error_count
+    
+    # Detect compressed uploads from their first bytes; they are parsed
+    # from a decompressing stream whose final size is not known up front
+    head = stream.read(512)
+    stream.seek(0)
+    compression = detect_compression(head)
+    parse_size = size
+    if compression:
+        limit = app.config['MAX_DECOMPRESSED_LENGTH']
+        head = open_decompressed(stream, compression, limit).read(512)
+        stream.seek(0)
+        stream = open_decompressed(stream, compression, limit)
+        parse_size = None
+    
+    # Very large logs go through COPY; the rest are inserted in batches.
+    # A compressed size understates the log, so it only ever errs towards
+    # batches
+    if use_copy or (size or 0) >= app.config['COPY_INGEST_THRESHOLD']:
+        ingest = CopyIngest(upload_log.user_id, progress=record_progress)
+        # Rows merged by COPY bypass the filter; rebuild it on the next upload
+        qso_filters.discard(upload_log.user_id)
+    else:
+        ingest = BulkIngest(
+            upload_log.user_id,
+            batch_size=app.config['UPLOAD_COMMIT_BATCH'],
+            progress=record_progress,
+            qso_filter=qso_filters.get(upload_log.user_id)
+        )
+    
+    # Detect ADX (XML) uploads from their first bytes
+    parser_class = ADXParser if is_adx(head) else ADIFParser
+    
+    # Parse log file as a stream (memory-mapped when backed by a file,
+    # read in chunks when decompressing) so memory stays flat for large logs
+    parser = parser_class(
+        processes=app.config['PARSE_PROCESSES'],
+        parallel_threshold=app.config['PARALLEL_PARSE_THRESHOLD']
+    )
+    
+    # A log that only grew since an earlier upload is parsed from where the
+    # earlier file ended, provided it ended with a complete record
+    previous = None
+    if parser_class is ADIFParser and not compression and size and upload_log.content_digest:
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            previous = find_grown_upload(upload_log, buffer)
+            start = parser.last_record_end(buffer, previous.file_size) if previous else 0
+            if previous and buffer[start:previous.file_size].strip():
+                previous = None
+            if previous:
+                base = (
+                    previous.total_records or 0,
+                    0,
+                    (previous.new_records or 0) + (previous.duplicate_records or 0),
+                    previous.error_records or 0
                 )
-                
-                db.session.add(log_entry)
-                new_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                print(f"Error processing record: {e}")
+                ingest.ingest(parser.iter_buffer_records(buffer, start=start))
+    
+    if previous is None:
+        ingest.ingest(parser.iter_upload(stream, size=parse_size))
+    
+    record_progress(ingest)
+    upload_log.status = 'completed'
+    db.session.commit()
+    return ingest
+
+
+def process_upload_job(upload_log):
+    """Ingest the spooled file of a claimed upload job"""
+    if upload_log.received_bytes is not None:
+        ingest_session_slice(upload_log)
+        return
+    
+    with open(upload_log.spool_path, 'rb') as f:
+        ingest_log_file(upload_log, f, upload_log.file_size)
+
+
+def ingest_session_slice(upload_log):
+    """
+    Ingest the whole records an upload session has received so far
+    
+    Parsing resumes at parsed_bytes and stops before any trailing partial
+    record, which is picked up by the next slice. Until the session is
+    finalized the UploadLog is handed back in receiving status.
+    
+    Args:
+        upload_log: Claimed UploadLog of a resumable upload session
+    """
+    finished = upload_log.file_size is not None
+    end = upload_log.received_bytes
+    
+    with open(upload_log.spool_path, 'rb') as f:
+        if finished and upload_log.content_digest is None:
+            upload_log.content_digest = file_digest(f)
         
-        # Commit all new entries
-        db.session.commit()
+        head = f.read(512)
+        f.seek(0)
+        if is_adx(head) or detect_compression(head):
+            # XML and compressed data cannot be cut at record boundaries;
+            # parse them once complete
+            if finished:
+                ingest_log_file(upload_log, f, end)
+            else:
+                upload_log.status = 'receiving'
+                db.session.commit()
+            return
         
-        # Update upload log
-        upload_log.new_records = new_count
-        upload_log.duplicate_records = duplicate_count
-        upload_log.error_records = error_count
-        upload_log.status = 'completed'
-        db.session.commit()
+        base = (
+            upload_log.total_records or 0,
+            upload_log.new_records or 0,
+            upload_log.duplicate_records or 0,
+            upload_log.error_records or 0
+        )
         
-        return jsonify({
-            'message': 'Upload successful',
-            'total': len(records),
-            'new': new_count,
-            'duplicates': duplicate_count,
-            'errors': error_count
-        }), 200
+        def record_progress(ingest):
+            upload_log.total_records = base[0] + ingest.total_count
+            upload_log.new_records = base[1] + ingest.new_count
+            upload_log.duplicate_records = base[2] + ingest.duplicate_count
+            upload_log.error_records = base[3] + ingest.error_count
         
-    except Exception as e:
-        upload_log.status = 'failed'
-        db.session.commit()
-        return jsonify({'error': f'Upload failed: {str(e)}'}), 500
+        ingest = BulkIngest(
+            upload_log.user_id,
+            batch_size=app.config['UPLOAD_COMMIT_BATCH'],
+            progress=record_progress,
+            qso_filter=qso_filters.get(upload_log.user_id)
+        )
+        
+        parser = ADIFParser()
+        parser.consumed_offset = upload_log.parsed_bytes or 0
+        if end:
+            # Map only the received bytes; a chunk being written may still
+            # be truncated past them
+            with mmap.mmap(f.fileno(), end, access=mmap.ACCESS_READ) as buffer:
+                ingest.ingest(parser.iter_buffer_records(
+                    buffer, start=upload_log.parsed_bytes or 0, final=finished
+                ))
+    
+    record_progress(ingest)
+    upload_log.parsed_bytes = parser.consumed_offset
+    upload_log.status = 'completed' if finished else 'receiving'
+    db.session.commit()
 
 
 @app.route('/api/logs', methods=['GET'])
 @require_auth
 def get_logs():
-    """Get user's log entries"""
+    """Get user's log entries, newest first, a page at a time"""
     user = request.current_user
     
-    # Pagination
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
+    try:
+        logs, page = page_of_logs(user_log_query(user), LOG_FIELDS)
+    except ValueError as e:
+        # A malformed filter or InvalidCursor
+        return jsonify({'error': str(e)}), 400
     
-    # Filters
-    callsign = request.args.get('callsign', '').upper()
+    return json_response({
+        'logs': logs,
+        **page
+    }), 200
+
+
+def user_log_query(user):
+    """
+    Build the query for a user's log entries selected by the request's arguments
+    
+    Query args are callsign (a search; see callsign_search), band, mode and
+    the date and frequency ranges of filter_logs.
+    
+    Args:
+        user: Owner of the log
+    
+    Returns:
+        Filtered LogEntry query, without ordering
+    
+    Raises:
+        ValueError: If a range filter is malformed
+    """
+    callsign = request.args.get('callsign', '')
     band = request.args.get('band', '')
     mode = request.args.get('mode', '')
     
-    # Build query
     query = LogEntry.query.filter_by(user_id=user.id)
     
     if callsign:
-        query = query.filter(LogEntry.call.ilike(f'%{callsign}%'))
+        query = filter_callsign(query, callsign)
     if band:
         query = query.filter_by(band=band)
     if mode:
         query = query.filter_by(mode=mode)
     
-    # Order by date/time descending
-    query = query.order_by(LogEntry.qso_date.desc(), LogEntry.time_on.desc())
+    return filter_logs(query, request.args)
+
+
+def filter_logs(query, filters):
+    """
+    Apply the date and frequency range filters shared by listings, exports
+    and reports
     
-    # Paginate
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    Dates are whole UTC days (YYYY-MM-DD) and frequencies are in MHz; both
+    ranges are inclusive. They compare the typed qso_start and freq_mhz
+    columns, so each range is an index range scan.
     
-    return jsonify({
-        'logs': [{
-            'id': log.id,
-            'qso_date': log.qso_date,
-            'time_on': log.time_on,
-            'call': log.call,
-            'band': log.band,
-            'mode': log.mode,
-            'freq': log.freq,
-            'rst_sent': log.rst_sent,
-            'rst_rcvd': log.rst_rcvd,
-            'station_callsign': log.station_callsign,
-            'gridsquare': log.gridsquare,
-            'name': log.name,
-            'comment': log.comment
-        } for log in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
-    }), 200
+    Args:
+        query: LogEntry query
+        filters: Mapping with optional date_from, date_to, freq_min and freq_max
+    
+    Returns:
+        Filtered query
+    
+    Raises:
+        ValueError: If a date or frequency is malformed
+    """
+    date_from = filters.get('date_from')
+    date_to = filters.get('date_to')
+    freq_min = filters.get('freq_min')
+    freq_max = filters.get('freq_max')
+    
+    if date_from:
+        query = query.filter(LogEntry.qso_start >= parse_date_filter(date_from))
+    if date_to:
+        query = query.filter(LogEntry.qso_start < parse_date_filter(date_to) + timedelta(days=1))
+    if freq_min not in (None, ''):
+        query = query.filter(LogEntry.freq_mhz >= parse_freq_filter(freq_min))
+    if freq_max not in (None, ''):
+        query = query.filter(LogEntry.freq_mhz <= parse_freq_filter(freq_max))
+    return query
+
+
+def parse_date_filter(value):
+    """Parse a YYYY-MM-DD (or YYYYMMDD) filter as the UTC midnight starting that day"""
+    try:
+        return datetime.strptime(str(value).replace('-', ''), '%Y%m%d').replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise ValueError(f'Invalid date: {value}')
+
+
+def parse_freq_filter(value):
+    """Parse a frequency filter in MHz"""
+    freq = freq_mhz_from(value)
+    if freq is None:
+        raise ValueError(f'Invalid frequency: {value}')
+    return freq
+
+
+def filter_extra_fields(query, extra_fields):
+    """
+    Apply report filters on additional ADIF fields, such as contest_id
+    
+    Each named field must equal the value given, or one of a list of
+    values, exactly. On PostgreSQL every value is a JSONB containment test,
+    answered from the GIN index on additional_fields instead of by reading
+    each QSO in range.
+    
+    Args:
+        query: LogEntry query
+        extra_fields: Mapping of field name to a value or list of values, or None
+    
+    Returns:
+        Filtered query
+    
+    Raises:
+        ValueError: If the mapping is malformed
+    """
+    if not extra_fields:
+        return query
+    if not isinstance(extra_fields, dict):
+        raise ValueError('extra_fields must map field names to values')
+    
+    containment = db.engine.dialect.name == 'postgresql'
+    for name, values in extra_fields.items():
+        if not isinstance(values, list):
+            values = [values]
+        if not name.strip() or not values or not all(isinstance(value, str) for value in values):
+            raise ValueError(f'Invalid extra field filter: {name}')
+        
+        # Additional fields are stored under lowercase names
+        name = name.strip().lower()
+        if containment:
+            document = type_coerce(LogEntry.additional_fields, JSONB)
+            query = query.filter(db.or_(*(document.contains({name: value}) for value in values)))
+        else:
+            query = query.filter(LogEntry.additional_fields[name].as_string().in_(values))
+    return query
+
+
+def page_of_logs(query, fields):
+    """
+    Read the page of log entries selected by the request's arguments
+    
+    Query args are per_page (capped at LOG_PAGE_MAX), cursor (next_cursor
+    of the previous page) and include_total, which adds a total that is
+    estimated for large logs. Only the requested fields are read, as rows
+    rather than LogEntry objects.
+    
+    Args:
+        query: Filtered LogEntry query
+        fields: LogEntry attribute names of each entry, in response order
+    
+    Returns:
+        Tuple of (list of entry dicts, dict of pagination fields for the response)
+    
+    Raises:
+        InvalidCursor: If the cursor argument is malformed
+    """
+    per_page = request.args.get('per_page', 50, type=int)
+    per_page = max(1, min(per_page, app.config['LOG_PAGE_MAX']))
+    
+    rows, next_cursor = paginate_logs(project_logs(query, fields), per_page, request.args.get('cursor'))
+    
+    page = {
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    }
+    if request.args.get('include_total', '').lower() in ('1', 'true', 'yes'):
+        page['total'], page['total_is_estimate'] = estimate_count(query)
+    return log_dicts(rows, fields), page
 
 
 @app.route('/api/logs/stats', methods=['GET'])
@@ -581,42 +1007,228 @@ def get_uploads():
     ).limit(50).all()
     
     return jsonify({
-        'uploads': [{
-            'id': upload.id,
-            'filename': upload.filename,
-            'uploaded_at': upload.uploaded_at.isoformat(),
-            'total_records': upload.total_records,
-            'new_records': upload.new_records,
-            'duplicate_records': upload.duplicate_records,
-            'error_records': upload.error_records,
-            'status': upload.status
-        } for upload in uploads]
+        'uploads': [serialize_upload(upload) for upload in uploads]
     }), 200
 
 
+@app.route('/api/logs/upload/sessions', methods=['POST'])
+@require_api_key
+def create_upload_session():
+    """Start a resumable upload of an ADIF or ADX log sent in chunks"""
+    data = request.get_json(silent=True) or {}
+    filename = (data.get('filename') or '').strip()
+    
+    if not filename:
+        return jsonify({'error': 'Filename required'}), 400
+    
+    user = request.current_user
+    
+    try:
+        spool_path = new_spool_path(filename, app.config['UPLOAD_SPOOL_DIR'])
+        open(spool_path, 'wb').close()
+    except OSError as e:
+        return jsonify({'error': f'Upload failed: {str(e)}'}), 500
+    
+    upload_log = UploadLog(
+        user_id=user.id,
+        filename=filename[:255],
+        status='receiving',
+        spool_path=spool_path,
+        received_bytes=0,
+        parsed_bytes=0,
+        received_at=datetime.utcnow()
+    )
+    db.session.add(upload_log)
+    db.session.commit()
+    
+    return jsonify(serialize_upload_session(upload_log)), 201
+
+
+@app.route('/api/logs/upload/sessions/<int:upload_id>', methods=['GET'])
+@require_api_key
+def get_upload_session(upload_id):
+    """Get how many bytes of an upload session the server has stored"""
+    user = request.current_user
+    
+    upload_log = UploadLog.query.filter_by(id=upload_id, user_id=user.id).first()
+    if not upload_log or upload_log.received_bytes is None:
+        return jsonify({'error': 'Upload session not found'}), 404
+    
+    return jsonify(serialize_upload_session(upload_log)), 200
+
+
+@app.route('/api/logs/upload/sessions/<int:upload_id>', methods=['PUT'])
+@require_api_key
+def put_upload_chunk(upload_id):
+    """
+    Store the next chunk of an upload session
+    
+    The body holds the bytes and Content-Range gives their position, which
+    must start at the session's current offset. A chunk that fails midway
+    can simply be sent again from that offset.
+    """
+    user = request.current_user
+    
+    upload_log = UploadLog.query.filter_by(id=upload_id, user_id=user.id).first()
+    if not upload_log or upload_log.received_bytes is None:
+        db.session.rollback()
+        return jsonify({'error': 'Upload session not found'}), 404
+    
+    if upload_log.file_size is not None or upload_log.status not in ('receiving', 'processing'):
+        db.session.rollback()
+        return jsonify({'error': 'Upload session is already complete'}), 409
+    
+    content_range = parse_content_range_header(request.headers.get('Content-Range'))
+    if content_range is None or content_range.units != 'bytes':
+        db.session.rollback()
+        return jsonify({'error': 'Content-Range: bytes <start>-<end>/* header required'}), 400
+    
+    # Chunk requests of a session take turns on its spool file, so
+    # concurrent retries cannot interleave their writes. No database lock
+    # is held while the body streams in, so the worker's progress updates
+    # and the finalize request are never kept waiting on a slow client.
+    try:
+        with locked_spool(upload_log.spool_path) as spool:
+            # Read the offset under a brief row lock now that it is this
+            # request's turn; an earlier chunk may have just moved it
+            db.session.rollback()
+            upload_log = UploadLog.query.filter_by(id=upload_id).with_for_update().first()
+            
+            if upload_log.file_size is not None or upload_log.status not in ('receiving', 'processing'):
+                db.session.rollback()
+                return jsonify({'error': 'Upload session is already complete'}), 409
+            
+            offset = upload_log.received_bytes
+            if content_range.start != offset:
+                db.session.rollback()
+                return jsonify({
+                    'error': f'Chunk must start at byte {offset}',
+                    'offset': offset
+                }), 409
+            
+            chunk_size = content_range.stop - content_range.start
+            if offset + chunk_size > app.config['MAX_UPLOAD_LENGTH']:
+                db.session.rollback()
+                return jsonify({'error': 'File too large'}), 413
+            db.session.commit()
+            
+            written = append_chunk(spool, offset, request.stream)
+            if written != chunk_size:
+                return jsonify({
+                    'error': f'Expected {chunk_size} bytes, received {written}',
+                    'offset': offset
+                }), 400
+            
+            # Record the new offset only if the session has not moved on or
+            # been finalized while the chunk was written
+            recorded = UploadLog.query.filter(
+                UploadLog.id == upload_id,
+                UploadLog.received_bytes == offset,
+                UploadLog.file_size.is_(None),
+                UploadLog.status.in_(('receiving', 'processing'))
+            ).update({
+                UploadLog.received_bytes: offset + written,
+                UploadLog.received_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.session.commit()
+    except ChunkInProgress as e:
+        db.session.rollback()
+        return jsonify({'error': f'{str(e)}; retry once it has finished'}), 409
+    except OSError as e:
+        db.session.rollback()
+        return jsonify({'error': f'Upload failed: {str(e)}'}), 500
+    
+    if not recorded:
+        return jsonify({'error': 'Upload session is already complete'}), 409
+    
+    return jsonify(serialize_upload_session(upload_log)), 200
+
+
+@app.route('/api/logs/upload/sessions/<int:upload_id>/complete', methods=['POST'])
+@require_api_key
+def complete_upload_session(upload_id):
+    """Mark an upload session as fully sent so the rest of it is ingested"""
+    user = request.current_user
+    
+    upload_log = UploadLog.query.filter_by(
+        id=upload_id, user_id=user.id
+    ).with_for_update().first()
+    if not upload_log or upload_log.received_bytes is None:
+        db.session.rollback()
+        return jsonify({'error': 'Upload session not found'}), 404
+    
+    if upload_log.file_size is None:
+        if upload_log.status not in ('receiving', 'processing'):
+            db.session.rollback()
+            return jsonify({'error': 'Upload session has expired'}), 409
+        # A worker picks up the remaining records of a finalized session
+        upload_log.file_size = upload_log.received_bytes
+        db.session.commit()
+    
+    return jsonify({
+        'message': 'Upload queued',
+        'upload_id': upload_log.id,
+        'status': upload_log.status,
+        'status_url': f'/api/uploads/{upload_log.id}'
+    }), 202
+
+
+def serialize_upload_session(upload_log):
+    """Convert an upload session to its API representation"""
+    return {
+        'upload_id': upload_log.id,
+        'filename': upload_log.filename,
+        'offset': upload_log.received_bytes,
+        'complete': upload_log.file_size is not None,
+        'status': upload_log.status,
+        'status_url': f'/api/uploads/{upload_log.id}'
+    }
+
+
+@app.route('/api/uploads/<int:upload_id>', methods=['GET'])
+@require_auth_or_api_key
+def get_upload(upload_id):
+    """Get the status and progress of one upload"""
+    user = request.current_user
+    
+    upload = UploadLog.query.filter_by(id=upload_id, user_id=user.id).first()
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    return jsonify(serialize_upload(upload)), 200
+
+
+def serialize_upload(upload):
+    """Convert an UploadLog to its API representation"""
+    return {
+        'id': upload.id,
+        'filename': upload.filename,
+        'uploaded_at': upload.uploaded_at.isoformat(),
+        'total_records': upload.total_records,
+        'new_records': upload.new_records,
+        'duplicate_records': upload.duplicate_records,
+        'error_records': upload.error_records,
+        'status': upload.status,
+        'file_size': upload.file_size,
+        'started_at': upload.started_at.isoformat() if upload.started_at else None,
+        'completed_at': upload.completed_at.isoformat() if upload.completed_at else None,
+        'error': upload.error_message
+    }
+
+
 @app.route('/api/logs/export', methods=['GET'])
 @require_auth
 def export_logs():
     """Export logs in ADIF format"""
     user = request.current_user
     
-    # Get filters
-    callsign = request.args.get('callsign', '').upper()
-    band = request.args.get('band', '')
-    mode = request.args.get('mode', '')
-    
-    # Build query
-    query = LogEntry.query.filter_by(user_id=user.id)
-    
-    if callsign:
-        query = query.filter(LogEntry.call.ilike(f'%{callsign}%'))
-    if band:
-        query = query.filter_by(band=band)
-    if mode:
-        query = query.filter_by(mode=mode)
+    try:
+        query = user_log_query(user)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Order by date/time
-    logs = query.order_by(LogEntry.qso_date, LogEntry.time_on).all()
+    # Oldest first
+    logs = query.order_by(LogEntry.qso_start, LogEntry.id).all()
     
     # Build ADIF file
     adif_content = generate_adif_export(logs, user.callsign)
@@ -897,38 +1509,19 @@ def contestadmin_get_user_logs(user_id):
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
-    
     # Get logs
-    pagination = LogEntry.query.filter_by(user_id=user_id).order_by(
-        LogEntry.qso_date.desc(), 
-        LogEntry.time_on.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
-    
-    logs = [{
-        'id': log.id,
-        'qso_date': log.qso_date,
-        'time_on': log.time_on,
-        'call': log.call,
-        'band': log.band,
-        'mode': log.mode,
-        'freq': log.freq,
-        'rst_sent': log.rst_sent,
-        'rst_rcvd': log.rst_rcvd,
-        'station_callsign': log.station_callsign,
-        'comment': log.comment
-    } for log in pagination.items]
+    try:
+        logs, page = page_of_logs(LogEntry.query.filter_by(user_id=user_id), ADMIN_LOG_FIELDS)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify({
+    return json_response({
         'user': {
             'id': user.id,
             'callsign': user.callsign
         },
         'logs': logs,
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': pagination.page
+        **page
     }), 200
 
 
@@ -970,35 +1563,71 @@ def contestadmin_generate_report():
     if not fields:
         return jsonify({'error': 'No fields selected'}), 400
     
-    # Validate fields
+    # Get filters
+    filters = data.get('filters', {})
+    
+    try:
+        report_data = run_report(fields, filters)
+    except ValueError as e:
+        # An invalid field or filter
+        return jsonify({'error': str(e)}), 400
+    
+    return json_response({
+        'report': report_data,
+        'total': len(report_data),
+        'fields': fields
+    }), 200
+
+
+def run_report(fields, filters):
+    """
+    Read the rows of a contest report, newest first
+    
+    Only the selected fields are read, as rows rather than LogEntry
+    objects: user_callsign comes from the users join and json:<name>
+    fields are extracted from additional_fields by the database. Every
+    filter, extra_fields included, is applied in SQL.
+    
+    Args:
+        fields: Report field names
+        filters: Mapping with optional date and frequency ranges (see
+            filter_logs), bands, modes, user_ids and extra_fields (see
+            filter_extra_fields)
+    
+    Returns:
+        List of at most 10000 dicts keyed by field
+    
+    Raises:
+        ValueError: If a field or filter is invalid
+    """
     valid_fields = [
         'qso_date', 'time_on', 'call', 'band', 'mode', 'freq',
         'rst_sent', 'rst_rcvd', 'station_callsign', 'my_gridsquare',
         'gridsquare', 'name', 'qth', 'comment', 'qso_date_off', 'time_off'
     ]
     
+    columns = []
     for field in fields:
-        # Allow fields from JSON (prefixed with 'json:')
-        if field.startswith('json:'):
-            continue
-        if field not in valid_fields and field != 'user_callsign':
-            return jsonify({'error': f'Invalid field: {field}'}), 400
+        if field == 'user_callsign':
+            column = User.callsign
+        elif field.startswith('json:'):
+            # Extract from additional_fields JSON
+            column = LogEntry.additional_fields[field[5:]].as_string()
+        elif field in valid_fields:
+            column = getattr(LogEntry, field)
+        else:
+            raise ValueError(f'Invalid field: {field}')
+        # Labelled so a field selected twice keeps both columns
+        columns.append(column.label(f'field_{len(columns)}'))
     
-    # Get filters
-    filters = data.get('filters', {})
-    date_from = filters.get('date_from')
-    date_to = filters.get('date_to')
     bands = filters.get('bands', [])
     modes = filters.get('modes', [])
     user_ids = filters.get('user_ids', [])
     
-    # Build query
-    query = LogEntry.query.join(User)
+    query = db.session.query(*columns).select_from(LogEntry).join(User)
     
-    if date_from:
-        query = query.filter(LogEntry.qso_date >= date_from.replace('-', ''))
-    if date_to:
-        query = query.filter(LogEntry.qso_date <= date_to.replace('-', ''))
+    query = filter_logs(query, filters)
+    query = filter_extra_fields(query, filters.get('extra_fields'))
     if bands:
         query = query.filter(LogEntry.band.in_(bands))
     if modes:
@@ -1006,29 +1635,8 @@ def contestadmin_generate_report():
     if user_ids:
         query = query.filter(LogEntry.user_id.in_(user_ids))
     
-    # Get results
-    results = query.order_by(LogEntry.qso_date.desc(), LogEntry.time_on.desc()).limit(10000).all()
-    
-    # Build report data
-    report_data = []
-    for log in results:
-        row = {}
-        for field in fields:
-            if field == 'user_callsign':
-                row[field] = log.user.callsign
-            elif field.startswith('json:'):
-                # Extract from additional_fields JSON
-                json_key = field[5:]  # Remove 'json:' prefix
-                row[field] = log.additional_fields.get(json_key) if log.additional_fields else None
-            else:
-                row[field] = getattr(log, field, None)
-        report_data.append(row)
-    
-    return jsonify({
-        'report': report_data,
-        'total': len(report_data),
-        'fields': fields
-    }), 200
+    rows = query.order_by(LogEntry.qso_start.desc(), LogEntry.id.desc()).limit(10000).all()
+    return log_dicts(rows, fields)
 
 
 @app.route('/api/contestadmin/templates', methods=['POST'])
@@ -1205,57 +1813,12 @@ def contestadmin_run_template(template_id):
     fields = template.fields
     filters = template.filters or {}
     
-    # Validate fields (same validation as in contestadmin_generate_report)
-    valid_fields = [
-        'qso_date', 'time_on', 'call', 'band', 'mode', 'freq',
-        'rst_sent', 'rst_rcvd', 'station_callsign', 'my_gridsquare',
-        'gridsquare', 'name', 'qth', 'comment', 'qso_date_off', 'time_off'
-    ]
-    
-    for field in fields:
-        if field.startswith('json:'):
-            continue
-        if field not in valid_fields and field != 'user_callsign':
-            return jsonify({'error': f'Invalid field: {field}'}), 400
-    
-    # Build query
-    date_from = filters.get('date_from')
-    date_to = filters.get('date_to')
-    bands = filters.get('bands', [])
-    modes = filters.get('modes', [])
-    user_ids = filters.get('user_ids', [])
-    
-    query = LogEntry.query.join(User)
-    
-    if date_from:
-        query = query.filter(LogEntry.qso_date >= date_from.replace('-', ''))
-    if date_to:
-        query = query.filter(LogEntry.qso_date <= date_to.replace('-', ''))
-    if bands:
-        query = query.filter(LogEntry.band.in_(bands))
-    if modes:
-        query = query.filter(LogEntry.mode.in_(modes))
-    if user_ids:
-        query = query.filter(LogEntry.user_id.in_(user_ids))
-    
-    # Get results
-    results = query.order_by(LogEntry.qso_date.desc(), LogEntry.time_on.desc()).limit(10000).all()
-    
-    # Build report data
-    report_data = []
-    for log in results:
-        row = {}
-        for field in fields:
-            if field == 'user_callsign':
-                row[field] = log.user.callsign
-            elif field.startswith('json:'):
-                json_key = field[5:]
-                row[field] = log.additional_fields.get(json_key) if log.additional_fields else None
-            else:
-                row[field] = getattr(log, field, None)
-        report_data.append(row)
+    try:
+        report_data = run_report(fields, filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify({
+    return json_response({
         'report': report_data,
         'total': len(report_data),
         'fields': fields,
@@ -1289,38 +1852,19 @@ def logadmin_get_user_logs(user_id):
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
-    
     # Get logs
-    pagination = LogEntry.query.filter_by(user_id=user_id).order_by(
-        LogEntry.qso_date.desc(), 
-        LogEntry.time_on.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
-    
-    logs = [{
-        'id': log.id,
-        'qso_date': log.qso_date,
-        'time_on': log.time_on,
-        'call': log.call,
-        'band': log.band,
-        'mode': log.mode,
-        'freq': log.freq,
-        'rst_sent': log.rst_sent,
-        'rst_rcvd': log.rst_rcvd,
-        'station_callsign': log.station_callsign,
-        'comment': log.comment
-    } for log in pagination.items]
+    try:
+        logs, page = page_of_logs(LogEntry.query.filter_by(user_id=user_id), ADMIN_LOG_FIELDS)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify({
+    return json_response({
         'user': {
             'id': user.id,
             'callsign': user.callsign
         },
         'logs': logs,
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': pagination.page
+        **page
     }), 200
 
 
@@ -1337,6 +1881,9 @@ def logadmin_reset_user_logs(user_id):
     
     # Delete all logs for this user
     LogEntry.query.filter_by(user_id=user_id).delete()
+    # Earlier uploads no longer match what is stored, so a repeated or
+    # grown file must be ingested in full again
+    UploadLog.query.filter_by(user_id=user_id).update({'content_digest': None})
     db.session.commit()
     
     return jsonify({
@@ -1355,9 +1902,161 @@ def health():
 @app.cli.command('init-db')
 def init_db():
     """Initialize the database"""
+    fresh = not inspect(db.engine).has_table('log_entries')
     db.create_all()
+    if fresh:
+        # The tables were just created from the current models
+        mark_all_applied()
     init_default_templates()
     print('Database initialized!')
+    
+    pending = pending_migrations()
+    if pending:
+        print(f'{len(pending)} schema migrations pending, run: flask --app app migrate')
+
+
+@app.cli.command('migrate')
+@click.option('--status', is_flag=True, help='List migrations without applying any')
+def migrate(status):
+    """Apply pending schema migrations to an existing database"""
+    if status:
+        applied = applied_migrations()
+        for m in MIGRATIONS:
+            state = 'applied' if m.name in applied else 'pending'
+            print(f'{state:8s} {m.name:34s} {m.description}')
+        return
+    
+    pending = pending_migrations()
+    if not pending:
+        print('Database schema is up to date')
+        return
+    
+    for m in pending:
+        print(f'Applying {m.name}: {m.description}...')
+        try:
+            apply_migration(m)
+        except Exception as e:
+            # Finished migrations are recorded, so a rerun resumes here
+            raise click.ClickException(f'Migration {m.name} failed: {e}')
+    print(f'✅ Applied {len(pending)} migrations')
+
+
+@app.cli.command('import-log')
+@click.argument('callsign')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_log(callsign, path):
+    """Bulk import an ADIF or ADX file for a user with COPY"""
+    user = User.query.filter_by(callsign=callsign.upper()).first()
+    if not user:
+        raise click.ClickException(f'User {callsign.upper()} not found')
+    
+    upload_log = UploadLog(
+        user_id=user.id,
+        filename=os.path.basename(path),
+        status='processing',
+        file_size=os.path.getsize(path),
+        started_at=datetime.utcnow()
+    )
+    db.session.add(upload_log)
+    db.session.commit()
+    
+    try:
+        with open(path, 'rb') as f:
+            upload_log.content_digest = file_digest(f)
+            ingest = ingest_log_file(upload_log, f, upload_log.file_size, use_copy=True)
+    except Exception as e:
+        db.session.rollback()
+        upload_log.status = 'failed'
+        upload_log.error_message = str(e)
+        db.session.commit()
+        raise click.ClickException(f'Import failed: {e}')
+    
+    upload_log.completed_at = datetime.utcnow()
+    db.session.commit()
+    
+    print(f'Imported {path} for {user.callsign}: {ingest.total_count} records, '
+          f'{ingest.new_count} new, {ingest.duplicate_count} duplicates, {ingest.error_count} errors')
+
+
+@app.cli.command('upload-worker')
+@click.option('--concurrency', default=1, show_default=True, help='Worker processes to run')
+@click.option('--poll-interval', default=2.0, show_default=True, help='Seconds to wait when the queue is empty')
+@click.option('--once', is_flag=True, help='Exit once the queue is empty')
+def upload_worker(concurrency, poll_interval, once):
+    """Ingest queued log uploads"""
+    if concurrency <= 1:
+        run_upload_worker(poll_interval, once)
+        return
+    
+    workers = [
+        multiprocessing.Process(target=run_upload_worker, args=(poll_interval, once))
+        for _ in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def run_upload_worker(poll_interval, once):
+    """Run one upload worker loop in this process"""
+    with app.app_context():
+        # Never share pooled connections inherited from a parent process
+        db.engine.dispose(close=False)
+        print(f'Upload worker {os.getpid()} waiting for jobs')
+        run_worker(
+            process_upload_job,
+            poll_interval=poll_interval,
+            stale_after=app.config['UPLOAD_JOB_STALE_SECONDS'],
+            heartbeat_interval=app.config['UPLOAD_HEARTBEAT_SECONDS'],
+            slice_bytes=app.config['UPLOAD_SESSION_SLICE'],
+            session_expire_after=app.config['UPLOAD_SESSION_EXPIRE_SECONDS'],
+            once=once
+        )
+
+
+@app.cli.command('udp-listener')
+@click.option('--station', 'stations', multiple=True, metavar='CALLSIGN=API_KEY',
+              help='Store QSOs logged by a station callsign with this API key (repeatable)')
+@click.option('--stations-file', type=click.Path(exists=True, dir_okay=False),
+              help='File of "CALLSIGN API_KEY" lines, one station per line')
+@click.option('--bind', default='127.0.0.1', show_default=True, help='Address to listen on')
+@click.option('--port', 'ports', multiple=True, type=int, default=(2237, 12060), show_default=True,
+              help='UDP port to listen on (repeatable); WSJT-X and N1MM are detected per packet')
+@click.option('--flush-interval', default=2.0, show_default=True, help='Seconds between inserts')
+@click.option('--max-pending', default=10000, show_default=True,
+              help='QSOs kept while the database is unavailable; the oldest are dropped beyond it')
+def udp_listener(stations, stations_file, bind, ports, flush_interval, max_pending):
+    """Store QSOs broadcast over UDP by WSJT-X, JTDX and N1MM Logger+"""
+    entries = [station.split('=', 1) for station in stations]
+    if stations_file:
+        with open(stations_file) as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    entries.append(line.split(None, 1))
+    
+    # Resolve every API key once, up front
+    station_users = {}
+    for entry in entries:
+        if len(entry) != 2:
+            raise click.ClickException(f'Expected CALLSIGN and API key, got: {" ".join(entry)}')
+        callsign, api_key = entry[0].strip().upper(), entry[1].strip()
+        user = AuthManager.verify_api_key(api_key)
+        if not user:
+            raise click.ClickException(f'Invalid API key for station {callsign}')
+        station_users[callsign] = user.id
+        print(f'Station {callsign} -> {user.callsign}')
+    
+    if not station_users:
+        raise click.ClickException('Map at least one station with --station or --stations-file')
+    
+    listener = UDPListener(station_users, ports, bind=bind, flush_interval=flush_interval,
+                           max_pending=max_pending)
+    try:
+        listener.serve()
+    except KeyboardInterrupt:
+        pass
 
 
 def init_default_templates():
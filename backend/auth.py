@@ -8,13 +8,22 @@ import secrets
 import qrcode
 import io
 import base64
-from datetime import datetime
+import hashlib
+from datetime import datetime, timedelta
 from models import db, User, APIKey
 
 
 class AuthManager:
     """Manage user authentication, MFA, and API keys"""
     
+    # SHA-256 of recently verified API keys -> APIKey id, so clients that
+    # call the API every few seconds are not bcrypt-checked on each request
+    _verified_api_keys = {}
+    VERIFIED_API_KEY_CACHE_SIZE = 1024
+    
+    # How often last_used is written for a key that is used continuously
+    API_KEY_LAST_USED_INTERVAL = timedelta(minutes=1)
+    
     @staticmethod
     def hash_password(password):
         """Hash a password using bcrypt"""
@@ -94,6 +103,20 @@ class AuthManager:
         Returns:
             User object if valid, None otherwise
         """
+        # Keys verified before only need their row checked, not bcrypt
+        digest = hashlib.sha256(provided_key.encode('utf-8')).digest()
+        key_id = AuthManager._verified_api_keys.get(digest)
+        if key_id is not None:
+            api_key = db.session.get(APIKey, key_id)
+            if api_key is not None and api_key.is_active:
+                now = datetime.utcnow()
+                if not api_key.last_used or now - api_key.last_used > AuthManager.API_KEY_LAST_USED_INTERVAL:
+                    api_key.last_used = now
+                    db.session.commit()
+                return api_key.user
+            # Deleted or deactivated since it was cached
+            AuthManager._verified_api_keys.pop(digest, None)
+        
         # Get prefix to narrow search
         key_prefix = provided_key[:8]
         
@@ -110,6 +133,10 @@ class AuthManager:
                 api_key.last_used = datetime.utcnow()
                 db.session.commit()
                 
+                if len(AuthManager._verified_api_keys) >= AuthManager.VERIFIED_API_KEY_CACHE_SIZE:
+                    AuthManager._verified_api_keys.clear()
+                AuthManager._verified_api_keys[digest] = api_key.id
+                
                 return api_key.user
         
         return None
@@ -0,0 +1,81 @@
+"""
+Callsign search over log entries
+Searches match base_call, the logged call without portable designators, so
+DL1ABC finds DL1ABC, DL1ABC/P and W1/DL1ABC alike. A search is one of:
+
+    DL1         prefix, as is DL1*
+    *ABC        suffix
+    D?1*C       wildcard; * matches any run of characters and ? any one
+
+A bare term is a prefix match, so a partial call still finds its QSOs as
+it did when the filter was a substring match; *ABC* finds ABC anywhere in
+the call. Prefix searches seek the (user_id, base_call) pattern index and
+suffix searches the index on its reverse, so neither reads the whole log.
+Other wildcards are answered from the trigram index where pg_trgm is
+installed.
+"""
+from sqlalchemy import func
+
+from models import db, LogEntry
+from adif_parser import base_call_from
+
+PREFIX = 'prefix'
+SUFFIX = 'suffix'
+WILDCARD = 'wildcard'
+
+# LIKE metacharacters in a search term are matched literally
+_LIKE_ESCAPES = str.maketrans({'\\': '\\\\', '%': '\\%', '_': '\\_'})
+
+
+def parse_callsign_search(term):
+    """
+    Work out the kind of a callsign search
+
+    Designators are stripped from the term as they are from stored calls,
+    so DL1ABC/P searches for DL1ABC.
+
+    Args:
+        term: Search as typed
+
+    Returns:
+        Tuple of (PREFIX, SUFFIX or WILDCARD, uppercase term), with the *
+        of a prefix or suffix removed
+    """
+    term = base_call_from(term)
+    body = term.strip('*')
+    if '*' in body or '?' in body:
+        return WILDCARD, term
+    if not term.startswith('*'):
+        return PREFIX, body
+    if not term.endswith('*'):
+        return SUFFIX, body
+    return WILDCARD, term
+
+
+def filter_callsign(query, term):
+    """
+    Restrict a LogEntry query to QSOs whose base call matches a search
+
+    Args:
+        query: LogEntry query
+        term: Search as typed, e.g. W1AW, DL*, *ABC or *AB*
+
+    Returns:
+        Filtered query
+    """
+    kind, value = parse_callsign_search(term)
+    if not value.strip('*'):
+        return query
+
+    literal = value.translate(_LIKE_ESCAPES)
+    if kind == PREFIX:
+        return query.filter(LogEntry.base_call.like(literal + '%', escape='\\'))
+    if kind == SUFFIX:
+        if db.engine.dialect.name == 'postgresql':
+            # Matches the expression of ix_log_entries_user_base_call_reversed
+            reversed_literal = value[::-1].translate(_LIKE_ESCAPES)
+            return query.filter(func.reverse(LogEntry.base_call).like(reversed_literal + '%', escape='\\'))
+        return query.filter(LogEntry.base_call.like('%' + literal, escape='\\'))
+
+    pattern = literal.replace('*', '%').replace('?', '_')
+    return query.filter(LogEntry.base_call.like(pattern, escape='\\'))
@@ -0,0 +1,208 @@
+"""
+Group commit of live QSO submissions
+Logging software posts QSOs one at a time as they are worked. Rather than
+committing once per contact, requests hand their rows to a single committer
+thread per process, which inserts everything submitted within a short window
+with one INSERT ... ON CONFLICT DO NOTHING and one commit, then wakes each
+request with its own counts.
+"""
+import time
+import queue
+import threading
+
+from sqlalchemy.dialects.postgresql import insert
+
+from models import db, LogEntry
+
+# Length limits of the string columns a record is stored in
+_COLUMN_LENGTHS = {
+    column.name: column.type.length
+    for column in LogEntry.__table__.columns
+    if isinstance(column.type, db.String) and column.type.length
+}
+
+
+def oversized_fields(record):
+    """
+    Find fields too long for their log_entries column
+
+    A record like this would fail the whole shared transaction, so it is
+    rejected before it is queued.
+
+    Args:
+        record: QSORecord
+
+    Returns:
+        List of offending field names
+    """
+    return [
+        name for name, length in _COLUMN_LENGTHS.items()
+        if isinstance(record.get(name), str) and len(record.get(name)) > length
+    ]
+
+
+class GroupCommitTimeout(Exception):
+    """Raised when a submission was not committed in time"""
+    pass
+
+
+class GroupCommitter:
+    """Coalesce concurrent QSO submissions into shared transactions"""
+
+    def __init__(self, app, window=0.005, max_rows=1000):
+        """
+        Args:
+            app: Flask app whose database the rows go to
+            window: Seconds to wait for more submissions after the first
+            max_rows: Rows per transaction before it is committed early
+        """
+        self.app = app
+        self.window = window
+        self.max_rows = max_rows
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        # Guards the started and cancelled flags of queued submissions
+        self._claim_lock = threading.Lock()
+
+    def submit(self, user_id, records, timeout=5.0):
+        """
+        Queue records for the next group commit and wait until it is done
+
+        A submission still waiting in the queue when the timeout expires is
+        withdrawn, so after GroupCommitTimeout none of its records are
+        stored and the client can safely send them again. One whose insert
+        has already begun is waited for instead.
+
+        Args:
+            user_id: Owner of the records
+            records: QSORecords from ADIFParser.build_record
+            timeout: Seconds to wait for the commit
+
+        Returns:
+            Tuple of (new count, duplicate count)
+
+        Raises:
+            GroupCommitTimeout: If the commit did not start in time; nothing
+                was stored
+        """
+        submission = _Submission(user_id, [record.to_row(user_id) for record in records])
+        self._ensure_started()
+        self._queue.put(submission)
+
+        if not submission.done.wait(timeout):
+            with self._claim_lock:
+                if not submission.started:
+                    submission.cancelled = True
+                    raise GroupCommitTimeout(f'QSOs were not committed within {timeout} seconds')
+            # Already being inserted; its outcome follows shortly
+            submission.done.wait()
+        if submission.error is not None:
+            raise submission.error
+        return submission.new_count, len(submission.rows) - submission.new_count
+
+    def _ensure_started(self):
+        """Start the committer thread in this process on first use"""
+        # Started lazily so each forked gunicorn worker gets its own thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._claim(self._collect())
+                if batch:
+                    self._commit(batch)
+
+    def _claim(self, batch):
+        """Mark submissions as started, dropping those withdrawn after a timeout"""
+        with self._claim_lock:
+            claimed = [submission for submission in batch if not submission.cancelled]
+            for submission in claimed:
+                submission.started = True
+        return claimed
+
+    def _collect(self):
+        """Wait for a submission, then gather whatever arrives within the window"""
+        batch = [self._queue.get()]
+        row_count = len(batch[0].rows)
+        deadline = time.monotonic() + self.window
+
+        while row_count < self.max_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                submission = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(submission)
+            row_count += len(submission.rows)
+
+        return batch
+
+    def _commit(self, batch):
+        """
+        Insert a batch in one transaction and report back to each submission
+
+        If the shared transaction fails, each submission is retried in a
+        transaction of its own, so one bad request cannot fail the others.
+        """
+        try:
+            self._insert(batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch[0], e)
+                return
+
+        for submission in batch:
+            try:
+                self._insert([submission])
+            except Exception as e:
+                self._fail(submission, e)
+
+    def _insert(self, batch):
+        rows = [row for submission in batch for row in submission.rows]
+        table = LogEntry.__table__
+        statement = (
+            insert(table)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=['user_id', 'qso_fingerprint'])
+            .returning(table.c.user_id, table.c.qso_fingerprint)
+        )
+        with db.engine.begin() as connection:
+            inserted = {(user_id, bytes(fingerprint)) for user_id, fingerprint in connection.execute(statement)}
+
+        # A QSO sent twice in one batch is inserted once; the first sender
+        # gets it as new and the second as a duplicate
+        for submission in batch:
+            new_count = 0
+            for row in submission.rows:
+                key = (submission.user_id, row['qso_fingerprint'])
+                if key in inserted:
+                    inserted.discard(key)
+                    new_count += 1
+            submission.new_count = new_count
+            submission.done.set()
+
+    def _fail(self, submission, error):
+        submission.error = error
+        submission.done.set()
+
+
+class _Submission:
+    """Rows from one request waiting for a group commit"""
+
+    def __init__(self, user_id, rows):
+        self.user_id = user_id
+        self.rows = rows
+        self.new_count = 0
+        self.error = None
+        self.started = False
+        self.cancelled = False
+        self.done = threading.Event()
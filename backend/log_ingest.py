@@ -0,0 +1,342 @@
+"""
+Bulk ingest of parsed QSO records into log_entries
+Records are inserted in batches with INSERT ... ON CONFLICT DO NOTHING, so
+duplicates are skipped by the unique (user_id, qso_fingerprint) constraint
+instead of being looked up one at a time. With a per-user QSOFilter only
+records that may already be stored are looked up, in one query per batch,
+so re-uploading a log sends almost nothing to the database. Each batch is
+inserted inside a savepoint; if the database rejects it, the batch is split
+in halves until the bad rows are isolated, so the rest are still stored and
+the errors are counted exactly. Very large imports are streamed into a
+staging table with COPY and merged in a single statement instead.
+"""
+import json
+from decimal import Decimal
+from datetime import datetime
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+
+from models import db, LogEntry
+from adif_parser import QSORecord
+from live_ingest import oversized_fields
+
+# Raised for a batch containing a row the database cannot store, e.g. a value
+# too long for its column or a NOT NULL violation
+ROW_ERRORS = (DataError, IntegrityError)
+
+# psycopg2 refuses a string containing a NUL byte with a plain ValueError
+# carrying this message; any other ValueError is a bug and fails the ingest
+NUL_BYTE_MESSAGE = 'cannot contain NUL'
+
+# PostgreSQL accepts at most this many bind parameters in one statement
+MAX_BIND_PARAMETERS = 65535
+
+# Characters that must be escaped in COPY text format; NUL cannot be stored
+# in a PostgreSQL text value at all
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\x00': None})
+
+
+class BulkIngest:
+    """Insert QSO records for one user in batches and count new and duplicate rows"""
+
+    # Rows per INSERT statement
+    DEFAULT_BATCH_SIZE = 1000
+
+    # Each row binds one parameter per column of QSORecord.to_row; larger
+    # batches would exceed MAX_BIND_PARAMETERS and fail every insert
+    MAX_BATCH_SIZE = MAX_BIND_PARAMETERS // (len(QSORecord.FIELDS) + 1)
+
+    def __init__(self, user_id, batch_size=None, progress=None, qso_filter=None):
+        self.user_id = user_id
+        self.batch_size = min(batch_size or self.DEFAULT_BATCH_SIZE, self.MAX_BATCH_SIZE)
+        # Called with this ingest after each batch, inside its transaction
+        self.progress = progress
+        # QSOFilter of the user's stored fingerprints, updated as batches commit
+        self.qso_filter = qso_filter
+        self.total_count = 0
+        self.new_count = 0
+        self.duplicate_count = 0
+        self.error_count = 0
+        self._rows = []
+
+    def add(self, record):
+        """
+        Queue a parsed record, inserting the batch once it is full
+
+        A record whose date or time did not parse has no qso_start and is
+        counted as an error instead.
+
+        Args:
+            record: QSORecord from ADIFParser
+        """
+        self.total_count += 1
+        if record.qso_start is None:
+            self.error_count += 1
+            return
+        self._rows.append(record.to_row(self.user_id))
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def ingest(self, records):
+        """
+        Insert every record from an iterable and commit
+
+        Args:
+            records: Iterable of QSORecords
+
+        Returns:
+            self, with the final counts
+        """
+        for record in records:
+            self.add(record)
+        self.flush()
+        return self
+
+    def flush(self):
+        """
+        Insert and commit the queued batch
+
+        Rows the filter marks as possibly stored are looked up first and
+        dropped if found. Rows that already exist anyway, from a concurrent
+        upload or earlier in the same batch, are skipped by the database.
+        RETURNING only yields inserted rows, so all three counts are exact.
+        """
+        if not self._rows:
+            return
+
+        rows = self._rows
+        self._rows = []
+
+        pending = rows
+        if self.qso_filter is not None:
+            pending = self._drop_stored(rows)
+
+        inserted, failed = self._insert(pending) if pending else (0, [])
+
+        self.new_count += inserted
+        self.error_count += len(failed)
+        self.duplicate_count += len(rows) - inserted - len(failed)
+        if self.progress:
+            self.progress(self)
+        db.session.commit()
+
+        if self.qso_filter is not None:
+            failed_ids = set(map(id, failed))
+            for row in pending:
+                if id(row) not in failed_ids:
+                    self.qso_filter.add(row['qso_fingerprint'])
+
+    def _insert(self, rows):
+        """
+        Insert rows inside a savepoint, bisecting to isolate rejected rows
+
+        A batch with one bad row costs about two statements per halving
+        (some 20 for a batch of 1000) instead of failing the upload.
+
+        Args:
+            rows: Row dicts from QSORecord.to_row
+
+        Returns:
+            Tuple of (number of rows inserted, list of rows rejected)
+        """
+        statement = (
+            insert(LogEntry.__table__)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=['user_id', 'qso_fingerprint'])
+            .returning(LogEntry.__table__.c.id)
+        )
+        try:
+            with db.session.begin_nested():
+                return len(db.session.execute(statement).fetchall()), []
+        except (*ROW_ERRORS, ValueError) as e:
+            if isinstance(e, ValueError) and NUL_BYTE_MESSAGE not in str(e):
+                raise
+            if len(rows) == 1:
+                return 0, rows
+
+        middle = len(rows) // 2
+        first_inserted, first_failed = self._insert(rows[:middle])
+        second_inserted, second_failed = self._insert(rows[middle:])
+        return first_inserted + second_inserted, first_failed + second_failed
+
+    def _drop_stored(self, rows):
+        """
+        Remove rows whose fingerprint is already in log_entries
+
+        Only rows the filter reports as possibly stored are looked up, all
+        in one query; the rest are certainly new.
+
+        Args:
+            rows: Row dicts from QSORecord.to_row
+
+        Returns:
+            The rows that are not stored yet
+        """
+        maybe_stored = [
+            row['qso_fingerprint'] for row in rows
+            if row['qso_fingerprint'] in self.qso_filter
+        ]
+        if not maybe_stored:
+            return rows
+
+        stored = set(
+            bytes(fingerprint) for fingerprint in db.session.execute(
+                select(LogEntry.qso_fingerprint).where(
+                    LogEntry.user_id == self.user_id,
+                    LogEntry.qso_fingerprint.in_(maybe_stored)
+                )
+            ).scalars()
+        )
+        if not stored:
+            return rows
+        return [row for row in rows if row['qso_fingerprint'] not in stored]
+
+
+class CopyIngest:
+    """
+    Stream QSO records for one user into a staging table with COPY and
+    merge them into log_entries with one anti-join INSERT
+
+    COPY avoids per-row statement overhead, so this is the fastest way to
+    load whole-club archives. The import is a single transaction: either
+    every new record is inserted or none is. A failed COPY cannot be split
+    like a batch, so records with values too long for their columns or
+    without a qso_start are counted as errors and left out before they are
+    copied.
+    """
+
+    STAGING_TABLE = 'log_entries_staging'
+    COLUMNS = QSORecord.FIELDS
+
+    # Characters handed to psycopg2 per read of the COPY stream
+    COPY_READ_SIZE = 256 * 1024
+
+    def __init__(self, user_id, progress=None):
+        self.user_id = user_id
+        # Called with this ingest once the merge is done, inside its transaction
+        self.progress = progress
+        self.total_count = 0
+        self.new_count = 0
+        self.duplicate_count = 0
+        self.error_count = 0
+
+    def ingest(self, records):
+        """
+        Copy every record into the staging table, merge and commit
+
+        Args:
+            records: Iterable of QSORecords
+
+        Returns:
+            self, with the final counts
+        """
+        columns = ', '.join(self.COLUMNS)
+        connection = db.session.connection()
+
+        # Temporary tables skip the WAL and are dropped with the transaction
+        connection.exec_driver_sql(
+            f"CREATE TEMP TABLE {self.STAGING_TABLE} ON COMMIT DROP AS "
+            f"SELECT {columns} FROM log_entries WITH NO DATA"
+        )
+        connection.exec_driver_sql(f"ALTER TABLE {self.STAGING_TABLE} ADD COLUMN seq bigint")
+
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {self.STAGING_TABLE} ({columns}, seq) FROM STDIN",
+                _CopyStream(self._copy_lines(records)),
+                size=self.COPY_READ_SIZE
+            )
+        finally:
+            cursor.close()
+
+        # Temporary tables are never auto-analyzed; give the planner real row counts
+        connection.exec_driver_sql(f"ANALYZE {self.STAGING_TABLE}")
+
+        # DISTINCT ON keeps the first copy of a QSO repeated within the file;
+        # ON CONFLICT covers rows committed by a concurrent upload
+        result = connection.execute(text(f"""
+            INSERT INTO log_entries (user_id, uploaded_at, {columns})
+            SELECT DISTINCT ON (s.qso_fingerprint)
+                   :user_id, timezone('utc', now()), {', '.join('s.' + c for c in self.COLUMNS)}
+            FROM {self.STAGING_TABLE} s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM log_entries e
+                WHERE e.user_id = :user_id AND e.qso_fingerprint = s.qso_fingerprint
+            )
+            ORDER BY s.qso_fingerprint, s.seq
+            ON CONFLICT (user_id, qso_fingerprint) DO NOTHING
+        """), {'user_id': self.user_id})
+
+        self.new_count = result.rowcount
+        self.duplicate_count = self.total_count - self.new_count - self.error_count
+        if self.progress:
+            self.progress(self)
+        db.session.commit()
+        return self
+
+    def _copy_lines(self, records):
+        """Render records as COPY text format lines, counting them"""
+        for record in records:
+            self.total_count += 1
+            if record.qso_start is None or oversized_fields(record):
+                self.error_count += 1
+                continue
+            values = [_copy_value(getattr(record, name)) for name in self.COLUMNS]
+            values.append(str(self.total_count))
+            yield '\t'.join(values) + '\n'
+
+
+class _CopyStream:
+    """File-like object that pulls COPY lines from an iterator as psycopg2 reads"""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._pending = ''
+
+    def read(self, size=-1):
+        parts = [self._pending]
+        length = len(self._pending)
+        if size < 0 or length < size:
+            for line in self._lines:
+                parts.append(line)
+                length += len(line)
+                if 0 <= size <= length:
+                    break
+
+        data = ''.join(parts)
+        if size < 0:
+            self._pending = ''
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+
+def _copy_value(value):
+    """
+    Render one value in COPY text format
+
+    Args:
+        value: str, bytes (bytea), dict (JSON), datetime, Decimal or None
+
+    Returns:
+        Escaped field text
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bytes):
+        # bytea hex input; the backslash itself is escaped for COPY
+        return '\\\\x' + value.hex()
+    if isinstance(value, dict):
+        # Escaped as \u0000 inside JSON, where jsonb rejects it
+        value = json.dumps({
+            key.replace('\x00', ''): item.replace('\x00', '') if isinstance(item, str) else item
+            for key, item in value.items()
+        })
+    elif isinstance(value, datetime):
+        return value.isoformat()
+    elif isinstance(value, Decimal):
+        return str(value)
+    return value.translate(_COPY_ESCAPES)
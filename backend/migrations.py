@@ -0,0 +1,536 @@
+"""
+Schema migrations for existing databases
+New databases get the current schema from `flask init-db`, which records
+every migration below as applied. Databases created by an older release are
+brought up to date with `flask migrate`, which runs the migrations they have
+not had yet, in the order they are defined here, and records each one in the
+schema_migrations table. Every migration is safe to run again, so databases
+updated by hand with the migrate_*.py scripts of earlier releases simply
+catch up.
+"""
+import json
+from datetime import datetime, timezone
+
+from sqlalchemy import select, text
+
+from models import db, SchemaMigration
+from adif_parser import qso_start_from, freq_mhz_from, base_call_from
+
+# Rows converted per transaction while backfilling
+BATCH_SIZE = 10000
+
+
+class Migration:
+    """A named schema change, applied at most once per database"""
+
+    def __init__(self, name, apply, transactional):
+        self.name = name
+        self.apply = apply
+        self.transactional = transactional
+        self.description = (apply.__doc__ or '').strip().split('\n')[0]
+
+
+MIGRATIONS = []
+
+
+def migration(name, transactional=True):
+    """
+    Register a migration function; migrations run in the order registered
+
+    The function is called with a SQLAlchemy connection. A transactional
+    migration is committed together with its schema_migrations row, so it
+    either runs completely or not at all.
+
+    Args:
+        name: Unique name recorded once the migration has run; never rename
+            one that has shipped
+        transactional: False for statements that cannot run in a transaction
+            block, such as CREATE INDEX CONCURRENTLY. The connection is then
+            in autocommit mode, and the migration must finish the job when
+            run again after failing part way through.
+    """
+    def register(apply):
+        MIGRATIONS.append(Migration(name, apply, transactional))
+        return apply
+    return register
+
+
+def applied_migrations():
+    """
+    Read the names of migrations already applied, creating the tracking
+    table if this database has never been migrated
+
+    Returns:
+        Set of migration names
+    """
+    SchemaMigration.__table__.create(db.engine, checkfirst=True)
+    with db.engine.connect() as connection:
+        return set(connection.execute(select(SchemaMigration.name)).scalars())
+
+
+def pending_migrations():
+    """
+    List the migrations this database has not had yet
+
+    Returns:
+        List of Migration, in the order they must be applied
+    """
+    applied = applied_migrations()
+    return [m for m in MIGRATIONS if m.name not in applied]
+
+
+def apply_migration(m):
+    """
+    Run one migration and record it as applied
+
+    Args:
+        m: Migration from pending_migrations
+    """
+    if m.transactional:
+        with db.engine.begin() as connection:
+            m.apply(connection)
+            _record(connection, m)
+        return
+
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        m.apply(connection)
+    with db.engine.begin() as connection:
+        _record(connection, m)
+
+
+def mark_all_applied():
+    """Record every migration as applied, for a database created from the current models"""
+    pending = pending_migrations()
+    with db.engine.begin() as connection:
+        for m in pending:
+            _record(connection, m)
+
+
+def _record(connection, m):
+    """Insert the schema_migrations row of a migration"""
+    connection.execute(SchemaMigration.__table__.insert().values(
+        name=m.name,
+        applied_at=datetime.utcnow()
+    ))
+
+
+def create_index_concurrently(connection, name, table, columns, using='btree', unique=False):
+    """
+    Build an index without blocking inserts, updates or deletes
+
+    A concurrent build that fails leaves an INVALID index behind, which
+    IF NOT EXISTS would accept, so one is dropped and built again.
+
+    Args:
+        connection: Connection in autocommit mode
+        name: Index name
+        table: Table name
+        columns: Column names, in index order, each optionally followed by
+            an operator class
+        using: Index access method, e.g. brin
+        unique: Build a unique index, e.g. to back a UNIQUE constraint
+    """
+    valid = connection.execute(text("""
+        SELECT i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :name
+    """), {'name': name}).scalar()
+
+    if valid is False:
+        print(f'   Dropping invalid index {name} left by a failed build...')
+        connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {name}'))
+
+    connection.execute(text(
+        f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY IF NOT EXISTS {name} '
+        f'ON {table} USING {using} ({", ".join(columns)})'
+    ))
+
+
+def set_not_null(connection, table, column):
+    """
+    Make a filled-in column NOT NULL without blocking writes while it is checked
+    
+    A validated CHECK lets SET NOT NULL skip its table scan, and validating
+    does not block writes the way SET NOT NULL's scan would.
+    
+    Args:
+        connection: Connection in autocommit mode
+        table: Table name
+        column: Column name
+    """
+    constraint = f'{table}_{column}_not_null'
+    exists = connection.execute(text("""
+        SELECT conname FROM pg_constraint WHERE conname = :constraint
+    """), {'constraint': constraint}).first()
+    if not exists:
+        connection.execute(text(
+            f'ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID'
+        ))
+    connection.execute(text(f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}'))
+    connection.execute(text(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL'))
+    connection.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT {constraint}'))
+
+
+@migration('0001_report_template_shared_role')
+def add_shared_role(connection):
+    """Add shared_with_role to report_templates"""
+    connection.execute(text("""
+        ALTER TABLE report_templates
+        ADD COLUMN IF NOT EXISTS shared_with_role VARCHAR(20) NULL
+    """))
+
+
+@migration('0002_qso_fingerprint', transactional=False)
+def add_qso_fingerprint(connection):
+    """
+    Replace the hex qso_hash dedup key with a binary qso_fingerprint
+
+    Processes of the previous release may keep serving uploads while this
+    runs: a trigger fingerprints the rows they insert until the constraints
+    are in place. The new release inserts ON CONFLICT (user_id,
+    qso_fingerprint), so it must not serve uploads before this migration has
+    finished, and processes of the previous release must be replaced as
+    soon as it has, since they cannot insert rows without the trigger.
+    """
+    connection.execute(text("""
+        ALTER TABLE log_entries
+        ADD COLUMN IF NOT EXISTS qso_fingerprint BYTEA NULL
+    """))
+
+    # Rows inserted by the previous release during the backfill would
+    # otherwise stay NULL and fail the NOT NULL check
+    connection.execute(text("""
+        CREATE OR REPLACE FUNCTION log_entries_fill_qso_fingerprint() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.qso_fingerprint IS NULL AND NEW.qso_hash IS NOT NULL THEN
+                NEW.qso_fingerprint = decode(substr(NEW.qso_hash, 1, 32), 'hex');
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """))
+    connection.execute(text('DROP TRIGGER IF EXISTS fill_qso_fingerprint ON log_entries'))
+    connection.execute(text("""
+        CREATE TRIGGER fill_qso_fingerprint
+        BEFORE INSERT OR UPDATE OF qso_hash ON log_entries
+        FOR EACH ROW EXECUTE FUNCTION log_entries_fill_qso_fingerprint()
+    """))
+
+    # Backfill in id ranges, each its own transaction, so every batch is
+    # an index range scan and uploads are never blocked for long. The
+    # fingerprint is the first 16 bytes of the SHA256 digest that
+    # qso_hash holds in hex
+    total = 0
+    last_id = 0
+    while True:
+        batch_end = connection.execute(text("""
+            SELECT max(id) FROM (
+                SELECT id FROM log_entries
+                WHERE id > :last_id
+                ORDER BY id
+                LIMIT :batch_size
+            ) batch
+        """), {'last_id': last_id, 'batch_size': BATCH_SIZE}).scalar()
+        if batch_end is None:
+            break
+
+        result = connection.execute(text("""
+            UPDATE log_entries
+            SET qso_fingerprint = decode(substr(qso_hash, 1, 32), 'hex')
+            WHERE id > :last_id AND id <= :batch_end AND qso_fingerprint IS NULL
+        """), {'last_id': last_id, 'batch_end': batch_end})
+        last_id = batch_end
+        total += result.rowcount
+        if result.rowcount:
+            print(f'   {total} rows converted')
+
+    set_not_null(connection, 'log_entries', 'qso_fingerprint')
+
+    # The unique index is built without blocking writes and then adopted
+    # by the constraint, which only takes a brief lock
+    exists = connection.execute(text("""
+        SELECT constraint_name
+        FROM information_schema.table_constraints
+        WHERE table_name='log_entries'
+        AND constraint_name='unique_qso_fingerprint_per_user'
+    """)).first()
+    if not exists:
+        create_index_concurrently(
+            connection, 'unique_qso_fingerprint_per_user', 'log_entries',
+            ['user_id', 'qso_fingerprint'], unique=True
+        )
+        connection.execute(text("""
+            ALTER TABLE log_entries
+            ADD CONSTRAINT unique_qso_fingerprint_per_user
+            UNIQUE USING INDEX unique_qso_fingerprint_per_user
+        """))
+
+    connection.execute(text("""
+        ALTER TABLE log_entries
+        DROP CONSTRAINT IF EXISTS unique_qso_per_user
+    """))
+    connection.execute(text('DROP INDEX CONCURRENTLY IF EXISTS ix_log_entries_qso_hash'))
+    connection.execute(text("""
+        ALTER TABLE log_entries
+        ALTER COLUMN qso_hash DROP NOT NULL
+    """))
+
+    connection.execute(text('DROP TRIGGER IF EXISTS fill_qso_fingerprint ON log_entries'))
+    connection.execute(text('DROP FUNCTION IF EXISTS log_entries_fill_qso_fingerprint()'))
+
+
+@migration('0003_upload_jobs')
+def add_upload_jobs(connection):
+    """Add background job columns and a status index to upload_logs"""
+    connection.execute(text("""
+        ALTER TABLE upload_logs
+        ADD COLUMN IF NOT EXISTS spool_path VARCHAR(500) NULL,
+        ADD COLUMN IF NOT EXISTS file_size BIGINT NULL,
+        ADD COLUMN IF NOT EXISTS started_at TIMESTAMP NULL,
+        ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP NULL,
+        ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP NULL,
+        ADD COLUMN IF NOT EXISTS error_message TEXT NULL
+    """))
+    connection.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_upload_logs_status
+        ON upload_logs (status)
+    """))
+
+    # Synchronous uploads interrupted mid-request can never finish
+    connection.execute(text("""
+        UPDATE upload_logs
+        SET status = 'failed'
+        WHERE status = 'processing' AND spool_path IS NULL
+    """))
+
+
+@migration('0004_upload_sessions')
+def add_upload_sessions(connection):
+    """Add resumable upload session columns to upload_logs"""
+    connection.execute(text("""
+        ALTER TABLE upload_logs
+        ADD COLUMN IF NOT EXISTS received_bytes BIGINT NULL,
+        ADD COLUMN IF NOT EXISTS parsed_bytes BIGINT DEFAULT 0,
+        ADD COLUMN IF NOT EXISTS received_at TIMESTAMP NULL
+    """))
+
+
+@migration('0005_upload_digests')
+def add_upload_digests(connection):
+    """Add the SHA-256 content digest of uploaded files to upload_logs"""
+    connection.execute(text("""
+        ALTER TABLE upload_logs
+        ADD COLUMN IF NOT EXISTS content_digest BYTEA NULL
+    """))
+    connection.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_upload_logs_user_digest
+        ON upload_logs (user_id, content_digest)
+    """))
+
+
+@migration('0006_log_entries_user_date_time', transactional=False)
+def add_log_date_index(connection):
+    """Index log_entries on (user_id, qso_date, time_on, id) for listings and exports"""
+    # Read forwards for exports and backwards for newest-first pages, so
+    # neither sorts the user's log
+    create_index_concurrently(
+        connection, 'ix_log_entries_user_date_time', 'log_entries',
+        ['user_id', 'qso_date', 'time_on', 'id']
+    )
+
+
+@migration('0007_log_entries_user_band_mode', transactional=False)
+def add_log_band_mode_index(connection):
+    """Index log_entries on (user_id, band, mode) for filters and statistics"""
+    create_index_concurrently(
+        connection, 'ix_log_entries_user_band_mode', 'log_entries',
+        ['user_id', 'band', 'mode']
+    )
+
+
+@migration('0008_log_entries_qso_start', transactional=False)
+def add_qso_start(connection):
+    """Add typed qso_start and freq_mhz columns to log_entries and backfill them"""
+    connection.execute(text("""
+        ALTER TABLE log_entries
+        ADD COLUMN IF NOT EXISTS qso_start TIMESTAMPTZ NULL,
+        ADD COLUMN IF NOT EXISTS freq_mhz NUMERIC(12, 6) NULL
+    """))
+
+    # Converted in Python so stored rows get exactly the values ingest
+    # gives new ones; each batch is its own transaction
+    total = 0
+    undated = 0
+    last_id = 0
+    while True:
+        rows = connection.execute(text("""
+            SELECT id, qso_date, time_on, freq, uploaded_at
+            FROM log_entries
+            WHERE id > :last_id AND qso_start IS NULL
+            ORDER BY id
+            LIMIT :batch_size
+        """), {'last_id': last_id, 'batch_size': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+
+        starts = []
+        for row in rows:
+            qso_start = qso_start_from(row.qso_date, row.time_on)
+            if qso_start is None:
+                # Stored before malformed dates were rejected; the upload
+                # time is the best bound there is
+                undated += 1
+                qso_start = (row.uploaded_at or datetime.utcnow()).replace(tzinfo=timezone.utc)
+            starts.append(qso_start)
+
+        connection.execute(text("""
+            UPDATE log_entries
+            SET qso_start = v.qso_start, freq_mhz = v.freq_mhz
+            FROM unnest(CAST(:ids AS integer[]), CAST(:starts AS timestamptz[]),
+                        CAST(:freqs AS numeric[])) AS v(id, qso_start, freq_mhz)
+            WHERE log_entries.id = v.id
+        """), {
+            'ids': [row.id for row in rows],
+            'starts': starts,
+            'freqs': [freq_mhz_from(row.freq) for row in rows]
+        })
+
+        last_id = rows[-1].id
+        total += len(rows)
+        print(f'   {total} rows converted')
+
+    if undated:
+        print(f'   {undated} rows had no valid QSO date and time; qso_start set to their upload time')
+    
+    set_not_null(connection, 'log_entries', 'qso_start')
+
+
+@migration('0009_log_entries_qso_start_indexes', transactional=False)
+def add_qso_start_indexes(connection):
+    """Index qso_start and freq_mhz, replacing the (qso_date, time_on) index"""
+    create_index_concurrently(
+        connection, 'ix_log_entries_user_qso_start', 'log_entries',
+        ['user_id', 'qso_start', 'id']
+    )
+    # A few pages per block range, however large the table; effective while
+    # rows arrive roughly in QSO order, as they do from live logging
+    create_index_concurrently(
+        connection, 'ix_log_entries_qso_start_brin', 'log_entries', ['qso_start'], using='brin'
+    )
+    create_index_concurrently(
+        connection, 'ix_log_entries_freq_mhz', 'log_entries', ['freq_mhz']
+    )
+    connection.execute(text('DROP INDEX CONCURRENTLY IF EXISTS ix_log_entries_user_date_time'))
+
+
+@migration('0010_additional_fields_jsonb')
+def convert_additional_fields_jsonb(connection):
+    """Store log_entries.additional_fields as JSONB"""
+    data_type = connection.execute(text("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'log_entries' AND column_name = 'additional_fields'
+    """)).scalar()
+    if data_type == 'jsonb':
+        return
+
+    # jsonb cannot hold the NUL characters json accepted as \u0000, so
+    # they are dropped first, as COPY imports always did
+    rows = connection.execute(text("""
+        SELECT id, additional_fields FROM log_entries
+        WHERE strpos(additional_fields::text, :nul) > 0
+    """), {'nul': '\\u0000'}).fetchall()
+    for row in rows:
+        fields = {
+            key.replace('\x00', ''): value.replace('\x00', '') if isinstance(value, str) else value
+            for key, value in row.additional_fields.items()
+        }
+        connection.execute(text("""
+            UPDATE log_entries SET additional_fields = CAST(:fields AS json) WHERE id = :id
+        """), {'fields': json.dumps(fields), 'id': row.id})
+    if rows:
+        print(f'   Removed NUL characters from the additional fields of {len(rows)} rows')
+
+    # Rewrites the table and its indexes; writes wait until it finishes
+    print('   Converting additional_fields to JSONB...')
+    connection.execute(text("""
+        ALTER TABLE log_entries
+        ALTER COLUMN additional_fields TYPE JSONB USING additional_fields::jsonb
+    """))
+
+
+@migration('0011_additional_fields_index', transactional=False)
+def add_additional_fields_index(connection):
+    """Index additional_fields for containment filters such as contest_id"""
+    # jsonb_path_ops only supports @> and jsonpath matches, but is a
+    # fraction of the size of the default operator class
+    create_index_concurrently(
+        connection, 'ix_log_entries_additional_fields', 'log_entries',
+        ['additional_fields jsonb_path_ops'], using='gin'
+    )
+
+
+@migration('0012_log_entries_base_call', transactional=False)
+def add_base_call(connection):
+    """Add the base_call column searched by callsign to log_entries and backfill it"""
+    connection.execute(text("""
+        ALTER TABLE log_entries
+        ADD COLUMN IF NOT EXISTS base_call VARCHAR(20) NULL
+    """))
+
+    # Derived in Python so stored rows match what ingest stores; each batch
+    # is its own transaction
+    total = 0
+    last_id = 0
+    while True:
+        rows = connection.execute(text("""
+            SELECT id, call
+            FROM log_entries
+            WHERE id > :last_id AND base_call IS NULL
+            ORDER BY id
+            LIMIT :batch_size
+        """), {'last_id': last_id, 'batch_size': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+
+        connection.execute(text("""
+            UPDATE log_entries
+            SET base_call = v.base_call
+            FROM unnest(CAST(:ids AS integer[]), CAST(:base_calls AS varchar[])) AS v(id, base_call)
+            WHERE log_entries.id = v.id
+        """), {
+            'ids': [row.id for row in rows],
+            # Uppercasing can lengthen a call (ß is SS), which ingest rejects
+            'base_calls': [base_call_from(row.call)[:20] for row in rows]
+        })
+
+        last_id = rows[-1].id
+        total += len(rows)
+        print(f'   {total} rows converted')
+
+    set_not_null(connection, 'log_entries', 'base_call')
+
+
+@migration('0013_log_entries_base_call_indexes', transactional=False)
+def add_base_call_indexes(connection):
+    """Index base_call for exact, prefix, suffix and wildcard callsign searches"""
+    create_index_concurrently(
+        connection, 'ix_log_entries_user_base_call', 'log_entries',
+        ['user_id', 'base_call varchar_pattern_ops']
+    )
+    create_index_concurrently(
+        connection, 'ix_log_entries_user_base_call_reversed', 'log_entries',
+        ['user_id', 'reverse(base_call) text_pattern_ops']
+    )
+
+    available = connection.execute(text("""
+        SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'
+    """)).first()
+    if not available:
+        print('   pg_trgm is not installed; wildcard callsign searches will not be indexed')
+        return
+    connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+    create_index_concurrently(
+        connection, 'ix_log_entries_base_call_trgm', 'log_entries',
+        ['base_call gin_trgm_ops'], using='gin'
+    )
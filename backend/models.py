@@ -2,6 +2,8 @@
 Database models for LogShackBaby Amateur Radio Log Server
 """
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 import secrets
 
@@ -52,6 +54,15 @@ class APIKey(db.Model):
         return f'<APIKey {self.key_prefix}...>'
 
 
+def trigram_available(ddl, target, bind, **kw):
+    """Tell whether the PostgreSQL server can provide the pg_trgm extension"""
+    if bind is None or bind.dialect.name != 'postgresql':
+        return False
+    return bind.execute(text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    )).first() is not None
+
+
 class LogEntry(db.Model):
     __tablename__ = 'log_entries'
     
@@ -78,22 +89,56 @@ class LogEntry(db.Model):
     qth = db.Column(db.String(100), nullable=True)
     comment = db.Column(db.Text, nullable=True)
     
-    # Additional ADIF fields stored as JSON
-    additional_fields = db.Column(db.JSON, nullable=True)
+    # Typed copies of qso_date/time_on and freq, set at ingest, for range queries
+    qso_start = db.Column(db.DateTime(timezone=True), nullable=False)  # UTC
+    freq_mhz = db.Column(db.Numeric(12, 6), nullable=True)
+    # call without portable designators (W1/DL1ABC/P is DL1ABC), for search
+    base_call = db.Column(db.String(20), nullable=False)
+    
+    # Additional ADIF fields stored as JSON (JSONB on PostgreSQL)
+    additional_fields = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'), nullable=True)
     
     # Metadata
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
-    qso_hash = db.Column(db.String(64), nullable=False, index=True)  # For deduplication
-    
-    # Unique constraint for deduplication
+    qso_hash = db.Column(db.String(64), nullable=True)  # Hex SHA256, kept for compatibility
+    qso_fingerprint = db.Column(db.LargeBinary(16), nullable=False)  # Binary dedup key
+    
+    # Unique constraint for deduplication; listings, exports, keyset
+    # pagination and date filters read a user's log in (qso_start, id)
+    # order, band/mode filters and statistics use (band, mode), and
+    # reports across all users range over qso_start or freq_mhz and match
+    # additional fields such as contest_id by JSONB containment. Callsign
+    # searches read base_call from a pattern B-tree (exact and prefix),
+    # its reverse (suffix) or, where pg_trgm is installed, trigrams
     __table_args__ = (
-        db.UniqueConstraint('user_id', 'qso_hash', name='unique_qso_per_user'),
+        db.UniqueConstraint('user_id', 'qso_fingerprint', name='unique_qso_fingerprint_per_user'),
+        db.Index('ix_log_entries_user_qso_start', 'user_id', 'qso_start', 'id'),
+        db.Index('ix_log_entries_user_band_mode', 'user_id', 'band', 'mode'),
+        db.Index('ix_log_entries_qso_start_brin', 'qso_start', postgresql_using='brin'),
+        db.Index('ix_log_entries_freq_mhz', 'freq_mhz'),
+        db.Index('ix_log_entries_additional_fields', 'additional_fields', postgresql_using='gin',
+                 postgresql_ops={'additional_fields': 'jsonb_path_ops'}),
+        db.Index('ix_log_entries_user_base_call', 'user_id', 'base_call',
+                 postgresql_ops={'base_call': 'varchar_pattern_ops'}),
+        db.Index('ix_log_entries_user_base_call_reversed', 'user_id',
+                 func.reverse(text('base_call')).label('base_call_reversed'),
+                 postgresql_ops={'base_call_reversed': 'text_pattern_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_log_entries_base_call_trgm', 'base_call', postgresql_using='gin',
+                 postgresql_ops={'base_call': 'gin_trgm_ops'}).ddl_if(callable_=trigram_available),
     )
     
     def __repr__(self):
         return f'<LogEntry {self.station_callsign or "?"} -> {self.call} on {self.qso_date}>'
 
 
+# The trigram index needs pg_trgm; without it, wildcard callsign searches
+# still work but read through the user's whole log
+event.listen(
+    LogEntry.__table__, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(callable_=trigram_available)
+)
+
+
 class Session(db.Model):
     __tablename__ = 'sessions'
     
@@ -120,7 +165,27 @@ class UploadLog(db.Model):
     new_records = db.Column(db.Integer, default=0)
     duplicate_records = db.Column(db.Integer, default=0)
     error_records = db.Column(db.Integer, default=0)
-    status = db.Column(db.String(20), default='processing')  # processing, completed, failed
+    status = db.Column(db.String(20), default='queued', index=True)  # receiving, queued, processing, completed, failed
+    
+    # Background ingest job
+    spool_path = db.Column(db.String(500), nullable=True)  # Uploaded file awaiting a worker
+    file_size = db.Column(db.BigInteger, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # Last sign of life from the worker
+    error_message = db.Column(db.Text, nullable=True)
+    
+    # Resumable upload session; file_size stays null until it is finalized
+    received_bytes = db.Column(db.BigInteger, nullable=True)  # Null for single-request uploads
+    parsed_bytes = db.Column(db.BigInteger, default=0)  # Records before this offset are ingested
+    received_at = db.Column(db.DateTime, nullable=True)  # Last chunk from the client
+    
+    # SHA-256 of the file as sent; matches repeated and grown uploads
+    content_digest = db.Column(db.LargeBinary(32), nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_upload_logs_user_digest', 'user_id', 'content_digest'),
+    )
     
     def __repr__(self):
         return f'<UploadLog {self.filename} - {self.status}>'
@@ -142,3 +207,13 @@ class ReportTemplate(db.Model):
     
     def __repr__(self):
         return f'<ReportTemplate {self.name}>'
+
+
+class SchemaMigration(db.Model):
+    __tablename__ = 'schema_migrations'
+    
+    name = db.Column(db.String(100), primary_key=True)  # Name registered in migrations.py
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SchemaMigration {self.name}>'
@@ -0,0 +1,117 @@
+"""
+Keyset (seek) pagination of log entries
+Pages are read newest first in (qso_start, id) order and each one continues
+from an opaque cursor holding the sort key of the last row shown.
+Every page is then a single index range scan, however deep it is, where
+OFFSET would read and throw away every row before it. Totals are optional
+and, for large logs, estimated by the query planner instead of counted.
+"""
+import json
+import base64
+import binascii
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+from models import db, LogEntry
+
+# Sort key of a page, newest first; id breaks ties between equal times
+SORT_COLUMNS = (LogEntry.qso_start, LogEntry.id)
+
+# Planner estimates below this are replaced by an exact count, which is
+# cheap at that size and avoids showing small logs a wrong total
+EXACT_COUNT_BELOW = 10000
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that was not issued by encode_cursor"""
+    pass
+
+
+def encode_cursor(entry):
+    """
+    Build the cursor of the page that follows a log entry
+
+    Args:
+        entry: Last LogEntry, or row with qso_start and id, of the current page
+
+    Returns:
+        URL-safe cursor string
+    """
+    key = json.dumps([entry.qso_start.isoformat(), entry.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Recover the sort key stored in a cursor
+
+    Args:
+        cursor: String from encode_cursor
+
+    Returns:
+        Tuple of (qso_start, id)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if (not isinstance(key, list) or len(key) != 2
+                or not isinstance(key[0], str) or not isinstance(key[1], int)):
+            raise ValueError
+        return datetime.fromisoformat(key[0]), key[1]
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def paginate_logs(query, per_page, cursor=None):
+    """
+    Read one page of log entries, newest first
+
+    Args:
+        query: LogEntry query with any filters applied, but no ordering; it
+            may be narrowed to rows that include qso_start and id
+        per_page: Entries per page
+        cursor: Cursor returned with the previous page, or None for the first
+
+    Returns:
+        Tuple of (list of LogEntry or rows, cursor of the next page or None)
+    """
+    if cursor:
+        query = query.filter(tuple_(*SORT_COLUMNS) < tuple_(*decode_cursor(cursor)))
+
+    # One extra row tells whether another page follows
+    entries = query.order_by(*(column.desc() for column in SORT_COLUMNS)).limit(per_page + 1).all()
+    if len(entries) <= per_page:
+        return entries, None
+    entries = entries[:per_page]
+    return entries, encode_cursor(entries[-1])
+
+
+def estimate_count(query):
+    """
+    Count the rows of a query, estimating when there are many
+
+    On PostgreSQL the planner's row estimate is read with EXPLAIN, which
+    costs nothing however many rows match; small results are counted.
+
+    Args:
+        query: LogEntry query with any filters applied
+
+    Returns:
+        Tuple of (count, True if it is an estimate)
+    """
+    query = query.order_by(None)
+    if db.engine.dialect.name == 'postgresql':
+        compiled = query.statement.compile(dialect=db.engine.dialect)
+        plan = db.session.connection().exec_driver_sql(
+            f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate >= EXACT_COUNT_BELOW:
+            return estimate, True
+
+    return query.count(), False
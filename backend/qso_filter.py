@@ -0,0 +1,105 @@
+"""
+Per-user Bloom filters over QSO fingerprints
+A filter answers "certainly not stored" or "maybe stored" for a fingerprint
+without touching the database, so uploads only look up the records that
+may be duplicates. Filters are built lazily from log_entries and kept per
+process. A stale filter only costs extra lookups, never a wrong count,
+because inserts still use ON CONFLICT DO NOTHING.
+"""
+import math
+from collections import OrderedDict
+
+from sqlalchemy import select, func
+
+from models import db, LogEntry
+
+
+class QSOFilter:
+    """Bloom filter over 16-byte QSO fingerprints"""
+
+    FALSE_POSITIVE_RATE = 0.01
+
+    def __init__(self, capacity):
+        self.capacity = max(capacity, 1)
+        ln2 = math.log(2)
+        self.size = max(64, int(-self.capacity * math.log(self.FALSE_POSITIVE_RATE) / ln2 ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * ln2))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, fingerprint):
+        # Fingerprints are already uniform SHA256 bytes, so its two halves
+        # serve directly as the double-hashing pair
+        first = int.from_bytes(fingerprint[:8], 'big')
+        step = int.from_bytes(fingerprint[8:16], 'big') | 1
+        size = self.size
+        return [(first + i * step) % size for i in range(self.hash_count)]
+
+    def add(self, fingerprint):
+        bits = self.bits
+        for position in self._positions(fingerprint):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, fingerprint):
+        bits = self.bits
+        for position in self._positions(fingerprint):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def full(self):
+        """True once more fingerprints were added than the filter was sized for"""
+        return self.count > self.capacity
+
+
+class QSOFilterCache:
+    """Least recently used QSOFilters, one per user"""
+
+    # Filters are sized for this many QSOs or twice the stored count, whichever is larger
+    MIN_CAPACITY = 10000
+
+    def __init__(self, max_users=64):
+        self.max_users = max_users
+        self._filters = OrderedDict()
+
+    def get(self, user_id):
+        """
+        Return the user's filter, building it from log_entries if needed
+
+        Returns:
+            QSOFilter, or None when the cache is disabled
+        """
+        if self.max_users <= 0:
+            return None
+
+        qso_filter = self._filters.pop(user_id, None)
+        if qso_filter is None or qso_filter.full:
+            qso_filter = self.build(user_id)
+
+        self._filters[user_id] = qso_filter
+        while len(self._filters) > self.max_users:
+            self._filters.popitem(last=False)
+        return qso_filter
+
+    def discard(self, user_id):
+        """Forget a user's filter, e.g. after rows were added without it"""
+        self._filters.pop(user_id, None)
+
+    def build(self, user_id):
+        """Load every stored fingerprint of a user into a new filter"""
+        count = db.session.execute(
+            select(func.count()).select_from(LogEntry).where(LogEntry.user_id == user_id)
+        ).scalar()
+        qso_filter = QSOFilter(max(count * 2, self.MIN_CAPACITY))
+
+        fingerprints = db.session.execute(
+            select(LogEntry.qso_fingerprint)
+            .where(LogEntry.user_id == user_id)
+            .execution_options(yield_per=10000)
+        ).scalars()
+        for fingerprint in fingerprints:
+            qso_filter.add(bytes(fingerprint))
+
+        return qso_filter
@@ -0,0 +1,91 @@
+"""
+Serialization of log listings
+Listing endpoints select only the columns they return, as plain rows rather
+than LogEntry objects, so a page skips ORM hydration and never loads the
+additional_fields JSON of its entries. Responses are encoded with orjson
+when it is installed and with the json module otherwise.
+"""
+import json
+
+from flask import Response
+
+from models import LogEntry
+from pagination import SORT_COLUMNS
+
+try:
+    import orjson
+except ImportError:  # Optional; responses are encoded with json without it
+    orjson = None
+
+# Fields of each entry in a user's own log listing, in response order
+LOG_FIELDS = (
+    'id', 'qso_date', 'time_on', 'call', 'band', 'mode', 'freq',
+    'rst_sent', 'rst_rcvd', 'station_callsign', 'gridsquare', 'name', 'comment'
+)
+
+# Fields of each entry when an admin views another user's log
+ADMIN_LOG_FIELDS = (
+    'id', 'qso_date', 'time_on', 'call', 'band', 'mode', 'freq',
+    'rst_sent', 'rst_rcvd', 'station_callsign', 'comment'
+)
+
+
+def project_logs(query, fields):
+    """
+    Narrow a LogEntry query to rows of the given fields
+
+    The sort key columns missing from fields are selected after them, so
+    the rows can still be paged with paginate_logs.
+
+    Args:
+        query: LogEntry query with any filters applied
+        fields: LogEntry attribute names, in response order
+
+    Returns:
+        Query yielding rows whose leading values are the fields
+    """
+    columns = [getattr(LogEntry, field) for field in fields]
+    columns += [column for column in SORT_COLUMNS if column.key not in fields]
+    return query.with_entities(*columns)
+
+
+def log_dicts(rows, fields):
+    """
+    Build the response entries of rows from project_logs
+
+    Args:
+        rows: Rows from a query narrowed with the same fields
+        fields: Field names passed to project_logs
+
+    Returns:
+        List of dicts keyed by field; trailing sort key values are dropped
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def dumps(obj):
+    """
+    Encode an object as compact UTF-8 JSON
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        Encoded bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(obj):
+    """
+    Build a JSON response like jsonify, encoded with dumps
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        Flask Response with the application/json mimetype
+    """
+    return Response(dumps(obj), mimetype='application/json')
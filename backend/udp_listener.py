@@ -0,0 +1,277 @@
+"""
+Listener for QSO broadcasts from logging software
+Decodes the "Logged ADIF" datagrams WSJT-X and JTDX send over UDP and the
+<contactinfo> datagrams of N1MM Logger+ into ADIFParser records, and inserts
+them in batches for the users whose API keys are mapped to each station
+callsign.
+"""
+import time
+import select
+import socket
+import struct
+import xml.etree.ElementTree as ET
+from collections import deque
+
+from models import db
+from adif_parser import ADIFParser
+from log_ingest import BulkIngest
+from live_ingest import oversized_fields
+
+# WSJT-X messages start with this magic number, followed by the schema
+# version and message type, all big-endian quint32
+WSJTX_MAGIC = 0xADBCCBDA
+WSJTX_LOGGED_ADIF = 12
+
+# N1MM <contactinfo> elements and the ADIF fields they map to
+N1MM_FIELDS = {
+    'call': 'call',
+    'mycall': 'station_callsign',
+    'operator': 'operator',
+    'mode': 'mode',
+    'snt': 'rst_sent',
+    'rcv': 'rst_rcvd',
+    'sntnr': 'stx',
+    'rcvnr': 'srx',
+    'gridsquare': 'gridsquare',
+    'name': 'name',
+    'comment': 'comment',
+    'contestname': 'contest_id',
+    'power': 'tx_pwr',
+    'section': 'arrl_sect',
+}
+
+# Malformed datagrams raise one of these while being decoded
+DECODE_ERRORS = (struct.error, ET.ParseError, UnicodeDecodeError, ValueError)
+
+
+def decode_datagram(datagram, parser):
+    """
+    Decode a WSJT-X or N1MM datagram into QSO records
+
+    Args:
+        datagram: Raw bytes received
+        parser: ADIFParser used to build the records
+
+    Returns:
+        List of QSORecords; empty for messages that do not log a QSO
+    """
+    if len(datagram) >= 4 and struct.unpack_from('>I', datagram)[0] == WSJTX_MAGIC:
+        adif = decode_wsjtx(datagram)
+        return parser.parse_file(adif) if adif else []
+
+    if datagram.lstrip().startswith(b'<'):
+        fields = decode_n1mm(datagram, parser)
+        if fields is None:
+            return []
+        record = parser.build_record(fields)
+        return [record] if record else []
+
+    return []
+
+
+def decode_wsjtx(datagram):
+    """
+    Extract the ADIF text of a WSJT-X "Logged ADIF" message
+
+    WSJT-X also sends a "QSO Logged" message for every QSO; only the ADIF
+    copy is used so its fields match the station's exported log exactly.
+
+    Args:
+        datagram: Raw bytes of a WSJT-X message
+
+    Returns:
+        ADIF text, or None for any other message type
+    """
+    _, _, message_type = struct.unpack_from('>III', datagram)
+    if message_type != WSJTX_LOGGED_ADIF:
+        return None
+
+    _, pos = _read_utf8(datagram, 12)  # Client id
+    adif, _ = _read_utf8(datagram, pos)
+    return adif
+
+
+def _read_utf8(datagram, pos):
+    """Read a QDataStream utf8 string: a quint32 length, 0xffffffff for null"""
+    (length,) = struct.unpack_from('>I', datagram, pos)
+    pos += 4
+    if length == 0xFFFFFFFF:
+        return None, pos
+    if pos + length > len(datagram):
+        raise ValueError('Truncated WSJT-X string')
+    return datagram[pos:pos + length].decode('utf-8'), pos + length
+
+
+def decode_n1mm(datagram, parser):
+    """
+    Convert an N1MM Logger+ <contactinfo> datagram into ADIF fields
+
+    Edits (<contactreplace>) and deletions are not applied; an edited QSO
+    arrives as a new record.
+
+    Args:
+        datagram: Raw bytes of an N1MM XML message
+        parser: ADIFParser used to look up bands
+
+    Returns:
+        List of (field_name, value) pairs, or None for other messages
+    """
+    root = ET.fromstring(datagram)
+    if root.tag.lower() != 'contactinfo':
+        return None
+
+    values = {child.tag.lower(): (child.text or '').strip() for child in root}
+    fields = []
+    for element, field_name in N1MM_FIELDS.items():
+        value = values.get(element)
+        # Serial numbers are sent as 0 outside of serial-number contests
+        if value and not (field_name in ('stx', 'srx') and value == '0'):
+            fields.append((field_name, value))
+
+    # timestamp is 'YYYY-MM-DD HH:MM:SS' in UTC
+    qso_date, _, time_on = values.get('timestamp', '').partition(' ')
+    fields.append(('qso_date', qso_date.replace('-', '')))
+    fields.append(('time_on', time_on.replace(':', '')))
+
+    # band is in MHz (e.g. 3.5, 14); frequencies are in units of 10 Hz
+    band = parser.band_from_freq(values.get('band'))
+    if band:
+        fields.append(('band', band))
+    for element, field_name in (('txfreq', 'freq'), ('rxfreq', 'freq_rx')):
+        value = values.get(element, '')
+        if value.isdigit() and int(value) > 0:
+            fields.append((field_name, f'{int(value) / 100000:.5f}'))
+
+    return fields
+
+
+class UDPListener:
+    """Receive QSO datagrams and insert them in batches per user"""
+
+    def __init__(self, stations, ports, bind='127.0.0.1', flush_interval=2.0, batch_size=100,
+                 max_pending=10000):
+        """
+        Args:
+            stations: Dict of upper-case station callsign -> user id
+            ports: UDP ports to listen on; the format is detected per datagram
+            bind: Address to bind the sockets to
+            flush_interval: Seconds between inserts of buffered QSOs
+            batch_size: Buffered QSOs that trigger an insert before the interval
+            max_pending: Most QSOs kept while inserts are failing; the oldest
+                are dropped beyond it
+        """
+        self.stations = stations
+        self.ports = ports
+        self.bind = bind
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.parser = ADIFParser()
+        # (user id, record) in arrival order
+        self._pending = deque()
+        self._dropped_count = 0
+        self._failing = False
+
+    def serve(self, stop=None):
+        """
+        Listen until interrupted, or until stop() returns True
+
+        Args:
+            stop: Optional callable checked after every datagram or timeout
+        """
+        sockets = []
+        for port in self.ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.bind, port))
+            sockets.append(sock)
+            print(f'Listening for QSOs on udp://{self.bind}:{port}')
+
+        next_flush = time.monotonic() + self.flush_interval
+        try:
+            while not (stop and stop()):
+                timeout = max(0.0, next_flush - time.monotonic())
+                ready, _, _ = select.select(sockets, [], [], timeout)
+                for sock in ready:
+                    datagram, address = sock.recvfrom(65535)
+                    self.handle(datagram, address)
+
+                # While inserts fail, retry on the interval rather than per datagram
+                full = len(self._pending) >= self.batch_size and not self._failing
+                if full or time.monotonic() >= next_flush:
+                    self.flush()
+                    next_flush = time.monotonic() + self.flush_interval
+        finally:
+            self.flush()
+            for sock in sockets:
+                sock.close()
+
+    def handle(self, datagram, address=None):
+        """
+        Decode a datagram and buffer its QSOs for their station's user
+
+        Args:
+            datagram: Raw bytes received
+            address: (host, port) the datagram came from
+        """
+        source = address[0] if address else 'unknown'
+        try:
+            records = decode_datagram(datagram, self.parser)
+        except DECODE_ERRORS as e:
+            print(f'Ignoring malformed datagram from {source}: {e}')
+            return
+
+        for record in records:
+            if (not self.parser.validate_record(record) or 'qso_start' not in record
+                    or oversized_fields(record)):
+                print(f'Ignoring invalid QSO from {source}: {record.get("call")}')
+                continue
+
+            additional_fields = record.get('additional_fields') or {}
+            station = (record.get('station_callsign') or additional_fields.get('operator') or '').upper()
+            user_id = self.stations.get(station)
+            if user_id is None:
+                print(f'Ignoring QSO with {record.get("call")} from unmapped station {station or "(none)"}')
+                continue
+
+            if len(self._pending) >= self.max_pending:
+                if not self._dropped_count:
+                    print(f'QSO buffer full ({self.max_pending} QSOs), dropping the oldest until inserts succeed')
+                self._pending.popleft()
+                self._dropped_count += 1
+            self._pending.append((user_id, record))
+
+    def flush(self):
+        """
+        Insert all buffered QSOs, one BulkIngest per user
+
+        QSOs of a user whose insert fails stay buffered and are retried on
+        the next flush; dedup makes the retry safe. At most max_pending are
+        kept, so a long database outage drops the oldest QSOs instead of
+        growing without bound.
+        """
+        by_user = {}
+        for user_id, record in self._pending:
+            by_user.setdefault(user_id, []).append(record)
+
+        failed = set()
+        for user_id, records in by_user.items():
+            try:
+                ingest = BulkIngest(user_id).ingest(records)
+            except Exception as e:
+                db.session.rollback()
+                print(f'Failed to store {len(records)} QSOs for user {user_id}, will retry: {e}')
+                failed.add(user_id)
+                continue
+
+            print(f'Stored {ingest.new_count} new QSOs ({ingest.duplicate_count} duplicates) for user {user_id}')
+
+        if failed:
+            self._pending = deque(item for item in self._pending if item[0] in failed)
+        else:
+            self._pending.clear()
+        self._failing = bool(failed)
+
+        if self._dropped_count and not failed:
+            print(f'Dropped {self._dropped_count} QSOs while inserts were failing')
+            self._dropped_count = 0
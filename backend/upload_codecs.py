@@ -0,0 +1,153 @@
+"""
+Compressed upload support
+Detects gzip, zstd and zip uploads from their first bytes, or from the
+request's Content-Encoding, and decompresses them as a stream so the parser
+reads the plain log without it ever being held in memory or written out.
+The decompressed size is counted as it is produced and capped, which stops
+decompression bombs after at most the cap.
+"""
+import gzip
+import zipfile
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Optional; zstd uploads are rejected without it
+    zstandard = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+ZIP_MAGIC = b'PK\x03\x04'
+
+# Content-Encoding values accepted on upload requests
+CONTENT_ENCODINGS = {
+    'gzip': 'gzip',
+    'x-gzip': 'gzip',
+    'zstd': 'zstd',
+}
+
+# Log files picked from inside a zip archive
+LOG_EXTENSIONS = ('.adi', '.adif', '.adx')
+
+# Raised while reading corrupt or truncated compressed data
+CORRUPT_DATA_ERRORS = (OSError, EOFError, zlib.error, zipfile.BadZipFile) + (
+    (zstandard.ZstdError,) if zstandard else ()
+)
+
+
+class DecompressionError(Exception):
+    """A compressed upload is unsupported or corrupt"""
+
+
+class DecompressedSizeExceeded(DecompressionError):
+    """A compressed upload expands past the allowed size"""
+
+
+def detect_compression(head):
+    """
+    Identify a compressed upload from its first bytes
+
+    Args:
+        head: First bytes of the upload (at least 4)
+
+    Returns:
+        'gzip', 'zstd' or 'zip', or None for uncompressed content
+    """
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    if head.startswith(ZIP_MAGIC):
+        return 'zip'
+    return None
+
+
+def open_decompressed(stream, compression, limit):
+    """
+    Wrap a compressed stream in a reader of its decompressed content
+
+    Args:
+        stream: Binary file-like object positioned at the compressed data;
+            zip archives must be seekable
+        compression: 'gzip', 'zstd' or 'zip'
+        limit: Most decompressed bytes that may be read
+
+    Returns:
+        LimitedReader yielding the decompressed bytes
+    """
+    if compression == 'gzip':
+        return LimitedReader(gzip.GzipFile(fileobj=stream, mode='rb'), limit, compression)
+
+    if compression == 'zstd':
+        if zstandard is None:
+            raise DecompressionError('zstd uploads require the zstandard package')
+        reader = zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True)
+        return LimitedReader(reader, limit, compression)
+
+    if compression == 'zip':
+        try:
+            archive = zipfile.ZipFile(stream)
+            member = _find_log_member(archive)
+            return LimitedReader(archive.open(member), limit, compression)
+        except (zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+            # RuntimeError for encrypted members, NotImplementedError for
+            # unsupported compression methods
+            raise DecompressionError(f'Unreadable zip archive: {e}')
+
+    raise DecompressionError(f'Unsupported compression: {compression}')
+
+
+def _find_log_member(archive):
+    """Pick the log file inside a zip archive: its only .adi/.adif/.adx file"""
+    files = [info for info in archive.infolist() if not info.is_dir()]
+    logs = [info for info in files if info.filename.lower().endswith(LOG_EXTENSIONS)]
+    if len(logs) == 1:
+        return logs[0]
+    if not logs and len(files) == 1:
+        return files[0]
+    raise DecompressionError('Zip archives must contain exactly one .adi, .adif or .adx log')
+
+
+class LimitedReader:
+    """Read-only stream over a decompressor that fails past a size limit"""
+
+    def __init__(self, stream, limit, compression):
+        """
+        Args:
+            stream: Decompressing binary file-like object
+            limit: Most decompressed bytes that may be read
+            compression: Name of the compression, for error messages
+        """
+        self.stream = stream
+        self.limit = limit
+        self.compression = compression
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        """
+        Read up to size decompressed bytes
+
+        Never asks the decompressor for more than one byte past the limit,
+        so a bomb is detected before it is expanded any further.
+        """
+        remaining = self.limit - self.bytes_read
+        if size is None or size < 0 or size > remaining:
+            size = remaining + 1
+
+        try:
+            data = self.stream.read(size)
+        except CORRUPT_DATA_ERRORS as e:
+            raise DecompressionError(f'Corrupt {self.compression} data: {e}')
+
+        self.bytes_read += len(data)
+        if self.bytes_read > self.limit:
+            raise DecompressedSizeExceeded(
+                f'Decompressed upload exceeds {self.limit // (1024 * 1024)}MB'
+            )
+        return data
+
+    def close(self):
+        self.stream.close()
@@ -0,0 +1,378 @@
+"""
+Database-backed queue of uploaded log files
+Uploads are spooled to disk and recorded as queued UploadLogs. Worker
+processes claim them with SELECT ... FOR UPDATE SKIP LOCKED, so any number
+of workers can share the queue without an external broker.
+
+Resumable uploads arrive in chunks while their UploadLog is receiving.
+Workers claim them whenever enough new bytes are spooled, ingest the whole
+records received so far and hand them back, so parsing overlaps transfer.
+
+Every spooled file's SHA-256 is kept on its UploadLog, so a file sent again
+unchanged, or sent again with records appended, is recognized without
+parsing what was already ingested.
+"""
+import os
+import time
+import uuid
+import fcntl
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, update
+
+from models import db, UploadLog
+
+
+def spool_upload(file, spool_dir, block_size=1024 * 1024):
+    """
+    Save an uploaded file where a worker can pick it up
+
+    The file is hashed as it is written, so its digest costs no extra read.
+
+    Args:
+        file: Werkzeug FileStorage from request.files
+        spool_dir: Directory shared by the web app and the workers
+        block_size: Bytes copied per read
+
+    Returns:
+        Tuple of (spool path, size in bytes, SHA-256 digest)
+    """
+    spool_path = new_spool_path(file.filename, spool_dir)
+    digest = hashlib.sha256()
+    size = 0
+    with open(spool_path, 'wb') as f:
+        while True:
+            block = file.stream.read(block_size)
+            if not block:
+                break
+            f.write(block)
+            digest.update(block)
+            size += len(block)
+    return spool_path, size, digest.digest()
+
+
+def file_digest(stream):
+    """
+    Hash a spooled file as spool_upload does
+
+    Args:
+        stream: Binary file opened for reading; it is left at its start
+
+    Returns:
+        SHA-256 digest of the whole file
+    """
+    stream.seek(0)
+    digest = hashlib.file_digest(stream, 'sha256').digest()
+    stream.seek(0)
+    return digest
+
+
+def find_grown_upload(upload_log, buffer, limit=5):
+    """
+    Find an earlier upload of the same user that this file begins with
+
+    Logging programs that sync on a schedule resend the whole log with new
+    records appended. The user's latest completed uploads that are smaller
+    than this file are candidates; the file is hashed once, up to the
+    largest of them, and compared with each at its size.
+
+    Args:
+        upload_log: UploadLog being ingested
+        buffer: Memory-mapped contents of its spooled file
+        limit: Most recent uploads to compare
+
+    Returns:
+        The matching UploadLog with the longest file, or None
+    """
+    candidates = UploadLog.query.filter(
+        UploadLog.user_id == upload_log.user_id,
+        UploadLog.id != upload_log.id,
+        UploadLog.status == 'completed',
+        UploadLog.content_digest.isnot(None),
+        UploadLog.file_size > 0,
+        UploadLog.file_size < len(buffer)
+    ).order_by(UploadLog.id.desc()).limit(limit).all()
+
+    match = None
+    digest = hashlib.sha256()
+    pos = 0
+    with memoryview(buffer) as view:
+        for candidate in sorted(candidates, key=lambda c: c.file_size):
+            digest.update(view[pos:candidate.file_size])
+            pos = candidate.file_size
+            if digest.copy().digest() == candidate.content_digest:
+                match = candidate
+    return match
+
+
+def new_spool_path(filename, spool_dir):
+    """
+    Pick a unique spool file name that keeps the upload's extension
+
+    Args:
+        filename: Name of the uploaded file
+        spool_dir: Directory shared by the web app and the workers
+
+    Returns:
+        Path of the spool file, not yet created
+    """
+    os.makedirs(spool_dir, exist_ok=True)
+    extension = os.path.splitext(filename)[1].lower()
+    return os.path.join(spool_dir, f"{uuid.uuid4().hex}{extension}")
+
+
+class ChunkInProgress(Exception):
+    """Raised when another request is writing a chunk of the same upload session"""
+    pass
+
+
+@contextmanager
+def locked_spool(spool_path):
+    """
+    Open the spool file of an upload session for writing its next chunk
+
+    The file is locked exclusively until the block exits, so chunk requests
+    for one session take turns without holding a database lock while the
+    body streams in.
+
+    Args:
+        spool_path: Spool file of the upload session
+
+    Yields:
+        File object open for reading and writing
+
+    Raises:
+        ChunkInProgress: If another request holds the lock
+    """
+    with open(spool_path, 'r+b') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise ChunkInProgress('Another chunk of this upload is being written')
+        yield f
+
+
+def append_chunk(spool, offset, stream, block_size=1024 * 1024):
+    """
+    Write a chunk of a resumable upload at the given offset
+
+    Anything past offset left by an interrupted request is overwritten, and
+    the data is flushed to disk before the caller records the new offset.
+
+    Args:
+        spool: Spool file from locked_spool
+        offset: Bytes already received
+        stream: Binary file-like object holding the chunk
+        block_size: Bytes copied per read
+
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    spool.seek(offset)
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        spool.write(block)
+        written += len(block)
+    spool.truncate()
+    spool.flush()
+    os.fsync(spool.fileno())
+    return written
+
+
+def claim_job(stale_after, slice_bytes):
+    """
+    Claim the oldest upload with work for this worker
+
+    Jobs left in processing by a worker that stopped sending heartbeats are
+    claimed again. Upload sessions still receiving are claimed once
+    slice_bytes have arrived since the last ingest, or once finalized. Rows
+    locked by another worker's claim are skipped rather than waited on.
+    A receiving session is only claimed again after a new chunk arrives, so
+    one whose ingest cannot advance yet is not picked up in a loop.
+
+    Args:
+        stale_after: Seconds without a heartbeat before a job is reclaimed
+        slice_bytes: New bytes that make a receiving session worth ingesting
+
+    Returns:
+        The claimed UploadLog, now in processing, or None if the queue is empty
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    upload_log = UploadLog.query.filter(
+        UploadLog.spool_path.isnot(None),
+        or_(
+            UploadLog.status == 'queued',
+            and_(
+                UploadLog.status == 'receiving',
+                or_(
+                    UploadLog.file_size.isnot(None),
+                    and_(
+                        UploadLog.received_bytes - UploadLog.parsed_bytes >= slice_bytes,
+                        or_(
+                            UploadLog.heartbeat_at.is_(None),
+                            UploadLog.received_at > UploadLog.heartbeat_at
+                        )
+                    )
+                )
+            ),
+            and_(UploadLog.status == 'processing', UploadLog.heartbeat_at < cutoff)
+        )
+    ).order_by(UploadLog.id).with_for_update(skip_locked=True).first()
+
+    if upload_log is None:
+        db.session.commit()
+        return None
+
+    now = datetime.utcnow()
+    if upload_log.status != 'receiving':
+        # Start over; rows committed by a dead worker count as duplicates
+        upload_log.started_at = now
+        upload_log.parsed_bytes = 0
+        upload_log.total_records = 0
+        upload_log.new_records = 0
+        upload_log.duplicate_records = 0
+        upload_log.error_records = 0
+    elif upload_log.started_at is None:
+        upload_log.started_at = now
+    upload_log.status = 'processing'
+    upload_log.heartbeat_at = now
+    db.session.commit()
+    return upload_log
+
+
+def run_job(upload_log, process, heartbeat_interval):
+    """
+    Run a claimed job and record its outcome
+
+    A background thread refreshes heartbeat_at on its own connection, so a
+    long single-transaction ingest is not mistaken for a dead worker. The
+    spooled file is removed once the job has completed or failed; an upload
+    session the process hands back as receiving keeps it.
+
+    Args:
+        upload_log: UploadLog returned by claim_job
+        process: Callable taking the UploadLog that ingests its spooled file
+        heartbeat_interval: Seconds between heartbeats
+    """
+    claimed_at = upload_log.heartbeat_at
+    heartbeat = _Heartbeat(db.engine, upload_log.id, heartbeat_interval)
+    heartbeat.start()
+    try:
+        process(upload_log)
+        if upload_log.status != 'receiving':
+            upload_log.status = 'completed'
+    except Exception as e:
+        db.session.rollback()
+        upload_log.status = 'failed'
+        upload_log.error_message = str(e)
+        print(f"Upload {upload_log.id} failed: {e}")
+    finally:
+        heartbeat.stop()
+
+    if upload_log.status == 'receiving':
+        # Chunks received after the claim were not ingested yet
+        upload_log.heartbeat_at = claimed_at
+        db.session.commit()
+        return
+
+    spool_path = upload_log.spool_path
+    upload_log.spool_path = None
+    upload_log.completed_at = datetime.utcnow()
+    db.session.commit()
+
+    try:
+        os.remove(spool_path)
+    except OSError:
+        pass
+
+
+def expire_sessions(expire_after):
+    """
+    Fail upload sessions the client abandoned and remove their spool files
+
+    Args:
+        expire_after: Seconds without a chunk before a session expires
+
+    Returns:
+        Number of sessions expired
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=expire_after)
+    expired = UploadLog.query.filter(
+        UploadLog.status == 'receiving',
+        UploadLog.file_size.is_(None),
+        UploadLog.received_at < cutoff
+    ).with_for_update(skip_locked=True).all()
+
+    spool_paths = []
+    for upload_log in expired:
+        spool_paths.append(upload_log.spool_path)
+        upload_log.status = 'failed'
+        upload_log.error_message = 'Upload session expired before it was completed'
+        upload_log.spool_path = None
+        upload_log.completed_at = datetime.utcnow()
+    db.session.commit()
+
+    for spool_path in spool_paths:
+        try:
+            os.remove(spool_path)
+        except (OSError, TypeError):
+            pass
+    return len(expired)
+
+
+def run_worker(process, poll_interval, stale_after, heartbeat_interval,
+               slice_bytes, session_expire_after, once=False):
+    """
+    Claim and run queued uploads until stopped
+
+    Args:
+        process: Callable taking an UploadLog that ingests its spooled file
+        poll_interval: Seconds to sleep when the queue is empty
+        stale_after: Seconds without a heartbeat before a job is reclaimed
+        heartbeat_interval: Seconds between heartbeats of a running job
+        slice_bytes: New bytes that make a receiving session worth ingesting
+        session_expire_after: Seconds without a chunk before a session expires
+        once: Return as soon as the queue is empty
+    """
+    while True:
+        upload_log = claim_job(stale_after, slice_bytes)
+        if upload_log is None:
+            expire_sessions(session_expire_after)
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        run_job(upload_log, process, heartbeat_interval)
+
+
+class _Heartbeat(threading.Thread):
+    """Periodically touch an UploadLog's heartbeat_at from a separate connection"""
+
+    def __init__(self, engine, upload_id, interval):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.upload_id = upload_id
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(
+                        update(UploadLog.__table__)
+                        .where(UploadLog.__table__.c.id == self.upload_id)
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+            except Exception as e:
+                print(f"Heartbeat for upload {self.upload_id} failed: {e}")
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Benchmark the ADIF tokenizer against the previous regex split/findall parser,
+both producing the same records
+Run from the repository root: python3 benchmark_adif_parser.py [record_count]
+"""
+
+import re
+import sys
+import time
+import random
+
+sys.path.insert(0, 'backend')
+
+from adif_parser import ADIFParser, QSORecord, qso_start_from, freq_mhz_from, base_call_from
+
+# Throughput gain over the regex parser the tokenizer is meant to reach
+TARGET_SPEEDUP = 3.0
+
+
+class RegexADIFParser(ADIFParser):
+    """
+    The split/findall parser that ADIFParser used before the tokenizer,
+    producing the same records as ADIFParser so the two do equivalent work
+    """
+
+    def parse_file(self, file_content):
+        if isinstance(file_content, bytes):
+            file_content = file_content.decode('utf-8', errors='ignore')
+
+        header_end = file_content.lower().find('<eoh>')
+        if header_end != -1:
+            self.parse_header(file_content[:header_end])
+            file_content = file_content[header_end + 5:]
+
+        records_raw = re.split(r'<eor>', file_content, flags=re.IGNORECASE)
+
+        self.records = []
+        for record_raw in records_raw:
+            if not record_raw.strip():
+                continue
+            record = self.parse_record(record_raw)
+            if record and self.validate_record(record):
+                self.records.append(record)
+
+        return self.records
+
+    def parse_header(self, header_text):
+        pattern = r'<([^:>]+):(\d+)(?::([^>]+))?>([^<]*)'
+        for field_name, length, data_type, value in re.findall(pattern, header_text, re.IGNORECASE):
+            self.header[field_name.lower().strip()] = value[:int(length)].strip()
+
+    def parse_record(self, record_text):
+        pattern = r'<([^:>]+):(\d+)(?::([^>]+))?>([^<]*)'
+        matches = re.findall(pattern, record_text, re.IGNORECASE)
+
+        record = {}
+        additional_fields = {}
+        logged_band = None
+
+        for field_name, length, data_type, value in matches:
+            field_name = field_name.lower().strip()
+            value = value[:int(length)].strip()
+            if not value:
+                continue
+            if field_name == 'band' or field_name == 'band_rx':
+                if field_name == 'band':
+                    logged_band = value
+                value = self.normalize_band(value)
+            elif field_name == 'mode' or field_name == 'submode':
+                value = self.normalize_mode(value)
+            if field_name in self.CORE_FIELDS:
+                record[field_name] = value
+            else:
+                additional_fields[field_name] = value
+
+        if not record and not additional_fields:
+            return {}
+
+        # The same hash, derived bands and typed columns as the tokenizer
+        digest = self.qso_digest(record, logged_band)
+        record['qso_hash'] = digest.hex()
+        record['qso_fingerprint'] = digest[:self.FINGERPRINT_SIZE]
+        if 'band' not in record and 'freq' in record:
+            band = self.band_from_freq(record['freq'])
+            if band:
+                record['band'] = band
+        if 'band_rx' not in additional_fields and 'freq_rx' in additional_fields:
+            band_rx = self.band_from_freq(additional_fields['freq_rx'])
+            if band_rx:
+                additional_fields['band_rx'] = band_rx
+        if additional_fields:
+            record['additional_fields'] = additional_fields
+        qso_start = qso_start_from(record.get('qso_date'), record.get('time_on'))
+        if qso_start:
+            record['qso_start'] = qso_start
+        freq_mhz = freq_mhz_from(record.get('freq'))
+        if freq_mhz is not None:
+            record['freq_mhz'] = freq_mhz
+        if record.get('call'):
+            record['base_call'] = base_call_from(record['call'])
+
+        return QSORecord.from_slots(record)
+
+
+def adif_field(name, value):
+    return f"<{name}:{len(value)}>{value}"
+
+
+def generate_contest_log(count, seed=1):
+    """Generate a contest-style ADIF log with a fixed random seed"""
+    rng = random.Random(seed)
+    bands = [('160m', '1.830'), ('80m', '3.525'), ('40m', '7.025'), ('20m', '14.025'),
+             ('15m', '21.025'), ('10m', '28.025')]
+    lines = [
+        'Synthetic contest log\n',
+        adif_field('ADIF_VER', '3.1.6') + '\n',
+        adif_field('PROGRAMID', 'benchmark') + '\n',
+        '<EOH>\n'
+    ]
+
+    for i in range(count):
+        band, freq = rng.choice(bands)
+        call = f"{rng.choice(['K', 'W', 'N', 'DL', 'G', 'JA'])}{rng.randint(0, 9)}{''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(3))}"
+        fields = [
+            adif_field('CALL', call),
+            adif_field('QSO_DATE', f"202401{1 + i // 50000:02d}"),
+            adif_field('TIME_ON', f"{(i // 3600) % 24:02d}{(i // 60) % 60:02d}{i % 60:02d}"),
+            adif_field('BAND', band),
+            adif_field('FREQ', freq),
+            adif_field('MODE', 'CW'),
+            adif_field('RST_SENT', '599'),
+            adif_field('RST_RCVD', '599'),
+            adif_field('STATION_CALLSIGN', 'K1XYZ'),
+            adif_field('CONTEST_ID', 'CQ-WW-CW'),
+            adif_field('STX', str(i + 1)),
+            adif_field('SRX', str(rng.randint(1, 3000))),
+            adif_field('OPERATOR', 'K1XYZ'),
+            adif_field('APP_N1MM_RADIO', str(rng.randint(1, 2))),
+            adif_field('COMMENT', 'worked <via> spot' if i % 97 == 0 else 'tnx'),
+        ]
+        lines.append(' '.join(fields) + ' <EOR>\n')
+
+    return ''.join(lines)
+
+
+def best_times(runs, repeat=5):
+    """
+    Return the fastest of several runs of each (func, content) pair, in
+    seconds; the runs are interleaved so a slow spell on the machine does
+    not land on one parser only
+    """
+    timings = [[] for _ in runs]
+    for _ in range(repeat):
+        for (func, content), run_timings in zip(runs, timings):
+            start = time.perf_counter()
+            func(content)
+            run_timings.append(time.perf_counter() - start)
+    return [min(run_timings) for run_timings in timings]
+
+
+def run_benchmark(count):
+    content = generate_contest_log(count)
+    size_mb = len(content) / (1024 * 1024)
+
+    print("ADIF Parser Benchmark")
+    print("=" * 60)
+    print(f"Records: {count:,}   Size: {size_mb:.1f} MB")
+    print("-" * 60)
+
+    regex_time, tokenizer_time, bytes_time = best_times([
+        (lambda text: RegexADIFParser().parse_file(text), content),
+        (lambda text: ADIFParser(processes=1).parse_file(text), content),
+        (lambda data: ADIFParser(processes=1).parse_buffer(data), content.encode('utf-8'))
+    ])
+
+    for label, elapsed in [('regex split/findall', regex_time), ('tokenizer', tokenizer_time),
+                           ('tokenizer (bytes)', bytes_time)]:
+        print(f"{label:24s} {elapsed:8.3f}s  {count / elapsed:12,.0f} QSOs/s  {size_mb / elapsed:6.1f} MB/s")
+
+    print("-" * 60)
+    speedup = regex_time / tokenizer_time
+    print(f"Speedup: {speedup:.2f}x (target {TARGET_SPEEDUP:.1f}x"
+          f"{'' if speedup >= TARGET_SPEEDUP else ', not met'})")
+
+    # Values containing '<' are truncated by the regex parser, so compare
+    # the two only on records where it can get them right
+    regex_records = RegexADIFParser().parse_file(content)
+    tokenizer_records = ADIFParser(processes=1).parse_file(content)
+    print(f"Records: {len(regex_records):,} regex, {len(tokenizer_records):,} tokenizer")
+    if len(regex_records) != len(tokenizer_records) or len(tokenizer_records) != count:
+        print("Record counts differ")
+        print("=" * 60)
+        return False
+    mismatches = sum(
+        1 for old, new in zip(regex_records, tokenizer_records)
+        if old != new and '<' not in new.get('comment', '')
+    )
+    print(f"Record mismatches: {mismatches}")
+    print("=" * 60)
+
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    record_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    sys.exit(0 if run_benchmark(record_count) else 1)
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Parser and export micro-benchmarks over deterministic synthetic ADIF logs
+Run from the repository root:
+
+    python3 benchmark_suite.py --output results.json
+    python3 benchmark_suite.py --sizes 1000,100000 --compare results.json
+
+Each log shape is generated from a fixed seed, so results from different
+releases measure exactly the same input. With --compare, the run exits
+non-zero when any benchmark is slower than the baseline by more than the
+tolerance.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+# generate_adif_export lives in the Flask app; no database is opened
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from adif_parser import ADIFParser
+from app import generate_adif_export
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+
+# parse_record and generate_qso_hash are timed per call on at most this many records
+PER_RECORD_SAMPLE = 10000
+
+# Logs larger than this are timed once instead of best-of-repeat
+SINGLE_RUN_ABOVE = 100000
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+PREFIXES = ['K', 'W', 'N', 'AA', 'KD', 'VE', 'DL', 'G', 'F', 'JA', 'VK', 'PY', 'LU', 'EA', 'I', 'SP']
+HF_BANDS = [('160m', 1.830), ('80m', 3.530), ('40m', 7.030), ('20m', 14.030),
+            ('15m', 21.030), ('10m', 28.030)]
+FT8_BANDS = [('80m', 3.573), ('40m', 7.074), ('30m', 10.136), ('20m', 14.074),
+             ('17m', 18.100), ('15m', 21.074), ('10m', 28.074), ('6m', 50.313)]
+STATES = ['MA', 'NY', 'CA', 'TX', 'OH', 'FL', 'WA', 'CO', 'GA', 'MI']
+START_TIME = datetime(2024, 1, 1, 0, 0, 0)
+
+
+def adif_field(name, value):
+    return f"<{name}:{len(value)}>{value}"
+
+
+def random_call(rng):
+    suffix = ''.join(rng.choice(LETTERS) for _ in range(rng.randint(1, 3)))
+    return f"{rng.choice(PREFIXES)}{rng.randint(0, 9)}{suffix}"
+
+
+def random_grid(rng, precision=4):
+    grid = f"{rng.choice('ABCDEFGHIJKLMNOPQR')}{rng.choice('ABCDEFGHIJKLMNOPQR')}{rng.randint(0, 9)}{rng.randint(0, 9)}"
+    if precision == 6:
+        grid += f"{rng.choice('abcdefghijklmnopqrstuvwx')}{rng.choice('abcdefghijklmnopqrstuvwx')}"
+    return grid
+
+
+def n1mm_contest_record(rng, i):
+    """A CQ WW style record as exported by N1MM Logger+ (lowercase tags, APP_N1MM_ extras)"""
+    when = START_TIME + timedelta(seconds=15 * i)
+    band, freq = rng.choice(HF_BANDS)
+    call = random_call(rng)
+    fields = [
+        adif_field('call', call),
+        adif_field('qso_date', when.strftime('%Y%m%d')),
+        adif_field('time_on', when.strftime('%H%M%S')),
+        adif_field('time_off', when.strftime('%H%M%S')),
+        adif_field('band', band),
+        adif_field('station_callsign', 'K1XYZ'),
+        adif_field('freq', f"{freq + rng.randint(0, 40) / 1000:.5f}"),
+        adif_field('contest_id', 'CQ-WW-CW'),
+        adif_field('freq_rx', f"{freq:.5f}"),
+        adif_field('mode', 'CW'),
+        adif_field('rst_rcvd', '599'),
+        adif_field('rst_sent', '599'),
+        adif_field('operator', 'K1XYZ'),
+        adif_field('cqz', str(rng.randint(1, 40))),
+        adif_field('stx', str(i + 1)),
+        adif_field('srx_string', str(rng.randint(1, 40))),
+        adif_field('app_n1mm_exchange1', str(rng.randint(1, 40))),
+        adif_field('app_n1mm_continent', rng.choice(['NA', 'EU', 'AS', 'SA', 'OC', 'AF'])),
+        adif_field('app_n1mm_points', str(rng.choice([1, 2, 3]))),
+        adif_field('app_n1mm_radio_nr', str(rng.randint(1, 2))),
+        adif_field('app_n1mm_run1run2', '1'),
+        adif_field('app_n1mm_isrunqso', str(rng.randint(0, 1))),
+        adif_field('app_n1mm_id', f"{rng.getrandbits(128):032x}"),
+    ]
+    return ' '.join(fields) + ' <eor>\n'
+
+
+def wsjtx_ft8_record(rng, i):
+    """A record as appended to wsjtx_log.adi by WSJT-X"""
+    start = START_TIME + timedelta(seconds=75 * i)
+    end = start + timedelta(seconds=60)
+    band, freq = rng.choice(FT8_BANDS)
+    mode, submode = ('FT8', None) if i % 10 else ('MFSK', 'FT4')
+    fields = [
+        adif_field('call', random_call(rng)),
+        adif_field('gridsquare', random_grid(rng)),
+        adif_field('mode', mode),
+    ]
+    if submode:
+        fields.append(adif_field('submode', submode))
+    fields += [
+        adif_field('rst_sent', f"{rng.randint(-24, 10):+03d}"),
+        adif_field('rst_rcvd', f"{rng.randint(-24, 10):+03d}"),
+        adif_field('qso_date', start.strftime('%Y%m%d')),
+        adif_field('time_on', start.strftime('%H%M%S')),
+        adif_field('qso_date_off', end.strftime('%Y%m%d')),
+        adif_field('time_off', end.strftime('%H%M%S')),
+        adif_field('band', band),
+        adif_field('freq', f"{freq + rng.randint(200, 2800) / 1000000:.6f}"),
+        adif_field('station_callsign', 'K1XYZ'),
+        adif_field('my_gridsquare', 'FN42aa'),
+        adif_field('tx_pwr', str(rng.choice([5, 10, 25, 50, 100]))),
+    ]
+    if i % 4 == 0:
+        fields.append(adif_field('comment', 'FT8  Sent: -10  Rcvd: -12'))
+    return ' '.join(fields) + ' <EOR>\n'
+
+
+def pota_sota_record(rng, i):
+    """A portable activation record carrying POTA/SOTA and location extras"""
+    when = START_TIME + timedelta(seconds=90 * i)
+    band, freq = rng.choice(HF_BANDS)
+    mode = rng.choice(['SSB', 'CW', 'FT8'])
+    state = rng.choice(STATES)
+    fields = [
+        adif_field('CALL', random_call(rng)),
+        adif_field('QSO_DATE', when.strftime('%Y%m%d')),
+        adif_field('TIME_ON', when.strftime('%H%M')),
+        adif_field('BAND', band),
+        adif_field('FREQ', f"{freq + rng.randint(0, 200) / 1000:.3f}"),
+        adif_field('MODE', mode),
+        adif_field('RST_SENT', '59' if mode == 'SSB' else '599'),
+        adif_field('RST_RCVD', '57' if mode == 'SSB' else '579'),
+        adif_field('STATION_CALLSIGN', 'K1XYZ/P'),
+        adif_field('OPERATOR', 'K1XYZ'),
+        adif_field('MY_GRIDSQUARE', 'FN42aa'),
+        adif_field('GRIDSQUARE', random_grid(rng, 6)),
+        adif_field('NAME', rng.choice(['John', 'Maria', 'Ken', 'Sue', 'Raj', 'Ana'])),
+        adif_field('QTH', rng.choice(['Boston', 'Denver', 'Austin', 'Tampa', 'Seattle'])),
+        adif_field('STATE', state),
+        adif_field('CNTY', f"{state},{rng.choice(['Middlesex', 'Essex', 'Suffolk', 'Worcester'])}"),
+        adif_field('COUNTRY', 'United States'),
+        adif_field('DXCC', '291'),
+        adif_field('MY_SIG', 'POTA'),
+        adif_field('MY_SIG_INFO', f"US-{1000 + i // 200 % 8000}"),
+        adif_field('MY_POTA_REF', f"US-{1000 + i // 200 % 8000}"),
+        adif_field('MY_STATE', 'MA'),
+        adif_field('TX_PWR', str(rng.choice([5, 10, 20]))),
+        adif_field('MY_RIG', 'KX2'),
+        adif_field('MY_ANTENNA', 'EFHW 40-10'),
+    ]
+    if i % 3 == 0:
+        fields += [
+            adif_field('SIG', 'POTA'),
+            adif_field('SIG_INFO', f"US-{rng.randint(1000, 9999)}"),
+            adif_field('POTA_REF', f"US-{rng.randint(1000, 9999)}"),
+        ]
+    if i % 5 == 0:
+        fields += [
+            adif_field('SOTA_REF', f"W1/HA-{rng.randint(1, 99):03d}"),
+            adif_field('MY_SOTA_REF', f"W1/MB-{rng.randint(1, 20):03d}"),
+        ]
+    fields.append(adif_field('COMMENT', f"P2P {rng.choice(['tnx', 'fb sig', 'qrp', 'park #5'])}"))
+    return ' '.join(fields) + '\n<EOR>\n'
+
+
+SHAPES = {
+    'n1mm_contest': ('N1MM Logger+', n1mm_contest_record),
+    'wsjtx_ft8': ('WSJT-X', wsjtx_ft8_record),
+    'pota_sota': ('PortableLog', pota_sota_record),
+}
+
+
+def generate_records(shape, count, seed=1):
+    """Return the ADI text of each record of a synthetic log"""
+    _, make_record = SHAPES[shape]
+    rng = random.Random(f"{shape}:{seed}")
+    return [make_record(rng, i) for i in range(count)]
+
+
+def generate_log(shape, count, seed=1):
+    """Return a complete synthetic ADIF log of the given shape"""
+    program_id, _ = SHAPES[shape]
+    header = (
+        f"Synthetic {shape} log\n"
+        f"{adif_field('ADIF_VER', '3.1.6')}\n"
+        f"{adif_field('PROGRAMID', program_id)}\n"
+        "<EOH>\n"
+    )
+    return header + ''.join(generate_records(shape, count, seed))
+
+
+def best_time(func, repeat):
+    """Return the fastest of several runs of func(), in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(func, ops, repeat):
+    seconds = best_time(func, repeat)
+    return {
+        'seconds': round(seconds, 6),
+        'ops': ops,
+        'ops_per_sec': round(ops / seconds, 1) if seconds else None,
+    }
+
+
+def run_shape(shape, count, repeat):
+    """Time each parser and export stage on one synthetic log"""
+    record_texts = generate_records(shape, count)
+    content = generate_log(shape, count)
+    data = content.encode('utf-8')
+    if count > SINGLE_RUN_ABOVE:
+        repeat = 1
+
+    parser = ADIFParser(processes=1)
+    records = parser.parse_file(content)
+    sample = records[:PER_RECORD_SAMPLE]
+    text_sample = record_texts[:PER_RECORD_SAMPLE]
+    rows = [SimpleNamespace(**record.to_row(1)) for record in records]
+
+    def parse_records():
+        record_parser = ADIFParser(processes=1)
+        for text in text_sample:
+            record_parser.parse_record(text)
+
+    def hash_records():
+        for record in sample:
+            parser.generate_qso_hash(record)
+
+    benchmarks = {
+        'parse_file': measure(lambda: ADIFParser(processes=1).parse_file(content), len(records), repeat),
+        'parse_buffer': measure(lambda: ADIFParser(processes=1).parse_buffer(data), len(records), repeat),
+        'parse_record': measure(parse_records, len(text_sample), repeat),
+        'generate_qso_hash': measure(hash_records, len(sample), repeat),
+        'get_statistics': measure(parser.get_statistics, len(records), repeat),
+        'generate_adif_export': measure(lambda: generate_adif_export(rows, 'K1XYZ'), len(rows), repeat),
+    }
+
+    return {
+        'shape': shape,
+        'records': count,
+        'size_bytes': len(data),
+        'benchmarks': benchmarks,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(results, baseline, tolerance):
+    """
+    Compare throughput against a baseline results file
+
+    Returns:
+        List of regression descriptions, empty if none
+    """
+    previous = {
+        (entry['shape'], entry['records'], name): stats['ops_per_sec']
+        for entry in baseline.get('results', [])
+        for name, stats in entry['benchmarks'].items()
+    }
+
+    regressions = []
+    for entry in results['results']:
+        for name, stats in entry['benchmarks'].items():
+            before = previous.get((entry['shape'], entry['records'], name))
+            after = stats['ops_per_sec']
+            if not before or not after:
+                continue
+            change = after / before - 1
+            marker = ''
+            if change < -tolerance:
+                marker = '  REGRESSION'
+                regressions.append(f"{entry['shape']} {entry['records']:,} {name}: {change:+.1%}")
+            print(f"{entry['shape']:14s} {entry['records']:>9,} {name:22s} {change:+7.1%}{marker}")
+
+    return regressions
+
+
+def print_entry(entry):
+    print(f"{entry['shape']}  {entry['records']:,} records  {entry['size_bytes'] / (1024 * 1024):.1f} MB")
+    for name, stats in entry['benchmarks'].items():
+        print(f"  {name:22s} {stats['seconds']:9.4f}s  {stats['ops_per_sec']:14,.0f} ops/s")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                            help='Comma-separated record counts (default: 1000,100000,1000000)')
+    arg_parser.add_argument('--shapes', default=','.join(SHAPES),
+                            help=f"Comma-separated log shapes: {', '.join(SHAPES)}")
+    arg_parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs per benchmark; the fastest is kept')
+    arg_parser.add_argument('--output', help='Write results as JSON to this file')
+    arg_parser.add_argument('--compare', help='Baseline results JSON to check for regressions')
+    arg_parser.add_argument('--tolerance', type=float, default=0.15,
+                            help='Allowed throughput drop versus the baseline (default: 0.15)')
+    args = arg_parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    shapes = args.shapes.split(',')
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape {shape!r}")
+
+    results = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': [],
+    }
+
+    print("LogShackBaby Benchmark Suite")
+    print("=" * 60)
+    for shape in shapes:
+        for count in sizes:
+            entry = run_shape(shape, count, args.repeat)
+            results['results'].append(entry)
+            print_entry(entry)
+    print("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Comparison with {args.compare} (commit {baseline.get('commit')})")
+        print("-" * 60)
+        regressions = compare_results(results, baseline, args.tolerance)
+        print("-" * 60)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+        print("No regressions")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@ const API_BASE = window.location.origin + '/api';
 let sessionToken = null;
 let currentUser = null;
 let currentPage = 1;
+let logCursors = [null];  // logCursors[n - 1] loads page n
 
 // Initialize app
 document.addEventListener('DOMContentLoaded', () => {
@@ -458,16 +459,21 @@ async function loadDashboard() {
 // Logs
 async function loadLogs(page = 1) {
     currentPage = page;
+    if (page === 1) {
+        logCursors = [null];
+    }
     
     const callsign = document.getElementById('filter-callsign').value;
     const band = document.getElementById('filter-band').value;
     const mode = document.getElementById('filter-mode').value;
     
+    // Pages are fetched by cursor, so page n is as fast as page 1
     const params = new URLSearchParams({
-        page: currentPage,
-        per_page: 50
+        per_page: 50,
+        include_total: 1
     });
     
+    if (logCursors[page - 1]) params.append('cursor', logCursors[page - 1]);
     if (callsign) params.append('callsign', callsign);
     if (band) params.append('band', band);
     if (mode) params.append('mode', mode);
@@ -477,8 +483,9 @@ async function loadLogs(page = 1) {
         const data = await response.json();
         
         if (response.ok) {
+            logCursors[page] = data.next_cursor;
             displayLogs(data.logs);
-            displayPagination(data.current_page, data.pages);
+            displayPagination(page, data.has_more, data.total, data.total_is_estimate);
         }
     } catch (error) {
         showMessage('Failed to load logs', 'error');
@@ -536,10 +543,10 @@ function escapeHtml(text) {
     return text.replace(/[&<>"']/g, m => map[m]);
 }
 
-function displayPagination(currentPage, totalPages) {
+function displayPagination(currentPage, hasMore, total, totalIsEstimate) {
     const container = document.getElementById('logs-pagination');
     
-    if (totalPages <= 1) {
+    if (currentPage === 1 && !hasMore) {
         container.innerHTML = '';
         return;
     }
@@ -549,16 +556,16 @@ function displayPagination(currentPage, totalPages) {
     // Previous button
     html += `<button ${currentPage === 1 ? 'disabled' : ''} onclick="loadLogs(${currentPage - 1})">Previous</button>`;
     
-    // Page numbers (show up to 5 pages)
-    const startPage = Math.max(1, currentPage - 2);
-    const endPage = Math.min(totalPages, startPage + 4);
-    
-    for (let i = startPage; i <= endPage; i++) {
-        html += `<button class="${i === currentPage ? 'active' : ''}" onclick="loadLogs(${i})">${i}</button>`;
+    // Current page, and the page count when a total is known
+    let label = `Page ${currentPage}`;
+    if (total !== undefined) {
+        const pages = Math.max(1, Math.ceil(total / 50));
+        label += ` of ${totalIsEstimate ? '~' : ''}${pages}`;
     }
+    html += `<button class="active" disabled>${label}</button>`;
     
     // Next button
-    html += `<button ${currentPage === totalPages ? 'disabled' : ''} onclick="loadLogs(${currentPage + 1})">Next</button>`;
+    html += `<button ${hasMore ? '' : 'disabled'} onclick="loadLogs(${currentPage + 1})">Next</button>`;
     
     container.innerHTML = html;
 }
@@ -604,7 +611,7 @@ async function handleUpload() {
     if (!apiKey) return;
     
     const formData = new FormData();
-    formData.append('file', file);
+    formData.append('file', await compressUpload(file), file.name);
     
     try {
         const response = await fetch(`${API_BASE}/logs/upload`, {
@@ -618,34 +625,99 @@ async function handleUpload() {
         const data = await response.json();
         
         if (response.ok) {
-            showMessage(`Upload successful! New: ${data.new}, Duplicates: ${data.duplicates}`, 'success');
+            showMessage('Upload received, processing...', 'success');
+            
+            // Clear file input
+            fileInput.value = '';
             
-            // Display result
-            const resultDiv = document.getElementById('upload-result');
+            // Uploads are ingested in the background; follow their progress
+            loadUploads();
+            pollUpload(data.upload_id, apiKey);
+        } else {
+            showMessage(data.error || 'Upload failed', 'error');
+        }
+    } catch (error) {
+        showMessage('Upload failed. Please try again.', 'error');
+    }
+}
+
+// gzip logs in the browser when supported; the server detects compressed
+// files from their first bytes, so slow links send a fraction of the data
+async function compressUpload(file) {
+    if (typeof CompressionStream === 'undefined' || /\.(gz|zst|zip)$/i.test(file.name)) {
+        return file;
+    }
+    
+    try {
+        const compressed = file.stream().pipeThrough(new CompressionStream('gzip'));
+        return await new Response(compressed).blob();
+    } catch (error) {
+        return file;
+    }
+}
+
+async function pollUpload(uploadId, apiKey) {
+    const resultDiv = document.getElementById('upload-result');
+    resultDiv.classList.remove('hidden');
+    
+    while (true) {
+        let upload;
+        try {
+            const response = await fetch(`${API_BASE}/uploads/${uploadId}`, {
+                headers: {
+                    'X-API-Key': apiKey
+                }
+            });
+            upload = await response.json();
+            if (!response.ok) {
+                showMessage(upload.error || 'Failed to check upload status', 'error');
+                return;
+            }
+        } catch (error) {
+            showMessage('Failed to check upload status', 'error');
+            return;
+        }
+        
+        if (upload.status === 'completed') {
+            showMessage(`Upload successful! New: ${upload.new_records}, Duplicates: ${upload.duplicate_records}`, 'success');
             resultDiv.innerHTML = `
                 <div class="alert alert-success">
                     <strong>Upload Complete</strong>
-                    <p>Total records: ${data.total}</p>
-                    <p>New records added: ${data.new}</p>
-                    <p>Duplicates skipped: ${data.duplicates}</p>
-                    ${data.errors > 0 ? `<p>Errors: ${data.errors}</p>` : ''}
+                    <p>Total records: ${upload.total_records}</p>
+                    <p>New records added: ${upload.new_records}</p>
+                    <p>Duplicates skipped: ${upload.duplicate_records}</p>
+                    ${upload.error_records > 0 ? `<p>Errors: ${upload.error_records}</p>` : ''}
                 </div>
             `;
-            resultDiv.classList.remove('hidden');
-            
-            // Clear file input
-            fileInput.value = '';
             
             // Reload uploads history
             loadUploads();
             
             // Refresh stats if on logs tab
             loadStats();
-        } else {
-            showMessage(data.error || 'Upload failed', 'error');
+            return;
         }
-    } catch (error) {
-        showMessage('Upload failed. Please try again.', 'error');
+        
+        if (upload.status === 'failed') {
+            showMessage(upload.error || 'Upload failed', 'error');
+            resultDiv.innerHTML = `
+                <div class="alert alert-error">
+                    <strong>Upload Failed</strong>
+                    <p>${escapeHtml(upload.error || 'The log could not be processed')}</p>
+                </div>
+            `;
+            loadUploads();
+            return;
+        }
+        
+        resultDiv.innerHTML = `
+            <div class="alert alert-info">
+                <strong>${upload.status === 'queued' ? 'Waiting to process...' : 'Processing...'}</strong>
+                <p>Records processed: ${upload.total_records}</p>
+            </div>
+        `;
+        
+        await new Promise(resolve => setTimeout(resolve, 2000));
     }
 }
 
@@ -672,7 +744,7 @@ function displayUploads(uploads) {
     
     tbody.innerHTML = uploads.map(upload => `
         <tr>
-            <td>${upload.filename}</td>
+            <td>${escapeHtml(upload.filename)}</td>
             <td>${formatDateTime(upload.uploaded_at)}</td>
             <td>${upload.total_records}</td>
             <td>${upload.new_records}</td>
@@ -985,7 +1057,7 @@ function displayContestAdminUsers(users) {
 
 async function viewContestUserLogs(userId, callsign) {
     try {
-        const response = await apiCall(`/contestadmin/users/${userId}/logs?page=1&per_page=100`);
+        const response = await apiCall(`/contestadmin/users/${userId}/logs?per_page=100`);
         const data = await response.json();
         
         if (response.ok) {
@@ -1037,6 +1109,21 @@ async function viewContestUserLogs(userId, callsign) {
     }
 }
 
+// Turn "contest_id=CQ-WW-CW, qsl_rcvd=Y" into {contest_id: ['CQ-WW-CW'], qsl_rcvd: ['Y']};
+// a field given more than once matches any of its values
+function parseExtraFieldFilters(input) {
+    const extraFields = {};
+    input.split(',').forEach(pair => {
+        const separator = pair.indexOf('=');
+        if (separator < 0) return;
+        const field = pair.slice(0, separator).trim().toLowerCase();
+        const value = pair.slice(separator + 1).trim();
+        if (!field || !value) return;
+        (extraFields[field] = extraFields[field] || []).push(value);
+    });
+    return extraFields;
+}
+
 async function generateReport() {
     const checkboxes = document.querySelectorAll('input[name="report-field"]:checked');
     const fields = Array.from(checkboxes).map(cb => cb.value);
@@ -1050,13 +1137,19 @@ async function generateReport() {
     const filters = {};
     const dateFrom = document.getElementById('report-date-from').value;
     const dateTo = document.getElementById('report-date-to').value;
+    const freqMin = document.getElementById('report-freq-min').value;
+    const freqMax = document.getElementById('report-freq-max').value;
     const bandsInput = document.getElementById('report-bands').value;
     const modesInput = document.getElementById('report-modes').value;
+    const extraFieldsInput = document.getElementById('report-extra-fields').value;
     
     if (dateFrom) filters.date_from = dateFrom;
     if (dateTo) filters.date_to = dateTo;
+    if (freqMin) filters.freq_min = freqMin;
+    if (freqMax) filters.freq_max = freqMax;
     if (bandsInput) filters.bands = bandsInput.split(',').map(b => b.trim());
     if (modesInput) filters.modes = modesInput.split(',').map(m => m.trim());
+    if (extraFieldsInput) filters.extra_fields = parseExtraFieldFilters(extraFieldsInput);
     
     try {
         const response = await apiCall('/contestadmin/report', {
@@ -1207,13 +1300,19 @@ async function saveReportTemplate() {
     const filters = {};
     const dateFrom = document.getElementById('report-date-from').value;
     const dateTo = document.getElementById('report-date-to').value;
+    const freqMin = document.getElementById('report-freq-min').value;
+    const freqMax = document.getElementById('report-freq-max').value;
     const bandsInput = document.getElementById('report-bands').value;
     const modesInput = document.getElementById('report-modes').value;
+    const extraFieldsInput = document.getElementById('report-extra-fields').value;
     
     if (dateFrom) filters.date_from = dateFrom;
     if (dateTo) filters.date_to = dateTo;
+    if (freqMin) filters.freq_min = freqMin;
+    if (freqMax) filters.freq_max = freqMax;
     if (bandsInput) filters.bands = bandsInput.split(',').map(b => b.trim());
     if (modesInput) filters.modes = modesInput.split(',').map(m => m.trim());
+    if (extraFieldsInput) filters.extra_fields = parseExtraFieldFilters(extraFieldsInput);
     
     try {
         const response = await apiCall('/contestadmin/templates', {
@@ -1400,7 +1499,7 @@ function displayLogAdminUsers(users) {
 
 async function viewUserLogs(userId, callsign) {
     try {
-        const response = await apiCall(`/logadmin/users/${userId}/logs?page=1&per_page=100`);
+        const response = await apiCall(`/logadmin/users/${userId}/logs?per_page=100`);
         const data = await response.json();
         
         if (response.ok) {
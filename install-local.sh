@@ -308,7 +308,27 @@ Type=simple
 User=$USER
 WorkingDirectory=$INSTALL_DIR/backend
 Environment="PATH=$INSTALL_DIR/venv/bin:/usr/local/bin:/usr/bin:/bin"
-ExecStart=$INSTALL_DIR/venv/bin/gunicorn --bind 0.0.0.0:5000 --workers 4 --timeout 120 app:app
+ExecStart=$INSTALL_DIR/venv/bin/gunicorn --bind 0.0.0.0:5000 --workers 4 --threads 8 --timeout 120 app:app
+Restart=always
+RestartSec=10
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+    # Upload worker service (ingests queued log uploads)
+    sudo tee /etc/systemd/system/logshackbaby-worker.service > /dev/null <<EOF
+[Unit]
+Description=LogShackBaby Upload Worker
+After=network.target postgresql.service
+Requires=postgresql.service
+
+[Service]
+Type=simple
+User=$USER
+WorkingDirectory=$INSTALL_DIR/backend
+Environment="PATH=$INSTALL_DIR/venv/bin:/usr/local/bin:/usr/bin:/bin"
+ExecStart=$INSTALL_DIR/venv/bin/flask --app app upload-worker --concurrency 2
 Restart=always
 RestartSec=10
 
@@ -319,11 +339,12 @@ EOF
     # Reload systemd
     sudo systemctl daemon-reload
     sudo systemctl enable logshackbaby
+    sudo systemctl enable logshackbaby-worker
     
     print_success "Systemd service created and enabled"
     print_info "You can manage the service with:"
-    echo "   Start:   sudo systemctl start logshackbaby"
-    echo "   Stop:    sudo systemctl stop logshackbaby"
+    echo "   Start:   sudo systemctl start logshackbaby logshackbaby-worker"
+    echo "   Stop:    sudo systemctl stop logshackbaby logshackbaby-worker"
     echo "   Status:  sudo systemctl status logshackbaby"
     echo "   Logs:    sudo journalctl -u logshackbaby -f"
 else
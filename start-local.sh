@@ -116,5 +116,10 @@ echo ""
 echo -e "${BLUE}=========================================${NC}"
 echo ""
 
+# Start the upload worker that ingests queued log uploads
+flask --app app upload-worker --concurrency 2 &
+WORKER_PID=$!
+trap "kill $WORKER_PID 2>/dev/null" EXIT
+
 # Run with gunicorn for production
-exec gunicorn --bind 0.0.0.0:5000 --workers 4 --timeout 120 --access-logfile - --error-logfile - app:app
+gunicorn --bind 0.0.0.0:5000 --workers 4 --threads 8 --timeout 120 --access-logfile - --error-logfile - app:app
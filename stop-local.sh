@@ -31,7 +31,7 @@ echo ""
 # Check if running via systemd
 if sudo systemctl is-active --quiet logshackbaby 2>/dev/null; then
     print_info "Stopping systemd service..."
-    sudo systemctl stop logshackbaby
+    sudo systemctl stop logshackbaby logshackbaby-worker
     print_success "Systemd service stopped"
 fi
 
@@ -52,6 +52,12 @@ else
     print_info "No application running on port 5000"
 fi
 
+# Stop any upload worker left running
+if pgrep -f "upload-worker" &> /dev/null; then
+    print_info "Stopping upload worker..."
+    pkill -f "upload-worker" 2>/dev/null || true
+fi
+
 echo ""
 print_success "LogShackBaby stopped"
 echo ""
@@ -4,9 +4,11 @@ Test script to verify ADIF parser correctly processes all fields
 """
 
 import sys
+import hashlib
+from datetime import datetime, timezone
 sys.path.insert(0, 'backend')
 
-from adif_parser import ADIFParser
+from adif_parser import ADIFParser, QSORecord, base_call_from
 
 # Test ADIF content with multiple fields including additional ones
 test_adif = """
@@ -31,6 +33,10 @@ test_adif = """
 <RST_SENT:3>599 <RST_RCVD:3>579 
 <STATION_CALLSIGN:5>K1XYZ
 <EOR>
+
+<CALL:5>N0PQR <QSO_DATE:8>20240101 <TIME_ON:6>151500
+<FREQ:6>14.060 <MODE:2>CW <COMMENT:12>pwr <5W> qrp
+<EOR>
 """
 
 def test_parser():
@@ -39,6 +45,58 @@ def test_parser():
     
     parser = ADIFParser()
     records = parser.parse_file(test_adif)
+    byte_records = ADIFParser().parse_buffer(test_adif.encode('utf-8'))
+    
+    # Declared lengths may count UTF-8 bytes or characters
+    name = 'José'
+    utf8_records = ADIFParser().parse_buffer(
+        f"<CALL:4>K1AB <QSO_DATE:8>20240101 <TIME_ON:4>1600 <NAME:{len(name)}>{name} <EOR>"
+        f"<CALL:4>K1CD <QSO_DATE:8>20240101 <TIME_ON:4>1610 <NAME:{len(name.encode())}>{name} <EOR>".encode('utf-8')
+    )
+    
+    # A date that does not exist leaves the record without qso_start, for
+    # the ingest paths to count as an error
+    bad_date_records = ADIFParser().parse_file("<CALL:4>K1AB <QSO_DATE:8>20240231 <TIME_ON:4>1600 <EOR>")
+    
+    # Bands are stored normalized but hashed as earlier releases spelled
+    # them, so re-uploaded logs still match their stored rows
+    spaced_band_record = ADIFParser().parse_record(
+        "<CALL:4>K1AB <QSO_DATE:8>20240101 <TIME_ON:4>1600 <BAND:4>20 m <MODE:2>CW <EOR>"
+    )
+    spaced_band_hash = hashlib.sha256(b'K1AB|20240101|1600|20 m|CW|').hexdigest()
+    
+    # Fields without a slot of their own go to additional_fields and are
+    # read back by name
+    extra_record = QSORecord({'call': 'K1AB'})
+    extra_record['sota_ref'] = 'W1/HA-001'
+    
+    # A file still being received is parsed one range at a time
+    resumed_records = []
+    raw = test_adif.encode('utf-8')
+    resume_parser = ADIFParser()
+    for end in (len(raw) // 3, 2 * len(raw) // 3, len(raw)):
+        resumed_records += resume_parser.iter_buffer_records(
+            raw, start=resume_parser.consumed_offset, end=end, final=end == len(raw)
+        )
+    
+    # A file that grew is parsed from the last record end before the old size
+    grown_start = ADIFParser().last_record_end(raw, len(raw) // 2)
+    grown_records = ADIFParser().parse_buffer(raw[:grown_start])
+    grown_records += ADIFParser().iter_buffer_records(raw, start=grown_start)
+    
+    # A log of same-layout records is finished a column at a time; each
+    # record must match the one parse_record builds on its own
+    uniform_lines = [
+        f"<CALL:{len(call)}>{call} <QSO_DATE:8>{date} <TIME_ON:4>1600 <BAND:{len(band)}>{band} "
+        f"<FREQ:{len(freq)}>{freq} <MODE:3>FT8 <SOTA_REF:9>W1/HA-001 <EOR>\r\n"
+        for call, date, band, freq in (
+            ('K1AB', '20240101', '20M', '14.074'), ('w1aw/4', '20240102', '20 m', '14.074'),
+            ('VP2E/K1ABC', '20240231', '40m', '7.074'), ('N0PQR', '20240104', '6m', '50.313'),
+            ('K4DEF', '2024010x', '2m', '144.174'),
+        )
+    ]
+    uniform_records = ADIFParser().parse_file(''.join(uniform_lines))
+    single_records = [ADIFParser().parse_record(line) for line in uniform_lines]
     
     print(f"\n✓ Parsed {len(records)} records\n")
     
@@ -90,6 +148,25 @@ def test_parser():
         ("QSL_SENT in additional", 'qsl_sent' in record1.get('additional_fields', {}), True),
         ("MY_ANTENNA in additional", 'my_antenna' in record1.get('additional_fields', {}), True),
         ("PROP_MODE in additional", 'prop_mode' in record1.get('additional_fields', {}), True),
+        ("Value containing '<' kept whole", records[2].get('comment'), 'pwr <5W> qrp'),
+        ("BAND derived from FREQ", records[2].get('band'), '20m'),
+        ("Spaced BAND normalized", spaced_band_record.get('band'), '20m'),
+        ("Dedup hash uses the logged BAND spelling", spaced_band_record.get('qso_hash'), spaced_band_hash),
+        ("QSO start set from date and time", records[0].get('qso_start'),
+         datetime(2024, 1, 1, 14, 30, tzinfo=timezone.utc)),
+        ("Unreal date kept without QSO start", [r.get('qso_start') for r in bad_date_records], [None]),
+        ("Base call set from CALL", records[0].get('base_call'), 'W1ABC'),
+        ("Portable designators stripped", [base_call_from(c) for c in ('W1/dl1abc/P', 'VP2E/K1ABC', 'W1AW/4')],
+         ['DL1ABC', 'K1ABC', 'W1AW']),
+        ("Extra field readable by name",
+         ('sota_ref' in extra_record, extra_record.get('sota_ref'), extra_record.get('additional_fields')),
+         (True, 'W1/HA-001', {'sota_ref': 'W1/HA-001'})),
+        ("Bytes parse matches text parse", byte_records, records),
+        ("UTF-8 length counted in characters", utf8_records[0].get('name'), name),
+        ("UTF-8 length counted in bytes", utf8_records[1].get('name'), name),
+        ("Parse resumed across partial ranges", resumed_records, records),
+        ("Grown file parsed from last record end", grown_records, records),
+        ("Same-layout log matches per-record parse", uniform_records, single_records),
     ]
     
     all_passed = True
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script to verify ADX parser produces the same records as the ADIF parser
+"""
+
+import io
+import sys
+sys.path.insert(0, 'backend')
+
+from adif_parser import ADIFParser
+from adx_parser import ADXParser, is_adx
+
+test_adx = b"""<?xml version="1.0" encoding="UTF-8"?>
+<ADX>
+  <HEADER>
+    <ADIF_VER>3.1.6</ADIF_VER>
+    <PROGRAMID>LogShackBaby</PROGRAMID>
+    <USERDEF FIELDID="1" TYPE="N">EPC</USERDEF>
+  </HEADER>
+  <RECORDS>
+    <RECORD>
+      <CALL>W1ABC</CALL>
+      <QSO_DATE>20240101</QSO_DATE>
+      <TIME_ON>143000</TIME_ON>
+      <BAND>20M</BAND>
+      <MODE>USB</MODE>
+      <STATION_CALLSIGN>K1XYZ</STATION_CALLSIGN>
+      <COMMENT>pwr &lt;5W&gt; qrp</COMMENT>
+      <CONTEST_ID>CQ-WPX</CONTEST_ID>
+      <APP PROGRAMID="N1MM" FIELDNAME="RADIO" TYPE="S">1</APP>
+      <USERDEF FIELDNAME="EPC">42</USERDEF>
+    </RECORD>
+    <RECORD>
+      <CALL>K4DEF</CALL>
+      <QSO_DATE>20240101</QSO_DATE>
+    </RECORD>
+  </RECORDS>
+</ADX>
+"""
+
+test_adif = """<ADIF_VER:5>3.1.6 <PROGRAMID:12>LogShackBaby <EOH>
+<CALL:5>W1ABC <QSO_DATE:8>20240101 <TIME_ON:6>143000 <BAND:3>20M <MODE:3>USB
+<STATION_CALLSIGN:5>K1XYZ <COMMENT:12>pwr <5W> qrp <CONTEST_ID:6>CQ-WPX
+<APP_N1MM_RADIO:1>1 <EPC:2>42 <EOR>
+"""
+
+
+def test_adx_parser():
+    print("Testing ADX Parser - Parity with ADIF Parser")
+    print("=" * 60)
+
+    parser = ADXParser()
+    records = list(parser.iter_records(io.BytesIO(test_adx)))
+    adif_records = ADIFParser().parse_file(test_adif)
+
+    print(f"\n✓ Parsed {len(records)} ADX records\n")
+
+    tests = [
+        ("Detects ADX content", is_adx(test_adx), True),
+        ("Does not detect ADI content", is_adx(test_adif), False),
+        ("Invalid record skipped", len(records), 1),
+        ("Header parsed", parser.header.get('programid'), 'LogShackBaby'),
+        ("Record matches ADIF parser", records[0] == adif_records[0], True),
+        ("APP field named like ADI", 'app_n1mm_radio' in records[0].get('additional_fields', {}), True),
+        ("Same qso_hash as ADI", records[0]['qso_hash'], adif_records[0]['qso_hash']),
+    ]
+
+    all_passed = True
+    for test_name, result, expected in tests:
+        status = "✓ PASS" if result == expected else "✗ FAIL"
+        print(f"{status:8s} {test_name}")
+        if result != expected:
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ All tests PASSED - ADX parser matches the ADIF parser!")
+    else:
+        print("✗ Some tests FAILED - Please review the ADX parser implementation")
+    print("=" * 60)
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = test_adx_parser()
+    sys.exit(0 if success else 1)
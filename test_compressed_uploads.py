@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script to verify gzip and zip uploads parse to the same records as the
+plain log, and that oversized decompressed content is rejected
+"""
+
+import io
+import gzip
+import zipfile
+import sys
+sys.path.insert(0, 'backend')
+
+from adif_parser import ADIFParser
+from upload_codecs import (
+    detect_compression, open_decompressed, DecompressionError, DecompressedSizeExceeded
+)
+
+test_adif = b"""
+<adif_ver:5>3.1.4
+<programid:6>Logger
+<EOH>
+<call:5>W1ABC <qso_date:8>20240101 <time_on:4>1200 <band:3>20m <mode:3>SSB <eor>
+<call:5>K2DEF <qso_date:8>20240101 <time_on:4>1215 <band:3>40m <mode:2>CW <eor>
+<call:6>VE3GHI <qso_date:8>20240102 <time_on:4>0130 <band:3>15m <mode:3>FT8 <eor>
+"""
+
+# An ADIF 2 log from a Windows logger, with a cp1252 value
+legacy_adif = (
+    b"<adif_ver:5>2.2.7 <eoh>\n"
+    b"<call:6>DL1ABC <qso_date:8>20240101 <time_on:4>1200 <name:4>J\xfcrg <qth:8>M\xfcnchen <eor>\n"
+)
+
+# A UTF-8 log whose multibyte values are split across read chunks
+utf8_adif = "<adif_ver:5>3.1.4 <eoh>\n" + "".join(
+    f"<call:4>K1A{i % 10} <qso_date:8>20240101 <time_on:4>12{i % 60:02d} <name:5>Zoë {i % 10} <eor>\n"
+    for i in range(2000)
+)
+
+
+def zip_archive(members):
+    """Build a zip archive in memory from (name, content) pairs"""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as z:
+        for name, content in members:
+            z.writestr(name, content)
+    return archive.getvalue()
+
+
+def parse(data, limit=1024 * 1024):
+    """Parse a possibly compressed upload the way upload workers do"""
+    stream = io.BytesIO(data)
+    compression = detect_compression(data[:4])
+    if compression:
+        stream = open_decompressed(stream, compression, limit)
+    return [record.to_dict() for record in ADIFParser().iter_upload(stream)]
+
+
+def raises(exception, data, limit=1024 * 1024):
+    """Check that parsing data raises the given exception"""
+    try:
+        parse(data, limit)
+    except exception:
+        return True
+    return False
+
+
+def test_compressed_uploads():
+    print("Testing Compressed Uploads - gzip and zip")
+    print("=" * 60)
+
+    plain = parse(test_adif)
+    gzipped = gzip.compress(test_adif)
+    zipped = zip_archive([('README.txt', b'Exported log'), ('log.adi', test_adif)])
+
+    print(f"\n✓ {len(test_adif)} bytes of ADIF, {len(gzipped)} gzipped, {len(zipped)} zipped\n")
+
+    tests = [
+        ("Plain ADIF not compressed", detect_compression(test_adif), None),
+        ("gzip detected", detect_compression(gzipped), 'gzip'),
+        ("zip detected", detect_compression(zipped), 'zip'),
+        ("gzip parses like plain", parse(gzipped), plain),
+        ("Multi-member gzip parses like plain",
+         parse(gzip.compress(test_adif[:150]) + gzip.compress(test_adif[150:])), plain),
+        ("zip log member parses like plain", parse(zipped), plain),
+        ("gzip of an ADIF 2 log keeps its charset",
+         parse(gzip.compress(legacy_adif)), [r.to_dict() for r in ADIFParser().parse_buffer(legacy_adif)]),
+        ("Values decoded with the header charset", parse(gzip.compress(legacy_adif))[0].get('qth'), 'München'),
+        ("gzip of a UTF-8 log parses like the file",
+         parse(gzip.compress(utf8_adif.encode('utf-8'))),
+         [r.to_dict() for r in ADIFParser().parse_buffer(utf8_adif.encode('utf-8'))]),
+        ("gzip bomb rejected", raises(DecompressedSizeExceeded, gzip.compress(b' ' * 4096), limit=1024), True),
+        ("Truncated gzip rejected", raises(DecompressionError, gzipped[:len(gzipped) // 2]), True),
+        ("zip with two logs rejected",
+         raises(DecompressionError, zip_archive([('a.adi', test_adif), ('b.adi', test_adif)])), True),
+    ]
+
+    all_passed = True
+    for test_name, result, expected in tests:
+        status = "✓ PASS" if result == expected else "✗ FAIL"
+        print(f"{status:8s} {test_name}")
+        if result != expected:
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ All tests PASSED - Compressed uploads parse like plain ADIF!")
+    else:
+        print("✗ Some tests FAILED - Please review the upload decompression")
+    print("=" * 60)
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = test_compressed_uploads()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script to verify WSJT-X and N1MM UDP packets decode to the same records
+as the equivalent ADIF
+"""
+
+import struct
+import sys
+sys.path.insert(0, 'backend')
+
+from adif_parser import ADIFParser
+from udp_listener import decode_datagram, WSJTX_MAGIC
+
+
+def qt_string(text):
+    """Encode a string as WSJT-X does: quint32 length, then UTF-8 bytes"""
+    data = text.encode('utf-8')
+    return struct.pack('>I', len(data)) + data
+
+
+logged_adif = """
+<adif_ver:5>3.1.0
+<programid:6>WSJT-X
+<EOH>
+<call:4>K1JT <gridsquare:4>FN20 <mode:3>FT8 <rst_sent:3>-10 <rst_rcvd:3>-12
+<qso_date:8>20240301 <time_on:6>120000 <band:3>20m <freq:9>14.075500
+<station_callsign:5>K1XYZ <EOR>
+"""
+
+# Message type 12 (Logged ADIF) and type 1 (Status) from client "WSJT-X"
+wsjtx_logged_adif = struct.pack('>III', WSJTX_MAGIC, 3, 12) + qt_string('WSJT-X') + qt_string(logged_adif)
+wsjtx_status = struct.pack('>III', WSJTX_MAGIC, 3, 1) + qt_string('WSJT-X') + b'\x00' * 16
+
+n1mm_contactinfo = b"""<?xml version="1.0" encoding="utf-8"?>
+<contactinfo>
+    <app>N1MM</app>
+    <contestname>CQ-WPX-SSB</contestname>
+    <timestamp>2024-03-30 14:05:12</timestamp>
+    <mycall>K1XYZ</mycall>
+    <band>14</band>
+    <rxfreq>1420500</rxfreq>
+    <txfreq>1420500</txfreq>
+    <operator></operator>
+    <mode>USB</mode>
+    <call>DL1ABC</call>
+    <snt>59</snt>
+    <sntnr>123</sntnr>
+    <rcv>59</rcv>
+    <rcvnr>0</rcvnr>
+</contactinfo>
+"""
+
+n1mm_adif = """<CALL:6>DL1ABC <QSO_DATE:8>20240330 <TIME_ON:6>140512 <BAND:3>20M
+<MODE:3>USB <STATION_CALLSIGN:5>K1XYZ <EOR>
+"""
+
+
+def test_udp_packets():
+    print("Testing UDP Packet Decoding - WSJT-X and N1MM")
+    print("=" * 60)
+
+    parser = ADIFParser()
+    wsjtx_records = decode_datagram(wsjtx_logged_adif, parser)
+    n1mm_records = decode_datagram(n1mm_contactinfo, parser)
+
+    print(f"\n✓ Decoded {len(wsjtx_records)} WSJT-X and {len(n1mm_records)} N1MM records\n")
+
+    tests = [
+        ("WSJT-X Logged ADIF decoded", len(wsjtx_records), 1),
+        ("WSJT-X status ignored", decode_datagram(wsjtx_status, parser), []),
+        ("WSJT-X record matches ADIF", wsjtx_records[0] == ADIFParser().parse_file(logged_adif)[0], True),
+        ("N1MM contactinfo decoded", len(n1mm_records), 1),
+        ("N1MM band from MHz", n1mm_records[0].get('band'), '20m'),
+        ("N1MM frequency in MHz", n1mm_records[0].get('freq'), '14.20500'),
+        ("N1MM serial sent kept", n1mm_records[0]['additional_fields'].get('stx'), '123'),
+        ("N1MM zero serial dropped", 'srx' in n1mm_records[0]['additional_fields'], False),
+        ("N1MM same qso_hash as ADIF", n1mm_records[0]['qso_hash'],
+         ADIFParser().parse_file(n1mm_adif)[0]['qso_hash']),
+        ("N1MM delete ignored", decode_datagram(b'<contactdelete><call>X</call></contactdelete>', parser), []),
+    ]
+
+    all_passed = True
+    for test_name, result, expected in tests:
+        status = "✓ PASS" if result == expected else "✗ FAIL"
+        print(f"{status:8s} {test_name}")
+        if result != expected:
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ All tests PASSED - UDP packets decode like ADIF!")
+    else:
+        print("✗ Some tests FAILED - Please review the UDP packet decoders")
+    print("=" * 60)
+
+    return all_passed
+
+if __name__ == "__main__":
+    success = test_udp_packets()
+    sys.exit(0 if success else 1)